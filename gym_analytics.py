@@ -0,0 +1,169 @@
+"""
+Agregados de ingresos y tasas de adopción
+Resúmenes por plan y característica sobre membresías confirmadas en columnas
+"""
+
+from collections import Counter
+
+from gym_compact import MembershipCodec
+from gym_ledger import LedgerReader, segment_paths
+from gym_money import Cents
+
+
+class RevenueSummary:
+    """
+    Resumen incremental de ingresos de muchas membresías confirmadas
+
+    Suma los totales y ajustes guardados al confirmar, sin volver a cotizar
+    con el catálogo vigente. Las filas se agrupan por configuración (plan y
+    máscaras) en una sola pasada y cada configuración distinta se traduce a
+    nombres una vez, con el diccionario de su propio bloque.
+    """
+
+    def __init__(self, codec=None):
+        """
+        Inicializa el resumen vacío
+
+        Args:
+            codec: Codificador por defecto de las columnas (por defecto el del
+                   catálogo vigente); sus nombres aparecen en el resumen aunque
+                   no tengan filas
+        """
+        self.codec = codec or MembershipCodec()
+        self._counts = Counter()
+        self._revenue = Counter()
+        self._group_discounts = self._special_discounts = self._premium_surcharges = 0
+
+    def __len__(self):
+        return sum(self._counts.values())
+
+    def update(self, columns, codec=None):
+        """
+        Agrega las filas de un bloque columnar
+
+        Args:
+            columns: Objeto con las columnas de LedgerColumns (por ejemplo
+                     LedgerReader.columns())
+            codec: Codificador con que se guardaron las columnas (por defecto
+                   el del resumen)
+        """
+        self.update_columns(columns.plan_codes, columns.additional_masks,
+                            columns.premium_masks, columns.total_cents,
+                            columns.group_discount_cents, columns.special_discount_cents,
+                            columns.premium_surcharge_cents, codec)
+
+    def update_columns(self, plan_codes, additional_masks, premium_masks, total_cents,
+                       group_discount_cents, special_discount_cents, premium_surcharge_cents,
+                       codec=None):
+        """
+        Agrega filas a partir de columnas sueltas
+
+        Args:
+            plan_codes: Códigos de plan
+            additional_masks: Máscaras de características adicionales
+            premium_masks: Máscaras de características premium
+            total_cents: Totales confirmados en centavos
+            group_discount_cents: Descuentos grupales confirmados en centavos
+            special_discount_cents: Descuentos especiales confirmados en centavos
+            premium_surcharge_cents: Recargos premium confirmados en centavos
+            codec: Codificador con que se guardaron las columnas (por defecto
+                   el del resumen)
+
+        Raises:
+            ValueError: Si alguna fila no tiene plan
+        """
+        codec = codec or self.codec
+        counts = Counter()
+        revenue = Counter()
+        for key, total in zip(zip(plan_codes, additional_masks, premium_masks), total_cents):
+            counts[key] += 1
+            revenue[key] += total
+        for key, count in counts.items():
+            names = self._names(key, codec)
+            self._counts[names] += count
+            self._revenue[names] += revenue[key]
+        # Los ajustes solo se informan en total, sin agrupar
+        self._group_discounts += sum(group_discount_cents)
+        self._special_discounts += sum(special_discount_cents)
+        self._premium_surcharges += sum(premium_surcharge_cents)
+
+    def update_ledger(self, path):
+        """
+        Agrega todas las filas de un libro, segmento por segmento
+
+        Cada segmento se traduce con el diccionario de su encabezado, así que
+        se cuentan también planes y características que ya no se ofrecen.
+
+        Args:
+            path: Ruta del libro
+        """
+        for segment in segment_paths(path):
+            with LedgerReader(segment) as reader:
+                self.update(reader.columns(), reader.codec)
+
+    def add(self, compact, amounts, codec=None):
+        """
+        Agrega una membresía confirmada
+
+        Args:
+            compact: CompactMembership a agregar
+            amounts: Montos confirmados en centavos (ConfirmedAmounts de
+                     LedgerReader.record() o CentsBreakdown)
+            codec: Codificador de la membresía (por defecto el del resumen)
+        """
+        names = self._names(
+            (compact.plan_code, compact.additional_mask, compact.premium_mask),
+            codec or self.codec)
+        self._counts[names] += 1
+        self._revenue[names] += amounts.total
+        self._group_discounts += amounts.group_discount
+        self._special_discounts += amounts.special_discount
+        self._premium_surcharges += amounts.premium_surcharge
+
+    @staticmethod
+    def _names(key, codec):
+        """Traduce (plan, máscaras) a nombres con el diccionario del bloque"""
+        plan_code, additional_mask, premium_mask = key
+        plan = codec.plans[plan_code] if plan_code < len(codec.plans) else None
+        if plan is None:
+            raise ValueError("Una membresía confirmada no tiene plan.")
+        return (plan, tuple(codec.additional_names(additional_mask)),
+                tuple(codec.premium_names(premium_mask)))
+
+    def summary(self):
+        """
+        Calcula el resumen de todas las filas agregadas
+
+        Returns:
+            dict: Membresías e ingresos por plan, tasas de adopción por
+                  característica y totales de descuentos y recargos (montos
+                  en Cents)
+        """
+        plans = dict.fromkeys(self.codec.plans[1:], 0)
+        revenue = dict.fromkeys(plans, 0)
+        additional = Counter(dict.fromkeys(self.codec.additional_features, 0))
+        premium = Counter(dict.fromkeys(self.codec.premium_features, 0))
+        for (plan, additional_features, premium_features), count in self._counts.items():
+            plans[plan] = plans.get(plan, 0) + count
+            revenue[plan] = revenue.get(plan, 0) + self._revenue[
+                (plan, additional_features, premium_features)]
+            for feature in additional_features:
+                additional[feature] += count
+            for feature in premium_features:
+                premium[feature] += count
+        total = len(self)
+
+        def rates(counter):
+            return {name: count / total if total else 0.0 for name, count in counter.items()}
+
+        return {
+            "memberships": total,
+            "revenue": Cents(sum(revenue.values())),
+            "memberships_by_plan": plans,
+            "revenue_by_plan": {plan: Cents(cents) for plan, cents in revenue.items()},
+            "additional_attach_rates": rates(additional),
+            "premium_attach_rates": rates(premium),
+            "group_discounts": Cents(self._group_discounts),
+            "special_discounts": Cents(self._special_discounts),
+            "premium_surcharges": Cents(self._premium_surcharges),
+        }
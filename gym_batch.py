@@ -0,0 +1,170 @@
+"""
+Cotización por lotes de membresías
+Calcula muchos totales en una sola pasada por columnas
+"""
+
+from array import array
+
+from gym_catalog import current_catalog, distinct_features
+from gym_money import build_quote_cents
+from gym_quote import dollars_breakdown
+
+
+def _feature_costs(selections, prices, kind, typecode='q'):
+    """
+    Suma el costo de cada selección de características
+
+    Las selecciones repetidas se calculan una sola vez y cada característica
+    se cobra una sola vez aunque se repita en la selección.
+
+    Args:
+        selections: Secuencia de listas de nombres de características
+        prices: Tabla de precios de las características
+        kind: Descripción usada en los mensajes de error
+        typecode: Tipo del arreglo resultante
+
+    Returns:
+        array: Costo de cada selección
+    """
+    memo = {}
+    costs = array(typecode)
+    for row, selection in enumerate(selections):
+        key = tuple(selection)
+        cost = memo.get(key)
+        if cost is None:
+            cost = 0
+            for feature in dict.fromkeys(key):
+                if feature not in prices:
+                    raise ValueError(
+                        f"Fila {row}: la característica {kind} '{feature}' no está disponible."
+                    )
+                cost += prices[feature]
+            memo[key] = cost
+        costs.append(cost)
+    return costs
+
+
+def _validate_columns(plans, additional_features, premium_features, num_members):
+    """Verifica que las columnas tengan la misma longitud y miembros válidos"""
+    size = len(plans)
+    if not len(additional_features) == len(premium_features) == len(num_members) == size:
+        raise ValueError("Todas las columnas deben tener la misma longitud.")
+    for row, num in enumerate(num_members):
+        if num < 1:
+            raise ValueError(f"Fila {row}: el número de miembros debe ser al menos 1.")
+
+
+def quote_batch(plans, additional_features, premium_features, num_members, catalog=None):
+    """
+    Cotiza un lote de membresías con las mismas reglas que calculate_total_cost
+
+    Cada argumento es una columna; la fila i describe una membresía.
+    Las filas sin plan (None) devuelven -1, igual que el cálculo individual.
+
+    Args:
+        plans: Nombres de plan (o None)
+        additional_features: Listas de características adicionales por fila
+        premium_features: Listas de características premium por fila
+        num_members: Número de miembros por fila
+        catalog: Catálogo a usar (por defecto el vigente)
+
+    Returns:
+        array: Totales en dólares, uno por fila
+
+    Raises:
+        ValueError: Si las columnas difieren en longitud o hay nombres inválidos
+    """
+    totals = quote_batch_cents(plans, additional_features, premium_features, num_members, catalog)
+    # Las filas sin plan se reconocen por el plan: un total puede ser negativo
+    return array('d', (total / 100 if plan is not None else -1
+                       for plan, total in zip(plans, totals)))
+
+
+def quote_batch_cents(plans, additional_features, premium_features, num_members,
+                      catalog=None):
+    """
+    Cotiza un lote en centavos enteros, sin aritmética de punto flotante
+
+    Los descuentos y recargos salen de la función compilada de las reglas
+    del catálogo. Las filas sin plan (None) devuelven -1.
+
+    Args:
+        plans: Nombres de plan (o None)
+        additional_features: Listas de características adicionales por fila
+        premium_features: Listas de características premium por fila
+        num_members: Número de miembros por fila
+        catalog: Catálogo a usar (por defecto el vigente)
+
+    Returns:
+        array: Totales en centavos, uno por fila
+
+    Raises:
+        ValueError: Si las columnas difieren en longitud o hay nombres inválidos
+    """
+    _validate_columns(plans, additional_features, premium_features, num_members)
+    if catalog is None:
+        catalog = current_catalog()
+
+    plan_table = catalog.plan_cents
+    base = array('q')
+    for row, plan in enumerate(plans):
+        if plan is None:
+            base.append(-1)
+        elif plan in plan_table:
+            base.append(plan_table[plan])
+        else:
+            raise ValueError(f"Fila {row}: el plan '{plan}' no está disponible.")
+
+    additional = _feature_costs(additional_features, catalog.additional_cents, "adicional", 'q')
+    premium = _feature_costs(premium_features, catalog.premium_cents, "premium", 'q')
+
+    # Cada paso recorre una columna completa con la función compilada del catálogo
+    price = catalog.price_total_cents
+    subtotal = [b + a + p for b, a, p in zip(base, additional, premium)]
+    totals = array('q', (
+        price(s, n, len(selection) > 0) if plan is not None else -1
+        for s, n, selection, plan in zip(subtotal, num_members, premium_features, plans)
+    ))
+    return totals
+
+
+def quote_batch_breakdowns(plans, additional_features, premium_features, num_members,
+                           catalog=None):
+    """
+    Cotiza un lote y retorna el desglose completo de cada fila
+
+    Los costos de las características se suman por columna, como en
+    quote_batch_cents, y cada fila pasa una vez por la función compilada del
+    desglose del catálogo.
+
+    Args:
+        plans: Nombres de plan
+        additional_features: Listas de características adicionales por fila
+        premium_features: Listas de características premium por fila
+        num_members: Número de miembros por fila
+        catalog: Catálogo a usar (por defecto el vigente)
+
+    Returns:
+        list: QuoteBreakdown de cada fila, en dólares
+
+    Raises:
+        ValueError: Si las columnas difieren en longitud o hay nombres inválidos
+    """
+    _validate_columns(plans, additional_features, premium_features, num_members)
+    if catalog is None:
+        catalog = current_catalog()
+
+    additional_features = [distinct_features(selection) for selection in additional_features]
+    premium_features = [distinct_features(selection) for selection in premium_features]
+    additional = _feature_costs(additional_features, catalog.additional_cents, "adicional", 'q')
+    premium = _feature_costs(premium_features, catalog.premium_cents, "premium", 'q')
+
+    breakdowns = []
+    for row, (plan, num, adds, prems, additional_cost, premium_cost) in enumerate(zip(
+            plans, num_members, additional_features, premium_features, additional, premium)):
+        if plan not in catalog.plan_cents:
+            raise ValueError(f"Fila {row}: el plan '{plan}' no está disponible.")
+        breakdowns.append(dollars_breakdown(build_quote_cents(
+            plan, num, adds, prems, catalog.plan_cents[plan], additional_cost, premium_cost,
+            catalog)))
+    return breakdowns
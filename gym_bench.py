@@ -0,0 +1,478 @@
+"""
+Benchmarks de las rutas de cálculo de precios
+Mide operaciones por segundo, latencias y memoria, y compara contra una línea base
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from array import array
+from decimal import ROUND_HALF_DOWN, Decimal
+
+from gym_analytics import RevenueSummary
+from gym_batch import quote_batch, quote_batch_cents
+from gym_catalog import Catalog, QuoteCache, current_catalog, reload_catalog
+from gym_compact import CompactMembership, MembershipCodec, MembershipColumns
+from gym_defaults import (
+    GROUP_DISCOUNT_MIN_MEMBERS,
+    GROUP_DISCOUNT_RATE,
+    PREMIUM_SURCHARGE_RATE,
+    SPECIAL_OFFERS,
+)
+from gym_membership import GymMembership
+from gym_stream import quote_stream
+
+DEFAULT_BASELINE = "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+# Registro de benchmarks: nombre -> función que prepara la operación
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Registra una función que prepara una operación a medir"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+class _NullWriter(io.TextIOBase):
+    """Salida que descarta todo lo escrito"""
+
+    def write(self, text):
+        return len(text)
+
+
+def _full_membership():
+    """Crea una membresía con todas las reglas activas"""
+    return GymMembership.from_selection(
+        "Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3)
+
+
+def _sample_raw_records(count):
+    """Genera registros crudos variados para los benchmarks de lotes"""
+    plans = list(GymMembership.MEMBERSHIP_PLANS)
+    additional = list(GymMembership.ADDITIONAL_FEATURES)
+    premium = list(GymMembership.PREMIUM_FEATURES)
+    return [
+        (index, {
+            "plan": plans[index % len(plans)],
+            "members": index % 4 + 1,
+            "additional_features": additional[:index % (len(additional) + 1)],
+            "premium_features": premium[:index % (len(premium) + 1)],
+        })
+        for index in range(count)
+    ]
+
+
+def _batch_columns(count):
+    """Prepara las columnas de un lote de prueba"""
+    records = [raw for _, raw in _sample_raw_records(count)]
+    return (
+        [raw["plan"] for raw in records],
+        [raw["additional_features"] for raw in records],
+        [raw["premium_features"] for raw in records],
+        [raw["members"] for raw in records],
+    )
+
+
+@benchmark("select_membership_plan")
+def _bench_select():
+    gym = GymMembership()
+    return lambda: gym.select_membership_plan("Premium")
+
+
+@benchmark("add_additional_feature")
+def _bench_add_feature():
+    # Cada llamada agrega una característica distinta hasta tenerlas todas y
+    # luego las quita una a una, así que ninguna llamada es un no-op y las
+    # bajas también se miden
+    gym = GymMembership()
+    gym.select_membership_plan("Premium")
+    features = list(GymMembership.ADDITIONAL_FEATURES)
+    steps = [(gym.add_additional_feature, name) for name in features] + \
+            [(gym.remove_additional_feature, name) for name in features]
+    position = [0]
+
+    def run():
+        method, name = steps[position[0]]
+        position[0] = (position[0] + 1) % len(steps)
+        return method(name)
+    return run
+
+
+@benchmark("calculate_total_cost")
+def _bench_total():
+    gym = _full_membership()
+    return gym.calculate_total_cost
+
+
+@benchmark("display_summary")
+def _bench_summary():
+    gym = _full_membership()
+    gym.calculate_total_cost()
+    return gym.display_summary
+
+
+@benchmark("quote")
+def _bench_quote():
+    gym = _full_membership()
+    return gym.quote
+
+
+@benchmark("quote_cache")
+def _bench_cache():
+    cache = QuoteCache()
+    args = ("Premium", ("Personal Training", "Group Classes"), ("Exclusive Gym Access",), 3)
+    return lambda: cache.quote(*args)
+
+
+@benchmark("quote_batch_1000")
+def _bench_batch():
+    columns = _batch_columns(1000)
+    return lambda: quote_batch(*columns)
+
+
+@benchmark("rules_hand_written")
+def _bench_rules_hand_written():
+    # Referencia de comparación: las reglas por defecto escritas a mano
+    def price(subtotal, num_members, has_premium):
+        total = subtotal
+        if num_members >= GROUP_DISCOUNT_MIN_MEMBERS:
+            total -= subtotal * GROUP_DISCOUNT_RATE
+        for threshold, discount in SPECIAL_OFFERS:
+            if subtotal > threshold:
+                total -= discount
+                break
+        if has_premium:
+            total += total * PREMIUM_SURCHARGE_RATE
+        return round(total, 2)
+    return lambda: price(245, 3, True)
+
+
+@benchmark("rules_compiled")
+def _bench_rules_compiled():
+    price = current_catalog().price_total
+    return lambda: price(245, 3, True)
+
+
+@benchmark("quote_cents")
+def _bench_quote_cents():
+    catalog = current_catalog()
+    args = ("Premium", ("Personal Training", "Group Classes"), ("Exclusive Gym Access",), 3)
+    return lambda: catalog.quote_cents(*args)
+
+
+@benchmark("quote_batch_cents_1000")
+def _bench_batch_cents():
+    columns = _batch_columns(1000)
+    return lambda: quote_batch_cents(*columns)
+
+
+@benchmark("quote_batch_decimal_1000")
+def _bench_batch_decimal():
+    # Referencia de comparación: las mismas reglas con Decimal
+    plans, additional, premium, members = _batch_columns(1000)
+    catalog = current_catalog()
+    cent = Decimal("0.01")
+    group_rate, surcharge_rate = Decimal("0.10"), Decimal("0.15")
+
+    def run():
+        totals = []
+        for plan, adds, prems, num in zip(plans, additional, premium, members):
+            subtotal = Decimal(catalog.plans[plan]["cost"])
+            subtotal += sum(Decimal(catalog.additional_features[f]) for f in adds)
+            subtotal += sum(Decimal(catalog.premium_features[f]) for f in prems)
+            after = subtotal - (subtotal * group_rate if num >= 2 else 0)
+            after -= 50 if subtotal > 400 else 20 if subtotal > 200 else 0
+            if prems:
+                after += (after * surcharge_rate).quantize(cent, ROUND_HALF_DOWN)
+            totals.append(after)
+        return totals
+    return run
+
+
+@benchmark("quote_stream_1000")
+def _bench_stream():
+    records = _sample_raw_records(1000)
+    return lambda: sum(1 for _ in quote_stream(records))
+
+
+@benchmark("revenue_summary_100000")
+def _bench_revenue_summary():
+    codec = MembershipCodec()
+    catalog = current_catalog()
+    columns = MembershipColumns(codec)
+    # Los montos confirmados se calculan una vez, como los guardaría el libro
+    amounts = [array("q") for _ in range(4)]
+    for _, raw in _sample_raw_records(100000):
+        columns.append(CompactMembership(
+            codec.plan_code(raw["plan"]),
+            codec.additional_mask(raw["additional_features"]),
+            codec.premium_mask(raw["premium_features"]),
+            raw["members"]))
+        breakdown = catalog.quote_cents(raw["plan"], raw["additional_features"],
+                                        raw["premium_features"], raw["members"])
+        for column, amount in zip(amounts, (breakdown.total, breakdown.group_discount,
+                                            breakdown.special_discount,
+                                            breakdown.premium_surcharge)):
+            column.append(amount)
+
+    def run():
+        summary = RevenueSummary(codec)
+        summary.update_columns(columns.plan_codes, columns.additional_masks,
+                               columns.premium_masks, *amounts)
+        return summary.summary()
+    return run
+
+
+def _percentile(ordered, fraction):
+    """Retorna el percentil de una lista ordenada"""
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(operation, samples=200, inner=50):
+    """
+    Mide una operación
+
+    Cada muestra ejecuta la operación inner veces para que el costo del
+    reloj no domine en operaciones muy cortas.
+
+    Args:
+        operation: Función sin argumentos a medir
+        samples: Número de muestras de latencia
+        inner: Operaciones por muestra
+
+    Returns:
+        dict: ops_per_sec, latencias p50/p95/p99 en microsegundos y memoria
+    """
+    # Calentamiento
+    for _ in range(inner):
+        operation()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(samples):
+        begin = time.perf_counter_ns()
+        for _ in range(inner):
+            operation()
+        latencies.append((time.perf_counter_ns() - begin) / inner / 1000)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(inner):
+        operation()
+    blocks_after = sys.getallocatedblocks()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ops_per_sec": samples * inner / elapsed,
+        "p50_us": _percentile(latencies, 0.50),
+        "p95_us": _percentile(latencies, 0.95),
+        "p99_us": _percentile(latencies, 0.99),
+        "peak_alloc_bytes": peak,
+        "net_blocks_per_op": (blocks_after - blocks_before) / inner,
+    }
+
+
+def run_benchmarks(names=None, samples=200, inner=50):
+    """
+    Ejecuta los benchmarks registrados con stdout descartado
+
+    Args:
+        names: Nombres a ejecutar (por defecto todos)
+        samples: Número de muestras por benchmark
+        inner: Operaciones por muestra
+
+    Returns:
+        dict: Resultados por nombre de benchmark
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"El benchmark '{name}' no existe.")
+        with contextlib.redirect_stdout(_NullWriter()):
+            operation = BENCHMARKS[name]()
+            results[name] = measure(operation, samples, inner)
+    return results
+
+
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compara resultados contra una línea base
+
+    Args:
+        results: Resultados actuales
+        baseline: Resultados guardados
+        threshold: Caída relativa de ops/seg tolerada (0.25 = 25%)
+
+    Returns:
+        list: (nombre, ops/seg base, ops/seg actual) de cada regresión
+    """
+    regressions = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]["ops_per_sec"]
+        if current["ops_per_sec"] < expected * (1 - threshold):
+            regressions.append((name, expected, current["ops_per_sec"]))
+    return regressions
+
+
+def stress_catalog(threads=4, seconds=1.0, reload_interval=0.001, min_reloads=2):
+    """
+    Cotiza desde varios hilos mientras otro hilo publica precios nuevos
+
+    El escritor alterna entre los precios vigentes y los mismos precios al
+    doble; cada cotización, por Catalog o por GymMembership, debe salir
+    completa de una de las dos versiones.
+
+    Args:
+        threads: Hilos que cotizan
+        seconds: Duración mínima de la prueba
+        reload_interval: Segundos entre publicaciones del catálogo
+        min_reloads: Publicaciones mínimas antes de terminar
+
+    Returns:
+        dict: Hilos, cotizaciones, cotizaciones/seg, publicaciones y lecturas mezcladas
+    """
+    original = current_catalog()
+    tables = original.to_dict()
+    del tables["version"]
+    doubled = {
+        "plans": {plan: dict(details, cost=details["cost"] * 2)
+                  for plan, details in tables["plans"].items()},
+        "additional_features": {f: c * 2 for f, c in tables["additional_features"].items()},
+        "premium_features": {f: c * 2 for f, c in tables["premium_features"].items()},
+    }
+    selection = ("Premium", ("Personal Training",), ("Exclusive Gym Access",), 2)
+    # Desglose esperado de cada versión: (base, adicionales, premium) -> total
+    valid = {}
+    for prices in (tables, doubled):
+        breakdown = Catalog(0, rules=original.rules, **prices).quote(*selection)
+        valid[(breakdown.base_cost, breakdown.additional_cost,
+               breakdown.premium_cost)] = breakdown.total
+    stop = threading.Event()
+    counts = [0] * threads
+    torn = [0] * threads
+    reloads = 0
+
+    def reader(slot):
+        quotes = mixed = 0
+        while not stop.is_set():
+            # Los hilos pares cotizan por el catálogo y los impares por GymMembership
+            if slot % 2 == 0:
+                breakdown = current_catalog().quote(*selection)
+            else:
+                breakdown = GymMembership.from_selection(*selection).quote()
+            costs = (breakdown.base_cost, breakdown.additional_cost, breakdown.premium_cost)
+            if valid.get(costs) != breakdown.total:
+                mixed += 1
+            quotes += 1
+        counts[slot] = quotes
+        torn[slot] = mixed
+
+    workers = [threading.Thread(target=reader, args=(slot,)) for slot in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    try:
+        while time.perf_counter() - started < seconds or reloads < min_reloads:
+            reload_catalog(**(doubled if reloads % 2 == 0 else tables))
+            reloads += 1
+            time.sleep(reload_interval)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+        reload_catalog(tables["plans"], tables["additional_features"],
+                       tables["premium_features"], original.rules)
+    elapsed = time.perf_counter() - started
+    return {
+        "threads": threads,
+        "quotes": sum(counts),
+        "quotes_per_sec": sum(counts) / elapsed,
+        "reloads": reloads,
+        "torn_reads": sum(torn),
+    }
+
+
+def format_results(results):
+    """Formatea los resultados como tabla de texto"""
+    lines = [f"{'benchmark':<24}{'ops/s':>14}{'p50 µs':>10}{'p95 µs':>10}"
+             f"{'p99 µs':>10}{'peak B':>10}{'blk/op':>8}"]
+    for name, result in results.items():
+        lines.append(
+            f"{name:<24}{result['ops_per_sec']:>14,.0f}{result['p50_us']:>10.2f}"
+            f"{result['p95_us']:>10.2f}{result['p99_us']:>10.2f}"
+            f"{result['peak_alloc_bytes']:>10}{result['net_blocks_per_op']:>8.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Ejecuta los benchmarks desde la línea de comandos
+
+    Returns:
+        int: 0 si no hay regresiones, 1 si alguna supera el umbral
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks de precios de membresías")
+    parser.add_argument("names", nargs="*", help="Benchmarks a ejecutar (por defecto todos)")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--inner", type=int, default=50)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Archivo JSON con la línea base")
+    parser.add_argument("--save", action="store_true", help="Guarda los resultados como línea base")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Caída relativa de ops/seg tolerada")
+    parser.add_argument("--list", action="store_true", help="Lista los benchmarks disponibles")
+    parser.add_argument("--stress", type=int, metavar="HILOS",
+                        help="Prueba de cotización concurrente con recargas de 1 a HILOS hilos")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    if args.stress:
+        print(f"{'hilos':>6}{'cotiz/s':>14}{'recargas':>10}{'mezcladas':>11}")
+        torn = 0
+        for threads in range(1, args.stress + 1):
+            result = stress_catalog(threads)
+            torn += result["torn_reads"]
+            print(f"{threads:>6}{result['quotes_per_sec']:>14,.0f}"
+                  f"{result['reloads']:>10}{result['torn_reads']:>11}")
+        return 1 if torn else 0
+
+    results = run_benchmarks(args.names or None, args.samples, args.inner)
+    print(format_results(results))
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+        print(f"\nLínea base guardada en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    regressions = find_regressions(results, baseline, args.threshold)
+    for name, expected, current in regressions:
+        print(f"REGRESIÓN {name}: {expected:,.0f} -> {current:,.0f} ops/s")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+Facturación mensual de membresías activas
+Genera las facturas en streaming, con puntos de control para reanudar una
+corrida interrumpida
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+from gym_catalog import Catalog, current_catalog
+from gym_rules import PricingRule
+from gym_stream import FEATURE_SEPARATOR
+
+# Membresía activa a facturar; las fuentes las entregan en orden de member_id
+BillingRecord = namedtuple("BillingRecord", [
+    "member_id",
+    "plan",
+    "num_members",
+    "additional_features",
+    "premium_features",
+])
+
+INVOICE_FIELDS = [
+    "invoice", "member_id", "period", "plan", "members",
+    "additional_features", "premium_features", "total",
+]
+REJECT_FIELDS = ["member_id", "plan", "additional_features", "premium_features", "error"]
+DEFAULT_CHECKPOINT_EVERY = 10000
+
+
+def store_source(store):
+    """
+    Crea una fuente de facturación a partir de un MembershipStore
+
+    Solo entrega las membresías activas; las dadas de baja con
+    MembershipStore.cancel() no se facturan.
+
+    Args:
+        store: Almacén de membresías confirmadas
+
+    Returns:
+        function: Recibe el último member_id procesado y genera BillingRecord
+    """
+    def source(after_id):
+        for member_id, _, breakdown in store.replay(after_id, active_only=True):
+            yield BillingRecord(member_id, breakdown.plan, breakdown.num_members,
+                                breakdown.additional_features, breakdown.premium_features)
+    return source
+
+
+def _catalog_tables(catalog):
+    """Tablas de precios y reglas de un catálogo, tal como se guardan en el punto de control"""
+    return dict(catalog.to_dict(), rules=[list(rule) for rule in catalog.rules])
+
+
+class _EncodedWriter:
+    """Adaptador para escribir el CSV en un archivo binario, en UTF-8"""
+
+    def __init__(self, handle):
+        self.handle = handle
+
+    def write(self, text):
+        return self.handle.write(text.encode("utf-8"))
+
+
+class BillingRun:
+    """Corrida de facturación de un periodo, reanudable"""
+
+    def __init__(self, period, output_path, checkpoint_path=None,
+                 checkpoint_every=DEFAULT_CHECKPOINT_EVERY, catalog=None,
+                 progress=None, report_interval=1.0, rejects_path=None):
+        """
+        Prepara la corrida
+
+        Args:
+            period: Periodo facturado (por ejemplo "2026-10")
+            output_path: Archivo CSV de facturas
+            checkpoint_path: Archivo del punto de control (por defecto output_path + ".ckpt")
+            checkpoint_every: Facturas entre puntos de control
+            catalog: Catálogo con el que se cobra (por defecto el vigente); al
+                     reanudar se usa el guardado en el punto de control
+            progress: Función llamada con (facturas, total, facturas/seg, segundos restantes)
+            report_interval: Segundos entre reportes de avance
+            rejects_path: Archivo CSV de membresías que no se pudieron cobrar
+                          (por defecto output_path + ".rejects")
+        """
+        self.period = period
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or output_path + ".ckpt"
+        self.rejects_path = rejects_path or output_path + ".rejects"
+        self.checkpoint_every = checkpoint_every
+        self.catalog = catalog or current_catalog()
+        self.progress = progress
+        self.report_interval = report_interval
+        self._prices = {}
+
+    def _load_checkpoint(self):
+        """
+        Lee el punto de control, o None si la corrida es nueva
+
+        Una corrida reanudada cobra con las tablas con que empezó, aunque
+        después se haya publicado otro catálogo.
+
+        Raises:
+            ValueError: Si el punto de control es de otro periodo
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding="utf-8") as handle:
+            state = json.load(handle)
+        if state["period"] != self.period:
+            raise ValueError(
+                f"El punto de control es del periodo {state['period']}, no de {self.period}.")
+        tables = state.get("catalog")
+        if tables is not None and tables != _catalog_tables(self.catalog):
+            self.catalog = Catalog(
+                tables["version"], tables["plans"], tables["additional_features"],
+                tables["premium_features"], [PricingRule(*rule) for rule in tables["rules"]])
+            self._prices.clear()
+        return state
+
+    def _save_checkpoint(self, state):
+        """Escribe el punto de control de forma atómica"""
+        temporary = self.checkpoint_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self.checkpoint_path)
+
+    def _price(self, record):
+        """Cobra una membresía; cada configuración se cotiza una sola vez"""
+        key = (record.plan, frozenset(record.additional_features),
+               frozenset(record.premium_features),
+               self.catalog.pricing_members(record.num_members))
+        total = self._prices.get(key)
+        if total is None:
+            total = self.catalog.quote_cents(
+                record.plan, record.additional_features, record.premium_features,
+                record.num_members).total
+            self._prices[key] = total
+        return total
+
+    def run(self, source, total=None):
+        """
+        Ejecuta (o reanuda) la corrida
+
+        Las facturas escritas después del último punto de control se descartan
+        al reanudar, así que cada membresía se factura exactamente una vez.
+        Las membresías cuyo plan o características ya no están en el catálogo
+        van al archivo de rechazos en vez de detener la corrida.
+
+        Args:
+            source: Función que recibe el último member_id procesado y genera
+                    BillingRecord en orden de member_id
+            total: Número de membresías a facturar, para estimar el tiempo restante
+
+        Returns:
+            dict: Facturas, monto en centavos, rechazos, facturas al reanudar,
+                  segundos y facturas por segundo de esta ejecución
+        """
+        state = self._load_checkpoint()
+        if state is None:
+            state = {"period": self.period, "last_member_id": 0, "invoices": 0,
+                     "amount_cents": 0, "rejected": 0, "offset": 0,
+                     "rejects_offset": 0, "complete": False,
+                     "catalog": _catalog_tables(self.catalog)}
+            for path, fields, key in ((self.output_path, INVOICE_FIELDS, "offset"),
+                                      (self.rejects_path, REJECT_FIELDS, "rejects_offset")):
+                with open(path, "wb") as handle:
+                    csv.writer(_EncodedWriter(handle)).writerow(fields)
+                    state[key] = handle.tell()
+        resumed_from = state["invoices"] + state["rejected"]
+        started = last_report = time.perf_counter()
+
+        if not state["complete"]:
+            with open(self.output_path, "r+b") as handle, \
+                    open(self.rejects_path, "r+b") as rejects_handle:
+                # Descarta lo escrito después del último punto de control;
+                # las posiciones son bytes porque los archivos son binarios
+                for stream, key in ((handle, "offset"), (rejects_handle, "rejects_offset")):
+                    stream.truncate(state[key])
+                    stream.seek(state[key])
+                writer = csv.writer(_EncodedWriter(handle))
+                rejects = csv.writer(_EncodedWriter(rejects_handle))
+                since_checkpoint = 0
+                for record in source(state["last_member_id"]):
+                    additional = FEATURE_SEPARATOR.join(record.additional_features)
+                    premium = FEATURE_SEPARATOR.join(record.premium_features)
+                    try:
+                        amount = self._price(record)
+                    except ValueError as error:
+                        state["rejected"] += 1
+                        rejects.writerow([record.member_id, record.plan, additional,
+                                          premium, str(error)])
+                    else:
+                        state["invoices"] += 1
+                        writer.writerow([
+                            f"{self.period}-{state['invoices']:08d}", record.member_id,
+                            self.period, record.plan, record.num_members,
+                            additional, premium, f"{amount.dollars():.2f}",
+                        ])
+                        state["amount_cents"] += amount
+                    state["last_member_id"] = record.member_id
+                    since_checkpoint += 1
+                    if since_checkpoint >= self.checkpoint_every:
+                        self._checkpoint(handle, rejects_handle, state)
+                        since_checkpoint = 0
+                    if self.progress is not None:
+                        now = time.perf_counter()
+                        if now - last_report >= self.report_interval:
+                            self._report(state["invoices"] + state["rejected"], resumed_from,
+                                         total, now - started)
+                            last_report = now
+                state["complete"] = True
+                self._checkpoint(handle, rejects_handle, state)
+
+        elapsed = time.perf_counter() - started
+        processed = state["invoices"] + state["rejected"]
+        if self.progress is not None:
+            self._report(processed, resumed_from, total, elapsed)
+        return {
+            "invoices": state["invoices"],
+            "amount_cents": state["amount_cents"],
+            "rejected": state["rejected"],
+            "resumed_from": resumed_from,
+            "elapsed": elapsed,
+            "invoices_per_sec": (processed - resumed_from) / elapsed if elapsed else 0.0,
+        }
+
+    def _checkpoint(self, handle, rejects_handle, state):
+        """Asegura las facturas y los rechazos en disco y luego guarda el avance"""
+        for stream, key in ((handle, "offset"), (rejects_handle, "rejects_offset")):
+            stream.flush()
+            os.fsync(stream.fileno())
+            state[key] = stream.tell()
+        self._save_checkpoint(state)
+
+    def _report(self, invoices, resumed_from, total, elapsed):
+        """Reporta el avance, la velocidad y el tiempo restante estimado"""
+        rate = (invoices - resumed_from) / elapsed if elapsed else 0.0
+        eta = None
+        if total is not None and rate:
+            eta = max(total - invoices, 0) / rate
+        self.progress(invoices, total, rate, eta)
+
+
+def print_progress(invoices, total, rate, eta, stream=None):
+    """Muestra el avance de la corrida en una sola línea"""
+    stream = stream or sys.stderr
+    done = f"{invoices:,}" if total is None else f"{invoices:,}/{total:,}"
+    remaining = "" if eta is None else f", faltan {eta:,.0f} s"
+    stream.write(f"\rFacturas: {done} ({rate:,.0f}/s{remaining})")
+    stream.flush()
+
+
+def main(argv=None):
+    """
+    Ejecuta la facturación mensual desde el almacén de confirmaciones
+
+    Returns:
+        int: 0 si la corrida terminó
+    """
+    # Importación diferida: el almacén solo se necesita desde la línea de comandos
+    from gym_store import MembershipStore
+
+    parser = argparse.ArgumentParser(description="Facturación mensual de membresías")
+    parser.add_argument("store", help="Base SQLite de membresías confirmadas")
+    parser.add_argument("period", help="Periodo a facturar, por ejemplo 2026-10")
+    parser.add_argument("-o", "--output", required=True, help="Archivo CSV de facturas")
+    parser.add_argument("--checkpoint", help="Archivo del punto de control")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY)
+    args = parser.parse_args(argv)
+
+    with MembershipStore(args.store) as store:
+        billing = BillingRun(args.period, args.output, args.checkpoint,
+                             args.checkpoint_every, progress=print_progress)
+        summary = billing.run(store_source(store), total=store.count(active_only=True))
+    print(f"\nFacturas: {summary['invoices']}, monto: ${summary['amount_cents'] / 100:,.2f}, "
+          f"rechazos: {summary['rejected']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
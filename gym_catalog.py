@@ -0,0 +1,490 @@
+"""
+Catálogo versionado de precios y caché de cotizaciones
+Permite recargar los precios en tiempo de ejecución
+
+Cada versión del catálogo es una instantánea inmutable. Una recarga construye
+una copia nueva y la publica reemplazando una sola referencia, así que los
+lectores no toman ningún candado: quien obtiene current_catalog() cotiza
+todo su cálculo con esa versión aunque otra se publique a la mitad.
+"""
+
+import bisect
+import json
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+from gym_defaults import (
+    DEFAULT_ADDITIONAL_FEATURES,
+    DEFAULT_MEMBERSHIP_PLANS,
+    DEFAULT_PREMIUM_FEATURES,
+)
+from gym_money import Cents, build_quote_cents
+from gym_quote import build_quote
+from gym_rules import (
+    ADJUSTMENT_KINDS,
+    DEFAULT_RULES,
+    applied_rules,
+    compile_rules,
+    member_thresholds,
+    subtotal_thresholds,
+)
+
+
+def _freeze_plans(plans):
+    """Copia los planes en vistas de solo lectura, con beneficios como tupla"""
+    return MappingProxyType({
+        plan: MappingProxyType(dict(details, benefits=tuple(details.get("benefits", ()))))
+        for plan, details in plans.items()
+    })
+
+
+def distinct_features(features):
+    """
+    Quita las características repetidas conservando el orden
+
+    Una característica se cobra una sola vez, igual que en GymMembership.
+
+    Args:
+        features: Nombres de características
+
+    Returns:
+        tuple: Nombres sin repetidos
+    """
+    return tuple(dict.fromkeys(features))
+
+
+class Catalog:
+    """Versión de las tablas de precios de planes y características"""
+
+    def __init__(self, version, plans, additional_features, premium_features,
+                 rules=DEFAULT_RULES):
+        """
+        Inicializa el catálogo
+
+        Args:
+            version: Número de versión del catálogo
+            plans: Planes con su costo y beneficios
+            additional_features: Precios de las características adicionales
+            premium_features: Precios de las características premium
+            rules: Tabla de reglas de descuentos y recargos (ver gym_rules)
+        """
+        self.version = version
+        # Copias de solo lectura: una versión publicada no cambia nunca
+        self.plans = _freeze_plans(plans)
+        self.additional_features = MappingProxyType(dict(additional_features))
+        self.premium_features = MappingProxyType(dict(premium_features))
+        # Tablas en centavos, calculadas una sola vez por versión
+        self.plan_cents = MappingProxyType({
+            plan: Cents.from_dollars(details["cost"]) for plan, details in plans.items()})
+        self.additional_cents = MappingProxyType({
+            feature: Cents.from_dollars(cost) for feature, cost in additional_features.items()})
+        self.premium_cents = MappingProxyType({
+            feature: Cents.from_dollars(cost) for feature, cost in premium_features.items()})
+        # Las reglas se compilan una sola vez por versión; todas las rutas de
+        # cotización usan estas funciones
+        self.rules = tuple(rules)
+        self.price_total = compile_rules(self.rules)
+        self.price_total_cents = compile_rules(self.rules, cents=True)
+        self.price_breakdown_cents = compile_rules(self.rules, cents=True, breakdown=True)
+        self.member_thresholds = member_thresholds(self.rules)
+        self.subtotal_thresholds = subtotal_thresholds(self.rules)
+        self._adjustments = {}
+        self._timed_breakdown = None
+
+    def to_dict(self):
+        """
+        Retorna una copia modificable y serializable de las tablas
+
+        Returns:
+            dict: Versión, planes y precios de características
+        """
+        return {
+            "version": self.version,
+            "plans": {plan: dict(details, benefits=list(details["benefits"]))
+                      for plan, details in self.plans.items()},
+            "additional_features": dict(self.additional_features),
+            "premium_features": dict(self.premium_features),
+        }
+
+    def pricing_members(self, num_members):
+        """
+        Retorna el menor número de miembros que recibe los mismos ajustes
+
+        Dos grupos con el mismo valor tienen el mismo precio para cualquier
+        selección, así que sirve como llave de caché.
+
+        Args:
+            num_members: Número de miembros
+
+        Returns:
+            int: Mínimo de miembros de las reglas que alcanza el grupo (o 1)
+        """
+        reached = bisect.bisect_right(self.member_thresholds, num_members)
+        return max(1, self.member_thresholds[reached - 1]) if reached else 1
+
+    def adjustment_cents(self, name, amount, num_members, has_premium):
+        """
+        Calcula un solo ajuste aplicando a un monto solo las reglas de su tipo
+
+        Args:
+            name: "group_discount", "special_discount" o "premium_surcharge"
+            amount: Monto en centavos
+            num_members: Número de miembros
+            has_premium: True si hay características premium
+
+        Returns:
+            Cents: Ajuste en centavos
+        """
+        program = self._adjustments.get(name)
+        if program is None:
+            program = self._adjustments[name] = compile_rules(
+                self.rules, cents=True, breakdown=True, kinds=ADJUSTMENT_KINDS[name])
+        return Cents(program(amount, num_members, has_premium)[list(ADJUSTMENT_KINDS).index(name)])
+
+    def timed_breakdown_cents(self, subtotal, num_members, has_premium, timer):
+        """
+        Calcula el mismo desglose que price_breakdown_cents midiendo cada ajuste
+
+        La función medida se compila la primera vez que se usa, así que la
+        instrumentación no encarece la publicación de un catálogo.
+
+        Args:
+            subtotal: Subtotal en centavos
+            num_members: Número de miembros
+            has_premium: True si hay características premium
+            timer: Función que se llama con el nombre de cada ajuste al terminar
+                   sus reglas
+
+        Returns:
+            tuple: (descuentos porcentuales, descuentos fijos, recargos, total)
+        """
+        program = self._timed_breakdown
+        if program is None:
+            program = self._timed_breakdown = compile_rules(
+                self.rules, cents=True, breakdown=True, timed=True)
+        return program(subtotal, num_members, has_premium, timer)
+
+    def applied_rules(self, name, amount, num_members, has_premium):
+        """
+        Retorna las reglas que aplica adjustment_cents() con los mismos argumentos
+
+        Args:
+            name: "group_discount", "special_discount" o "premium_surcharge"
+            amount: Monto en centavos
+            num_members: Número de miembros
+            has_premium: True si hay características premium
+
+        Returns:
+            list: PricingRule aplicadas, en orden
+        """
+        return applied_rules(self.rules, amount, num_members, has_premium,
+                             ADJUSTMENT_KINDS[name])
+
+    def validate(self, plan, additional_features=(), premium_features=(), num_members=1):
+        """
+        Verifica que una selección exista en el catálogo
+
+        Args:
+            plan: Nombre del plan
+            additional_features: Características adicionales
+            premium_features: Características premium
+            num_members: Número de miembros
+
+        Raises:
+            ValueError: Si algún nombre no existe en el catálogo o los miembros son inválidos
+        """
+        if plan not in self.plans:
+            raise ValueError(f"El plan '{plan}' no está disponible.")
+        if num_members < 1:
+            raise ValueError("El número de miembros debe ser al menos 1.")
+        for feature in additional_features:
+            if feature not in self.additional_features:
+                raise ValueError(f"La característica '{feature}' no está disponible.")
+        for feature in premium_features:
+            if feature not in self.premium_features:
+                raise ValueError(f"La característica premium '{feature}' no está disponible.")
+
+    def _subtotal_cents(self, plan, additional_features, premium_features, num_members):
+        """
+        Valida una selección sin repetidos y suma sus costos en centavos
+
+        Returns:
+            tuple: (costo base, costo adicional, costo premium) en centavos
+        """
+        self.validate(plan, additional_features, premium_features, num_members)
+        additional_cost = 0
+        for feature in additional_features:
+            additional_cost += self.additional_cents[feature]
+        premium_cost = 0
+        for feature in premium_features:
+            premium_cost += self.premium_cents[feature]
+        return self.plan_cents[plan], additional_cost, premium_cost
+
+    def quote(self, plan, additional_features=(), premium_features=(), num_members=1):
+        """
+        Cotiza una membresía con los precios y las reglas de este catálogo
+
+        Args:
+            plan: Nombre del plan
+            additional_features: Características adicionales
+            premium_features: Características premium
+            num_members: Número de miembros
+
+        Returns:
+            QuoteBreakdown: Desglose de la cotización
+
+        Raises:
+            ValueError: Si algún nombre no existe en el catálogo o los miembros son inválidos
+        """
+        additional_features = distinct_features(additional_features)
+        premium_features = distinct_features(premium_features)
+        return build_quote(
+            plan, num_members, additional_features, premium_features,
+            *self._subtotal_cents(plan, additional_features, premium_features, num_members),
+            catalog=self, in_cents=True,
+        )
+
+    def total(self, plan, additional_features=(), premium_features=(), num_members=1):
+        """
+        Calcula solo el total con la función compilada de las reglas del catálogo
+
+        Args:
+            plan: Nombre del plan
+            additional_features: Características adicionales
+            premium_features: Características premium
+            num_members: Número de miembros
+
+        Returns:
+            float: Total en dólares
+        """
+        return self.total_cents(plan, additional_features, premium_features, num_members) / 100
+
+    def total_cents(self, plan, additional_features=(), premium_features=(), num_members=1):
+        """
+        Calcula solo el total en centavos con la función compilada de las reglas
+
+        Returns:
+            Cents: Total en centavos
+        """
+        costs = self._subtotal_cents(plan, distinct_features(additional_features),
+                                     distinct_features(premium_features), num_members)
+        return Cents(self.price_total_cents(sum(costs), num_members, len(premium_features) > 0))
+
+    def quote_cents(self, plan, additional_features=(), premium_features=(), num_members=1):
+        """
+        Cotiza una membresía con aritmética exacta en centavos
+
+        Args:
+            plan: Nombre del plan
+            additional_features: Características adicionales
+            premium_features: Características premium
+            num_members: Número de miembros
+
+        Returns:
+            CentsBreakdown: Desglose de la cotización en centavos
+
+        Raises:
+            ValueError: Si algún nombre no existe en el catálogo o los miembros son inválidos
+        """
+        additional_features = distinct_features(additional_features)
+        premium_features = distinct_features(premium_features)
+        return build_quote_cents(
+            plan, num_members, additional_features, premium_features,
+            *self._subtotal_cents(plan, additional_features, premium_features, num_members),
+            self,
+        )
+
+
+_lock = threading.Lock()
+_current = Catalog(1, DEFAULT_MEMBERSHIP_PLANS, DEFAULT_ADDITIONAL_FEATURES,
+                   DEFAULT_PREMIUM_FEATURES)
+
+
+def current_catalog():
+    """
+    Retorna el catálogo vigente
+
+    Returns:
+        Catalog: Catálogo vigente
+    """
+    return _current
+
+
+def reload_catalog(plans=None, additional_features=None, premium_features=None, rules=None):
+    """
+    Publica una nueva versión del catálogo
+
+    Las tablas omitidas se copian de la versión vigente. Las tablas de
+    clase de GymMembership son vistas de esta misma referencia, así que la
+    ruta interactiva ve la nueva versión completa o ninguna parte de ella.
+
+    Args:
+        plans: Nuevos planes (opcional)
+        additional_features: Nuevos precios adicionales (opcional)
+        premium_features: Nuevos precios premium (opcional)
+        rules: Nueva tabla de reglas (opcional)
+
+    Returns:
+        Catalog: Nueva versión del catálogo
+    """
+    global _current
+    # El candado solo ordena a los escritores; los lectores nunca lo toman
+    with _lock:
+        previous = _current
+        catalog = Catalog(
+            previous.version + 1,
+            previous.plans if plans is None else plans,
+            previous.additional_features if additional_features is None
+            else additional_features,
+            previous.premium_features if premium_features is None else premium_features,
+            previous.rules if rules is None else rules,
+        )
+        # Publicación atómica: una sola asignación de referencia
+        _current = catalog
+    return catalog
+
+
+def load_catalog(path):
+    """
+    Recarga el catálogo desde un archivo JSON
+
+    El archivo puede contener las llaves "plans", "additional_features"
+    y "premium_features"; las que falten conservan sus precios.
+
+    Args:
+        path: Ruta del archivo JSON
+
+    Returns:
+        Catalog: Nueva versión del catálogo
+    """
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    return reload_catalog(
+        data.get("plans"),
+        data.get("additional_features"),
+        data.get("premium_features"),
+    )
+
+
+class QuoteCache:
+    """Caché LRU de cotizaciones ligada a la versión del catálogo"""
+
+    def __init__(self, maxsize=1024):
+        """
+        Inicializa la caché
+
+        Args:
+            maxsize: Número máximo de cotizaciones guardadas
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(catalog, plan, additional_features, premium_features, num_members):
+        """Llave de una selección sin repetidos"""
+        # El precio solo depende de cuántos mínimos de miembros de las reglas alcanza el grupo
+        return (catalog.version, plan, tuple(sorted(additional_features)),
+                tuple(sorted(premium_features)), catalog.pricing_members(num_members))
+
+    def get(self, plan, additional_features=(), premium_features=(), num_members=1,
+            catalog=None):
+        """
+        Busca una cotización guardada sin calcularla
+
+        Args:
+            plan: Nombre del plan
+            additional_features: Características adicionales
+            premium_features: Características premium
+            num_members: Número de miembros
+            catalog: Catálogo a usar (por defecto el vigente)
+
+        Returns:
+            QuoteBreakdown: Desglose de la selección, o None si no está guardado
+        """
+        if catalog is None:
+            catalog = current_catalog()
+        additional_features = distinct_features(additional_features)
+        premium_features = distinct_features(premium_features)
+        key = self._key(catalog, plan, additional_features, premium_features, num_members)
+        with self._lock:
+            if self._version != catalog.version:
+                self._entries.clear()
+                self._version = catalog.version
+            breakdown = self._entries.get(key)
+            if breakdown is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return breakdown._replace(
+            num_members=num_members,
+            additional_features=additional_features,
+            premium_features=premium_features,
+        )
+
+    def put(self, breakdown, catalog):
+        """
+        Guarda una cotización calculada fuera de la caché (cuenta como fallo)
+
+        Args:
+            breakdown: QuoteBreakdown calculado con catalog
+            catalog: Catálogo con que se calculó
+        """
+        key = self._key(catalog, breakdown.plan, breakdown.additional_features,
+                        breakdown.premium_features, breakdown.num_members)
+        with self._lock:
+            self.misses += 1
+            if self._version == catalog.version:
+                self._entries[key] = breakdown
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def quote(self, plan, additional_features=(), premium_features=(), num_members=1,
+              catalog=None):
+        """
+        Cotiza una membresía reutilizando resultados anteriores
+
+        Args:
+            plan: Nombre del plan
+            additional_features: Características adicionales
+            premium_features: Características premium
+            num_members: Número de miembros
+            catalog: Catálogo a usar (por defecto el vigente)
+
+        Returns:
+            QuoteBreakdown: Desglose de la cotización
+        """
+        if catalog is None:
+            catalog = current_catalog()
+        breakdown = self.get(plan, additional_features, premium_features, num_members, catalog)
+        if breakdown is None:
+            breakdown = catalog.quote(plan, additional_features, premium_features, num_members)
+            self.put(breakdown, catalog)
+        return breakdown
+
+    def clear(self):
+        """Vacía la caché y reinicia los contadores"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """
+        Retorna las estadísticas de la caché
+
+        Returns:
+            dict: Aciertos, fallos, tamaño actual y versión del catálogo
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "version": self._version,
+            }
@@ -0,0 +1,122 @@
+"""
+Cliente ligero del servicio residente de cotización
+Solo usa la biblioteca estándar mínima para arrancar rápido en los kioscos
+"""
+
+import json
+import os
+import socket
+import sys
+
+# Nombre del socket dentro del directorio de ejecución del usuario
+SOCKET_NAME = "gym_membership.sock"
+
+
+def default_socket_path():
+    """
+    Retorna la ruta del socket del servicio
+
+    Usa GYM_SOCKET si está definida; si no, el directorio de ejecución del
+    usuario (XDG_RUNTIME_DIR) o, en su defecto, un directorio propio del
+    usuario dentro del directorio temporal.
+
+    Returns:
+        str: Ruta del socket Unix
+    """
+    path = os.environ.get("GYM_SOCKET")
+    if path:
+        return path
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        os.environ.get("TMPDIR", "/tmp"), f"gym-{os.getuid()}")
+    return os.path.join(runtime, SOCKET_NAME)
+
+
+DEFAULT_SOCKET = default_socket_path()
+
+USAGE = """Uso:
+  gym_client.py catalog
+  gym_client.py quote PLAN [MIEMBROS] [ADICIONALES] [PREMIUM]
+  gym_client.py confirm PLAN [MIEMBROS] [ADICIONALES] [PREMIUM]
+
+Las características se separan con punto y coma.
+El socket se toma de la variable de entorno GYM_SOCKET o del directorio
+de ejecución del usuario (XDG_RUNTIME_DIR)."""
+
+
+def request(message, path=DEFAULT_SOCKET, timeout=5.0):
+    """
+    Envía una solicitud al servicio y espera su respuesta
+
+    Args:
+        message: Diccionario de la solicitud
+        path: Ruta del socket Unix
+        timeout: Segundos máximos de espera
+
+    Returns:
+        dict: Respuesta del servicio
+
+    Raises:
+        OSError: Si no se pudo conectar o la conexión falló
+        ValueError: Si la respuesta está vacía o incompleta
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(json.dumps(message).encode() + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
+
+
+def build_message(args):
+    """
+    Convierte los argumentos de la línea de comandos en una solicitud
+
+    Args:
+        args: Lista de argumentos sin el nombre del programa
+
+    Returns:
+        dict: Solicitud para el servicio
+    """
+    if not args or args[0] not in ("catalog", "quote", "confirm"):
+        raise ValueError(USAGE)
+    operation = args[0]
+    if operation == "catalog":
+        return {"op": "catalog"}
+    if len(args) < 2:
+        raise ValueError(USAGE)
+    fields = ["plan", "members", "additional_features", "premium_features"]
+    message = {"op": operation}
+    message.update(zip(fields, args[1:]))
+    return message
+
+
+def main(argv=None):
+    """
+    Ejecuta una solicitud y muestra la respuesta
+
+    Returns:
+        int: 0 si el servicio respondió ok, 1 si no
+    """
+    try:
+        message = build_message(sys.argv[1:] if argv is None else argv)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    try:
+        response = request(message)
+    except (OSError, ValueError) as error:
+        # ValueError: respuesta vacía o cortada (el servicio se detuvo a la mitad)
+        print(f"Error: no se pudo conectar con el servicio ({error}).", file=sys.stderr)
+        return 1
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Representación compacta de membresías
+Planes como códigos enteros y características como máscaras de bits
+"""
+
+from array import array
+
+from gym_catalog import current_catalog
+from gym_membership import GymMembership
+
+# Código reservado para membresías sin plan seleccionado
+NO_PLAN = 0
+# Las máscaras se guardan en enteros sin signo de 32 bits
+MAX_FEATURES = 32
+
+
+class MembershipCodec:
+    """Traduce nombres de plan y características a códigos y máscaras"""
+
+    def __init__(self, catalog=None):
+        """
+        Inicializa el codificador con el orden de un catálogo
+
+        Args:
+            catalog: Catálogo a usar (por defecto el vigente)
+        """
+        if catalog is None:
+            catalog = current_catalog()
+        if (len(catalog.additional_features) > MAX_FEATURES
+                or len(catalog.premium_features) > MAX_FEATURES):
+            raise ValueError(f"Se admiten como máximo {MAX_FEATURES} características por tipo.")
+        self._set_tables(catalog.version, catalog.plans,
+                         catalog.additional_features, catalog.premium_features)
+
+    @classmethod
+    def from_tables(cls, version, plans, additional_features, premium_features):
+        """
+        Crea un codificador a partir de los nombres en orden de código
+
+        Permite leer datos guardados con una versión anterior del catálogo.
+
+        Args:
+            version: Versión del catálogo de origen
+            plans: Nombres de los planes (el código 1 es el primero)
+            additional_features: Nombres de las características adicionales
+            premium_features: Nombres de las características premium
+
+        Returns:
+            MembershipCodec: Codificador con esas tablas
+        """
+        codec = cls.__new__(cls)
+        codec._set_tables(version, plans, additional_features, premium_features)
+        return codec
+
+    def _set_tables(self, version, plans, additional_features, premium_features):
+        """Guarda las tablas de nombres y sus códigos"""
+        self.version = version
+        self.plans = [None] + list(plans)
+        self.additional_features = list(additional_features)
+        self.premium_features = list(premium_features)
+        self._plan_codes = {plan: code for code, plan in enumerate(self.plans) if plan}
+        self._additional_bits = {f: 1 << i for i, f in enumerate(self.additional_features)}
+        self._premium_bits = {f: 1 << i for i, f in enumerate(self.premium_features)}
+
+    def plan_code(self, plan):
+        """
+        Retorna el código de un plan
+
+        Args:
+            plan: Nombre del plan (o None)
+
+        Returns:
+            int: Código del plan, NO_PLAN si no hay plan
+        """
+        if plan is None:
+            return NO_PLAN
+        if plan not in self._plan_codes:
+            raise ValueError(f"El plan '{plan}' no está disponible.")
+        return self._plan_codes[plan]
+
+    @staticmethod
+    def _encode(features, bits, kind):
+        """Convierte una lista de características en máscara de bits"""
+        mask = 0
+        for feature in features:
+            if feature not in bits:
+                raise ValueError(f"La característica {kind} '{feature}' no está disponible.")
+            mask |= bits[feature]
+        return mask
+
+    @staticmethod
+    def _decode(mask, names):
+        """Convierte una máscara de bits en lista de características"""
+        return [name for i, name in enumerate(names) if mask >> i & 1]
+
+    def additional_mask(self, features):
+        """Retorna la máscara de las características adicionales"""
+        return self._encode(features, self._additional_bits, "adicional")
+
+    def premium_mask(self, features):
+        """Retorna la máscara de las características premium"""
+        return self._encode(features, self._premium_bits, "premium")
+
+    def additional_names(self, mask):
+        """Retorna los nombres de las características adicionales de una máscara"""
+        return self._decode(mask, self.additional_features)
+
+    def premium_names(self, mask):
+        """Retorna los nombres de las características premium de una máscara"""
+        return self._decode(mask, self.premium_features)
+
+
+class CompactMembership:
+    """Membresía compacta sin __dict__ por instancia"""
+
+    __slots__ = ("plan_code", "additional_mask", "premium_mask", "num_members")
+
+    def __init__(self, plan_code=NO_PLAN, additional_mask=0, premium_mask=0, num_members=1):
+        """
+        Inicializa la membresía compacta
+
+        Args:
+            plan_code: Código del plan
+            additional_mask: Máscara de características adicionales
+            premium_mask: Máscara de características premium
+            num_members: Número de miembros
+        """
+        self.plan_code = plan_code
+        self.additional_mask = additional_mask
+        self.premium_mask = premium_mask
+        self.num_members = num_members
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactMembership):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    def __repr__(self):
+        return (f"CompactMembership(plan_code={self.plan_code}, "
+                f"additional_mask={self.additional_mask}, "
+                f"premium_mask={self.premium_mask}, num_members={self.num_members})")
+
+    def astuple(self):
+        """Retorna los cuatro campos como tupla"""
+        return (self.plan_code, self.additional_mask, self.premium_mask, self.num_members)
+
+    @classmethod
+    def from_membership(cls, gym, codec):
+        """
+        Crea una membresía compacta a partir de un GymMembership
+
+        Args:
+            gym: Membresía a convertir
+            codec: Codificador del catálogo
+
+        Returns:
+            CompactMembership: Membresía compacta
+        """
+        return cls(
+            codec.plan_code(gym.selected_plan),
+            codec.additional_mask(gym.additional_features),
+            codec.premium_mask(gym.premium_features),
+            gym.num_members,
+        )
+
+    def to_membership(self, codec):
+        """
+        Reconstruye el GymMembership, con las características en orden de catálogo
+
+        Args:
+            codec: Codificador del catálogo
+
+        Returns:
+            GymMembership: Membresía equivalente
+        """
+        return GymMembership.from_selection(
+            codec.plans[self.plan_code],
+            codec.additional_names(self.additional_mask),
+            codec.premium_names(self.premium_mask),
+            self.num_members,
+        )
+
+
+class MembershipColumns:
+    """Contenedor columnar de muchas membresías en buffers de array"""
+
+    def __init__(self, codec=None):
+        """
+        Inicializa las columnas vacías
+
+        Args:
+            codec: Codificador del catálogo (por defecto el vigente)
+        """
+        self.codec = codec or MembershipCodec()
+        self.plan_codes = array('B')
+        self.additional_masks = array('I')
+        self.premium_masks = array('I')
+        self.num_members = array('I')
+
+    def __len__(self):
+        return len(self.plan_codes)
+
+    def __getitem__(self, index):
+        return CompactMembership(
+            self.plan_codes[index],
+            self.additional_masks[index],
+            self.premium_masks[index],
+            self.num_members[index],
+        )
+
+    def __iter__(self):
+        for row in zip(self.plan_codes, self.additional_masks,
+                       self.premium_masks, self.num_members):
+            yield CompactMembership(*row)
+
+    def append(self, compact):
+        """
+        Agrega una membresía compacta
+
+        Args:
+            compact: Membresía compacta
+        """
+        self.plan_codes.append(compact.plan_code)
+        self.additional_masks.append(compact.additional_mask)
+        self.premium_masks.append(compact.premium_mask)
+        self.num_members.append(compact.num_members)
+
+    def append_membership(self, gym):
+        """
+        Agrega un GymMembership a las columnas
+
+        Args:
+            gym: Membresía a agregar
+        """
+        self.append(CompactMembership.from_membership(gym, self.codec))
+
+    def membership(self, index):
+        """
+        Reconstruye la membresía de una fila
+
+        Args:
+            index: Fila a reconstruir
+
+        Returns:
+            GymMembership: Membresía equivalente
+        """
+        return self[index].to_membership(self.codec)
+
+    def memberships(self):
+        """Genera todas las membresías como GymMembership"""
+        for compact in self:
+            yield compact.to_membership(self.codec)
+
+    @classmethod
+    def from_memberships(cls, memberships, codec=None):
+        """
+        Crea las columnas a partir de varias membresías
+
+        Args:
+            memberships: Iterable de GymMembership
+            codec: Codificador del catálogo (por defecto el vigente)
+
+        Returns:
+            MembershipColumns: Columnas con todas las membresías
+        """
+        columns = cls(codec)
+        for gym in memberships:
+            columns.append_membership(gym)
+        return columns
+
+    def nbytes(self):
+        """Retorna los bytes ocupados por los buffers de las columnas"""
+        return sum(column.itemsize * len(column) for column in (
+            self.plan_codes, self.additional_masks, self.premium_masks, self.num_members))
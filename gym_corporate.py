@@ -0,0 +1,128 @@
+"""
+Inscripción corporativa masiva
+Precios por volumen para cuentas con miles de empleados, cotizadas en una
+sola pasada y entregadas como líneas por empleado
+"""
+
+from collections import namedtuple
+
+from gym_catalog import current_catalog
+from gym_money import Cents
+from gym_rules import PERCENT_DISCOUNT, PricingRule, compile_rules
+
+# Descuento por volumen (mínimo de empleados, tasa), del mayor al menor.
+# El primer escalón coincide con el descuento grupal individual.
+VOLUME_TIERS = ((1000, 0.20), (250, 0.15), (50, 0.12), (2, 0.10))
+
+# Línea de cotización de un empleado, con montos en centavos
+LineItem = namedtuple("LineItem", [
+    "employee",
+    "plan",
+    "additional_features",
+    "premium_features",
+    "subtotal",
+    "volume_discount",
+    "special_discount",
+    "premium_surcharge",
+    "total",
+])
+
+
+def volume_discount_rate(headcount, tiers=VOLUME_TIERS):
+    """
+    Retorna la tasa de descuento por volumen de una cuenta
+
+    Args:
+        headcount: Número de empleados inscritos
+        tiers: Escalones (mínimo de empleados, tasa), del mayor al menor
+
+    Returns:
+        float: Tasa de descuento (0 si no alcanza ningún escalón)
+    """
+    for minimum, rate in tiers:
+        if headcount >= minimum:
+            return rate
+    return 0.0
+
+
+def volume_rules(rules, rate):
+    """
+    Adapta la tabla de reglas de un catálogo a una cuenta corporativa
+
+    Los descuentos porcentuales que dependen del número de miembros se
+    reemplazan por un único descuento por volumen, en la posición del primero;
+    el resto de las reglas se conserva.
+
+    Args:
+        rules: Tabla de PricingRule del catálogo
+        rate: Tasa de descuento por volumen (0 para no agregarlo)
+
+    Returns:
+        tuple: Tabla de reglas de la cuenta
+    """
+    grouped = [rule for rule in rules
+               if rule.kind == PERCENT_DISCOUNT and rule.min_members is not None]
+    kept = [rule for rule in rules if rule not in grouped]
+    if rate:
+        order = min((rule.order for rule in grouped), default=0)
+        kept.append(PricingRule("volume_discount", PERCENT_DISCOUNT, rate, order=order))
+    return tuple(kept)
+
+
+def price_roster(roster, headcount=None, catalog=None, tiers=VOLUME_TIERS, totals=None):
+    """
+    Cotiza la nómina de una cuenta corporativa
+
+    El escalón de volumen se fija con el total de empleados y las reglas del
+    catálogo, adaptadas con volume_rules, se compilan una vez por nómina. Cada
+    empleado se cotiza como inscripción individual y cada selección distinta
+    de plan y características se cotiza una sola vez; las líneas se generan a
+    medida que se recorre la nómina.
+
+    Args:
+        roster: Iterable de (empleado, plan, características adicionales,
+                características premium)
+        headcount: Total de empleados (por defecto len(roster))
+        catalog: Catálogo a usar (por defecto el vigente)
+        tiers: Escalones de descuento por volumen
+        totals: Diccionario donde se acumulan los totales de la cuenta (opcional);
+                los montos quedan como Cents al terminar la nómina
+
+    Yields:
+        LineItem: Línea de cada empleado, en el orden de la nómina
+
+    Raises:
+        ValueError: Si un empleado tiene un plan o característica inexistente
+    """
+    if headcount is None:
+        headcount = len(roster)
+    if catalog is None:
+        catalog = current_catalog()
+    price = compile_rules(volume_rules(catalog.rules, volume_discount_rate(headcount, tiers)),
+                          cents=True, breakdown=True)
+    if totals is None:
+        totals = {}
+    amount_keys = ("subtotal", "volume_discount", "special_discount", "premium_surcharge", "total")
+    totals.update(dict.fromkeys(amount_keys, 0), lines=0, distinct_selections=0)
+    amounts = {}
+
+    for employee, plan, additional_features, premium_features in roster:
+        additional_features = tuple(dict.fromkeys(additional_features))
+        premium_features = tuple(dict.fromkeys(premium_features))
+        key = (plan, frozenset(additional_features), frozenset(premium_features))
+        line = amounts.get(key)
+        if line is None:
+            try:
+                subtotal = catalog.quote_cents(plan, additional_features, premium_features, 1).subtotal
+            except ValueError as error:
+                raise ValueError(f"Empleado {employee}: {error}") from None
+            volume, special, surcharge, total = price(subtotal, 1, len(premium_features) > 0)
+            line = (Cents(subtotal), Cents(volume), Cents(special), Cents(surcharge), Cents(total))
+            amounts[key] = line
+            totals["distinct_selections"] += 1
+        totals["lines"] += 1
+        for name, amount in zip(amount_keys, line):
+            totals[name] += amount
+        yield LineItem(employee, plan, additional_features, premium_features, *line)
+    for name in amount_keys:
+        totals[name] = Cents(totals[name])
@@ -0,0 +1,39 @@
+"""
+Tablas de precios y reglas por defecto
+Módulo sin dependencias: lo importan el catálogo, las reglas y GymMembership
+"""
+
+# Reglas de precios por defecto
+GROUP_DISCOUNT_MIN_MEMBERS = 2
+GROUP_DISCOUNT_RATE = 0.10
+# Umbrales de oferta especial (umbral, descuento), del mayor al menor
+SPECIAL_OFFERS = ((400, 50), (200, 20))
+PREMIUM_SURCHARGE_RATE = 0.15
+
+# Tablas de precios por defecto; las vigentes se publican en gym_catalog
+DEFAULT_MEMBERSHIP_PLANS = {
+    "Basic": {
+        "cost": 50,
+        "benefits": ["Acceso a área de pesas", "Vestidores"]
+    },
+    "Premium": {
+        "cost": 100,
+        "benefits": ["Acceso a área de pesas", "Vestidores", "Sauna", "Piscina"]
+    },
+    "Family": {
+        "cost": 150,
+        "benefits": ["Acceso familiar hasta 4 personas", "Todas las áreas", "Clases grupales incluidas"]
+    }
+}
+
+DEFAULT_ADDITIONAL_FEATURES = {
+    "Personal Training": 40,
+    "Group Classes": 25,
+    "Nutrition Consultation": 30,
+    "Locker Rental": 10
+}
+
+DEFAULT_PREMIUM_FEATURES = {
+    "Exclusive Gym Access": 80,
+    "Specialized Training Program": 60
+}
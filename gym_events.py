@@ -0,0 +1,345 @@
+"""
+Sesiones de membresía con registro de eventos
+Cada cambio de una sesión se agrega a un log binario; las instantáneas
+periódicas acotan el tiempo de reconstrucción
+"""
+
+import os
+import struct
+
+from gym_catalog import current_catalog
+from gym_compact import CompactMembership, MembershipCodec
+from gym_ledger import encode_header, read_header
+from gym_membership import GymMembership
+
+MAGIC = b"GYME"
+# Versión del formato de los eventos, independiente de la del libro
+FORMAT_VERSION = 1
+SNAPSHOT_MAGIC = b"GYMS"
+# Evento: sesión, operación y argumento (código de plan, bit de la
+# característica o número de miembros)
+EVENT = struct.Struct("<IBI")
+# Instantánea: firma, eventos incluidos y número de sesiones
+SNAPSHOT_HEADER = struct.Struct("<4sQI")
+SNAPSHOT_RECORD = struct.Struct("<IIIII")
+DEFAULT_SNAPSHOT_EVERY = 100000
+# Eventos leídos por bloque al reconstruir
+_READ_EVENTS = 8192
+
+SELECT_PLAN = 1
+ADD_ADDITIONAL = 2
+REMOVE_ADDITIONAL = 3
+ADD_PREMIUM = 4
+REMOVE_PREMIUM = 5
+SET_MEMBERS = 6
+
+
+def _apply(state, session_id, operation, argument):
+    """Aplica un evento al estado compacto de una sesión"""
+    compact = state.get(session_id)
+    if compact is None:
+        compact = state[session_id] = CompactMembership()
+    if operation == SELECT_PLAN:
+        compact.plan_code = argument
+    elif operation == ADD_ADDITIONAL:
+        compact.additional_mask |= 1 << argument
+    elif operation == REMOVE_ADDITIONAL:
+        compact.additional_mask &= ~(1 << argument)
+    elif operation == ADD_PREMIUM:
+        compact.premium_mask |= 1 << argument
+    elif operation == REMOVE_PREMIUM:
+        compact.premium_mask &= ~(1 << argument)
+    elif operation == SET_MEMBERS:
+        compact.num_members = argument
+    else:
+        raise ValueError(f"Operación de evento desconocida: {operation}")
+
+
+def _snapshot_path(path):
+    """Ruta de la instantánea de un log"""
+    return path + ".snapshot"
+
+
+def _load_snapshot(path, session_id=None):
+    """
+    Lee la instantánea de un log
+
+    Returns:
+        tuple: (eventos incluidos, estado por sesión), o (0, {}) si no hay
+               o no tiene el número de sesiones de su encabezado
+    """
+    try:
+        with open(_snapshot_path(path), "rb") as stream:
+            data = stream.read()
+    except FileNotFoundError:
+        return 0, {}
+    if len(data) < SNAPSHOT_HEADER.size:
+        return 0, {}
+    magic, events, sessions = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("La instantánea no tiene el formato esperado.")
+    if len(data) != SNAPSHOT_HEADER.size + sessions * SNAPSHOT_RECORD.size:
+        # Instantánea incompleta: se reproduce el log completo
+        return 0, {}
+    state = {}
+    for record in SNAPSHOT_RECORD.iter_unpack(data[SNAPSHOT_HEADER.size:]):
+        if session_id is None or record[0] == session_id:
+            state[record[0]] = CompactMembership(*record[1:])
+    return events, state
+
+
+def _recover(path, session_id=None):
+    """
+    Reconstruye el estado desde la instantánea y los eventos posteriores
+
+    Returns:
+        tuple: (codec, posición del primer evento, estado, eventos en el log,
+                eventos aplicados después de la instantánea)
+    """
+    codec, data_offset = read_header(path, MAGIC, EVENT.size, FORMAT_VERSION)
+    count = (os.path.getsize(path) - data_offset) // EVENT.size
+    snapshot_events, state = _load_snapshot(path, session_id)
+    if snapshot_events > count:
+        # El log perdió eventos que la instantánea ya incluía: se reproduce todo
+        snapshot_events, state = 0, {}
+    with open(path, "rb") as stream:
+        stream.seek(data_offset + snapshot_events * EVENT.size)
+        remaining = count - snapshot_events
+        while remaining:
+            block = stream.read(min(remaining, _READ_EVENTS) * EVENT.size)
+            for event in EVENT.iter_unpack(block):
+                if session_id is None or event[0] == session_id:
+                    _apply(state, *event)
+            remaining -= len(block) // EVENT.size
+    return codec, data_offset, state, count, count - snapshot_events
+
+
+def rebuild(path, session_id=None):
+    """
+    Reconstruye las sesiones de un log sin abrirlo para escribir
+
+    Args:
+        path: Ruta del log
+        session_id: Sesión a reconstruir (por defecto todas)
+
+    Returns:
+        dict: Sesión -> CompactMembership, o la CompactMembership de session_id
+
+    Raises:
+        KeyError: Si la sesión no tiene eventos
+    """
+    state = _recover(path, session_id)[2]
+    return state if session_id is None else state[session_id]
+
+
+class RecordedMembership(GymMembership):
+    """
+    GymMembership que registra cada cambio como evento
+
+    El evento se codifica y se agrega al log antes de aplicar el cambio, así
+    que un nombre que el log no puede codificar no deja la membresía
+    modificada. Los cambios que no modifican nada (agregar una
+    característica que ya estaba, repetir el plan o los miembros) no se
+    registran.
+    """
+
+    def __init__(self, log=None, session_id=None):
+        """
+        Inicializa la sesión
+
+        Args:
+            log: EventLog donde se registran los cambios (None no registra)
+            session_id: Identificador de la sesión en el log
+        """
+        super().__init__()
+        self.log = log
+        self.session_id = session_id
+
+    def _record(self, operation, argument):
+        """Codifica y agrega el evento; argument recibe el log y retorna el argumento"""
+        if self.log is not None:
+            self.log.record(self.session_id, operation, argument(self.log))
+
+    def select_membership_plan(self, plan_name):
+        if plan_name != self.selected_plan and plan_name in current_catalog().plans:
+            self._record(SELECT_PLAN, lambda log: log.codec.plan_code(plan_name))
+        return super().select_membership_plan(plan_name)
+
+    def add_additional_feature(self, feature_name):
+        catalog = current_catalog()
+        if feature_name in catalog.additional_cents \
+                and feature_name not in self.additional_features:
+            # Si falla, falla antes de registrar el evento
+            self._sync_feature_costs(catalog)
+            self._record(ADD_ADDITIONAL, lambda log: log.additional_bit(feature_name))
+        return super().add_additional_feature(feature_name)
+
+    def remove_additional_feature(self, feature_name):
+        if feature_name in self.additional_features:
+            self._record(REMOVE_ADDITIONAL, lambda log: log.additional_bit(feature_name))
+        return super().remove_additional_feature(feature_name)
+
+    def add_premium_feature(self, feature_name):
+        catalog = current_catalog()
+        if feature_name in catalog.premium_cents \
+                and feature_name not in self.premium_features:
+            self._sync_feature_costs(catalog)
+            self._record(ADD_PREMIUM, lambda log: log.premium_bit(feature_name))
+        return super().add_premium_feature(feature_name)
+
+    def remove_premium_feature(self, feature_name):
+        if feature_name in self.premium_features:
+            self._record(REMOVE_PREMIUM, lambda log: log.premium_bit(feature_name))
+        return super().remove_premium_feature(feature_name)
+
+    def set_number_of_members(self, num):
+        if num >= 1 and num != self.num_members:
+            self._record(SET_MEMBERS, lambda log: num)
+        return super().set_number_of_members(num)
+
+
+class EventLog:
+    """Log de eventos de sesiones, solo agrega al final, con instantáneas"""
+
+    def __init__(self, path, codec=None, snapshot_every=DEFAULT_SNAPSHOT_EVERY):
+        """
+        Abre (o crea) el log y recupera el estado de todas las sesiones
+
+        Al abrir un log existente se descarta un evento incompleto al final y
+        se reproducen solo los eventos posteriores a la última instantánea.
+
+        Args:
+            path: Ruta del log
+            codec: Codificador para un log nuevo (por defecto el catálogo vigente)
+            snapshot_every: Eventos entre instantáneas
+        """
+        self.path = path
+        self.snapshot_every = snapshot_every
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self.codec, data_offset, self._state, self._count, self.replayed = _recover(path)
+            end = data_offset + self._count * EVENT.size
+            if os.path.getsize(path) > end:
+                with open(path, "r+b") as stream:
+                    stream.truncate(end)
+            self._stream = open(path, "ab")
+        else:
+            self.codec = codec or MembershipCodec()
+            self._state, self._count, self.replayed = {}, 0, 0
+            self._stream = open(path, "wb")
+            self._stream.write(encode_header(self.codec, MAGIC, EVENT.size, FORMAT_VERSION))
+        self._next_session = max(self._state, default=0) + 1
+        self._since_snapshot = self.replayed
+
+    def __len__(self):
+        return self._count
+
+    def additional_bit(self, feature):
+        """Retorna el bit de una característica adicional"""
+        return self.codec.additional_mask([feature]).bit_length() - 1
+
+    def premium_bit(self, feature):
+        """Retorna el bit de una característica premium"""
+        return self.codec.premium_mask([feature]).bit_length() - 1
+
+    def session(self):
+        """
+        Abre una sesión nueva que registra sus cambios en este log
+
+        Returns:
+            RecordedMembership: Membresía vacía de la sesión
+        """
+        session_id = self._next_session
+        self._next_session += 1
+        return RecordedMembership(self, session_id)
+
+    def restore(self, session_id):
+        """
+        Reconstruye una sesión para continuarla
+
+        Args:
+            session_id: Sesión a reconstruir
+
+        Returns:
+            RecordedMembership: Membresía con el estado de la sesión
+
+        Raises:
+            KeyError: Si la sesión no tiene eventos
+        """
+        compact = self._state[session_id]
+        gym = RecordedMembership.from_selection(
+            self.codec.plans[compact.plan_code],
+            self.codec.additional_names(compact.additional_mask),
+            self.codec.premium_names(compact.premium_mask),
+            compact.num_members,
+        )
+        gym.log = self
+        gym.session_id = session_id
+        return gym
+
+    def state(self, session_id=None):
+        """
+        Retorna el estado compacto de una sesión o de todas
+
+        Args:
+            session_id: Sesión a consultar (por defecto todas)
+
+        Returns:
+            CompactMembership o dict: Estado de la sesión, o copia de todas
+        """
+        if session_id is not None:
+            return self._state[session_id]
+        return dict(self._state)
+
+    def record(self, session_id, operation, argument):
+        """
+        Agrega un evento al log
+
+        Args:
+            session_id: Sesión que cambió
+            operation: Operación (SELECT_PLAN, ADD_ADDITIONAL, ...)
+            argument: Código de plan, bit de característica o número de miembros
+        """
+        # Se agrega antes de aplicarlo: un evento que no se puede codificar
+        # no cambia el estado
+        self._stream.write(EVENT.pack(session_id, operation, argument))
+        _apply(self._state, session_id, operation, argument)
+        self._count += 1
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self):
+        """Guarda el estado de todas las sesiones después de asegurar los eventos"""
+        self.flush(sync=True)
+        temporary = _snapshot_path(self.path) + ".tmp"
+        with open(temporary, "wb") as stream:
+            stream.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self._count, len(self._state)))
+            for session_id, compact in self._state.items():
+                stream.write(SNAPSHOT_RECORD.pack(session_id, *compact.astuple()))
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.replace(temporary, _snapshot_path(self.path))
+        self._since_snapshot = 0
+
+    def flush(self, sync=False):
+        """
+        Vacía el búfer del log
+
+        Args:
+            sync: Si es True, también fuerza la escritura a disco (fsync)
+        """
+        self._stream.flush()
+        if sync:
+            os.fsync(self._stream.fileno())
+
+    def close(self):
+        """Vacía el búfer, sincroniza y cierra el log"""
+        if not self._stream.closed:
+            self.flush(sync=True)
+            self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
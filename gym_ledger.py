@@ -0,0 +1,425 @@
+"""
+Libro binario de membresías confirmadas
+Registros de ancho fijo escritos solo al final y leídos con mmap sin copiar
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+from decimal import ROUND_HALF_DOWN, Decimal
+
+from gym_compact import CompactMembership, MembershipCodec
+from gym_money import Cents
+
+MAGIC = b"GYML"
+FORMAT_VERSION = 2
+# Encabezado: firma, versión del formato, tamaño de registro, versión del
+# catálogo, largo del diccionario JSON y posición del primer registro
+HEADER = struct.Struct("<4sHHIII")
+# Registro: código de plan, máscaras adicional y premium, miembros, total,
+# descuento grupal, descuento especial y recargo premium en centavos; 48
+# bytes, con los montos alineados a 8 bytes
+RECORD = struct.Struct("<IIIIqqqq")
+WORDS_PER_RECORD = RECORD.size // 4
+QUADS_PER_RECORD = RECORD.size // 8
+# Los registros empiezan alineados a este múltiplo
+ALIGNMENT = 8
+
+# Registro decodificado con los nombres del encabezado
+LedgerEntry = namedtuple("LedgerEntry", [
+    "plan",
+    "num_members",
+    "additional_features",
+    "premium_features",
+    "total_cents",
+    "group_discount_cents",
+    "special_discount_cents",
+    "premium_surcharge_cents",
+])
+
+# Montos confirmados de un registro, en Cents
+ConfirmedAmounts = namedtuple("ConfirmedAmounts", [
+    "total",
+    "group_discount",
+    "special_discount",
+    "premium_surcharge",
+])
+
+# Vistas por columna sobre el archivo mapeado
+LedgerColumns = namedtuple("LedgerColumns", [
+    "plan_codes",
+    "additional_masks",
+    "premium_masks",
+    "num_members",
+    "total_cents",
+    "group_discount_cents",
+    "special_discount_cents",
+    "premium_surcharge_cents",
+])
+
+
+def encode_header(codec, magic=MAGIC, record_size=RECORD.size, version=FORMAT_VERSION):
+    """
+    Construye el encabezado versionado de un archivo binario de membresías
+
+    Args:
+        codec: Codificador cuyo diccionario de nombres se guarda
+        magic: Firma de 4 bytes del tipo de archivo
+        record_size: Tamaño de cada registro
+        version: Versión del formato de los registros
+
+    Returns:
+        bytes: Encabezado, rellenado hasta la alineación de los registros
+    """
+    dictionary = json.dumps({
+        "plans": codec.plans[1:],
+        "additional_features": codec.additional_features,
+        "premium_features": codec.premium_features,
+    }, ensure_ascii=False).encode()
+    start = HEADER.size + len(dictionary)
+    data_offset = start + -start % ALIGNMENT
+    header = HEADER.pack(magic, version, record_size, codec.version,
+                         len(dictionary), data_offset)
+    return header + dictionary + bytes(data_offset - start)
+
+
+def decode_header(data, magic=MAGIC, record_size=RECORD.size, version=FORMAT_VERSION):
+    """
+    Lee el encabezado de un archivo binario de membresías
+
+    Args:
+        data: Bytes iniciales del archivo
+        magic: Firma esperada
+        record_size: Tamaño de registro esperado
+        version: Versión del formato esperada
+
+    Returns:
+        tuple: (MembershipCodec con los nombres guardados, posición del primer registro)
+
+    Raises:
+        ValueError: Si el archivo no tiene el formato esperado
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("El archivo no tiene el formato esperado.")
+    found, found_version, found_size, catalog_version, length, data_offset = \
+        HEADER.unpack_from(data)
+    if found != magic:
+        raise ValueError("El archivo no tiene el formato esperado.")
+    if found_version != version or found_size != record_size:
+        raise ValueError(f"Versión de formato no soportada: {found_version}")
+    dictionary = json.loads(bytes(data[HEADER.size:HEADER.size + length]))
+    codec = MembershipCodec.from_tables(
+        catalog_version, dictionary["plans"],
+        dictionary["additional_features"], dictionary["premium_features"])
+    return codec, data_offset
+
+
+def read_header(path, magic=MAGIC, record_size=RECORD.size, version=FORMAT_VERSION):
+    """Lee el encabezado de un archivo existente, ver decode_header()"""
+    with open(path, "rb") as stream:
+        prefix = stream.read(HEADER.size)
+        if len(prefix) == HEADER.size:
+            prefix += stream.read(HEADER.unpack(prefix)[5] - HEADER.size)
+    return decode_header(prefix, magic, record_size, version)
+
+
+def total_to_cents(total):
+    """
+    Convierte un monto de una cotización a centavos enteros
+
+    Args:
+        total: Monto en Cents (CentsBreakdown) o en dólares (QuoteBreakdown)
+
+    Returns:
+        int: Monto en centavos, con medio centavo redondeado hacia abajo
+    """
+    if isinstance(total, Cents):
+        return int(total)
+    return int((Decimal(str(total)) * 100).quantize(Decimal(1), ROUND_HALF_DOWN))
+
+
+def segment_paths(path):
+    """
+    Retorna los segmentos de un libro, del más antiguo al más reciente
+
+    El primer segmento es la ruta del libro; los siguientes agregan ".1",
+    ".2", etc. Cada segmento tiene su propio encabezado.
+
+    Args:
+        path: Ruta del libro
+
+    Returns:
+        list: Rutas de los segmentos existentes
+    """
+    paths = []
+    while os.path.exists(_segment_path(path, len(paths))):
+        paths.append(_segment_path(path, len(paths)))
+    return paths
+
+
+def _segment_path(path, number):
+    """Ruta del segmento número number de un libro"""
+    return path if number == 0 else f"{path}.{number}"
+
+
+def _same_names(first, second):
+    """True si dos codificadores tienen los mismos nombres en el mismo orden"""
+    return ((first.plans, first.additional_features, first.premium_features)
+            == (second.plans, second.additional_features, second.premium_features))
+
+
+class LedgerWriter:
+    """Escritor de un libro de membresías, solo agrega al final"""
+
+    def __init__(self, path, codec=None):
+        """
+        Abre (o crea) un libro para agregar registros
+
+        Se agrega al último segmento, que conserva el diccionario de su
+        encabezado, y un registro incompleto al final (escritura
+        interrumpida) se descarta. Si se pide otro diccionario se empieza un
+        segmento nuevo.
+
+        Args:
+            path: Ruta del libro
+            codec: Codificador a usar (por defecto el del último segmento o
+                   el del catálogo vigente)
+        """
+        self.path = path
+        self._stream = None
+        segments = segment_paths(path)
+        # Un último segmento vacío se reescribe con su encabezado
+        self._segment = max(len(segments) - 1, 0)
+        if segments and os.path.getsize(segments[-1]) > 0:
+            current = segments[-1]
+            self.codec, data_offset = read_header(current)
+            torn = (os.path.getsize(current) - data_offset) % RECORD.size
+            if torn:
+                with open(current, "r+b") as stream:
+                    stream.truncate(os.path.getsize(current) - torn)
+            self._stream = open(current, "ab")
+            if codec is not None and not _same_names(codec, self.codec):
+                self._start_segment(codec)
+        else:
+            self._start_segment(codec or MembershipCodec(), self._segment)
+
+    @property
+    def segment_path(self):
+        """Ruta del segmento al que se agrega"""
+        return _segment_path(self.path, self._segment)
+
+    def _start_segment(self, codec, number=None):
+        """
+        Cierra el segmento actual y empieza otro con el diccionario de codec
+
+        El encabezado se escribe completo en un archivo temporal que luego se
+        renombra, así que un segmento nunca queda con el encabezado a medias.
+        """
+        if self._stream is not None:
+            self.close()
+        self._segment = self._segment + 1 if number is None else number
+        self.codec = codec
+        target = self.segment_path
+        temporary = target + ".tmp"
+        with open(temporary, "wb") as stream:
+            stream.write(encode_header(codec))
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.replace(temporary, target)
+        self._stream = open(target, "ab")
+
+    def append(self, compact, amounts):
+        """
+        Agrega una membresía compacta
+
+        Args:
+            compact: CompactMembership codificada con el diccionario del libro
+            amounts: Montos confirmados en centavos (ConfirmedAmounts o
+                     CentsBreakdown)
+        """
+        self._stream.write(RECORD.pack(
+            compact.plan_code, compact.additional_mask, compact.premium_mask,
+            compact.num_members, amounts.total, amounts.group_discount,
+            amounts.special_discount, amounts.premium_surcharge))
+
+    def _encode(self, breakdown):
+        """Codifica una cotización con el diccionario del segmento actual"""
+        return RECORD.pack(
+            self.codec.plan_code(breakdown.plan),
+            self.codec.additional_mask(breakdown.additional_features),
+            self.codec.premium_mask(breakdown.premium_features),
+            breakdown.num_members,
+            total_to_cents(breakdown.total),
+            total_to_cents(breakdown.group_discount),
+            total_to_cents(breakdown.special_discount),
+            total_to_cents(breakdown.premium_surcharge))
+
+    def append_quote(self, breakdown):
+        """
+        Agrega una cotización confirmada
+
+        Si nombra un plan o una característica que el segmento no conoce y el
+        catálogo vigente sí, se empieza un segmento nuevo con el diccionario
+        del catálogo vigente.
+
+        Args:
+            breakdown: QuoteBreakdown o CentsBreakdown confirmado
+
+        Raises:
+            ValueError: Si el plan o las características tampoco están en el
+                        catálogo vigente
+        """
+        try:
+            record = self._encode(breakdown)
+        except ValueError:
+            codec = MembershipCodec()
+            if _same_names(codec, self.codec):
+                raise
+            previous = self.codec
+            self.codec = codec
+            try:
+                record = self._encode(breakdown)
+            finally:
+                self.codec = previous
+            self._start_segment(codec)
+        self._stream.write(record)
+
+    def flush(self, sync=False):
+        """
+        Vacía el búfer al archivo
+
+        Args:
+            sync: Si es True, también fuerza la escritura a disco (fsync)
+        """
+        self._stream.flush()
+        if sync:
+            os.fsync(self._stream.fileno())
+
+    def close(self):
+        """Vacía el búfer, sincroniza y cierra el segmento actual"""
+        if not self._stream.closed:
+            self.flush(sync=True)
+            self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LedgerReader:
+    """Lector de un segmento del libro de membresías mapeado en memoria"""
+
+    def __init__(self, path):
+        """
+        Mapea un segmento en memoria
+
+        Para recorrer todos los segmentos de un libro, ver segment_paths().
+
+        Args:
+            path: Ruta del segmento
+
+        Raises:
+            ValueError: Si el archivo no es un libro compatible
+        """
+        self.path = path
+        with open(path, "rb") as stream:
+            self._map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        self.codec, self._data_offset = decode_header(self._map)
+        self._count = (len(self._map) - self._data_offset) // RECORD.size
+        self._views = []
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def catalog_version(self):
+        """Versión del catálogo con la que se creó el libro"""
+        return self.codec.version
+
+    def record(self, index):
+        """
+        Lee un registro
+
+        Args:
+            index: Número de registro
+
+        Returns:
+            tuple: (CompactMembership, ConfirmedAmounts)
+        """
+        if not 0 <= index < self._count:
+            raise IndexError("Registro fuera del libro.")
+        plan, additional, premium, members, *amounts = RECORD.unpack_from(
+            self._map, self._data_offset + index * RECORD.size)
+        return (CompactMembership(plan, additional, premium, members),
+                ConfirmedAmounts(*map(Cents, amounts)))
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self.record(index)
+
+    def entries(self):
+        """
+        Genera los registros con los nombres del encabezado
+
+        No se validan contra el catálogo vigente, así que también sirven para
+        planes y características que ya no se ofrecen.
+
+        Yields:
+            LedgerEntry: Plan, miembros, características y montos
+        """
+        codec = self.codec
+        for compact, amounts in self:
+            yield LedgerEntry(
+                codec.plans[compact.plan_code], compact.num_members,
+                tuple(codec.additional_names(compact.additional_mask)),
+                tuple(codec.premium_names(compact.premium_mask)), *amounts)
+
+    def columns(self):
+        """
+        Retorna vistas por columna sobre el archivo, sin copiar datos
+
+        Cada columna es un memoryview con paso sobre el mapa; deben liberarse
+        (o dejar de usarse) antes de close().
+
+        Returns:
+            LedgerColumns: Vistas de códigos, máscaras, miembros y montos
+
+        Raises:
+            ValueError: En plataformas big-endian, donde se usa record()
+        """
+        if sys.byteorder != "little":
+            raise ValueError("Las vistas directas requieren una plataforma little-endian.")
+        data = memoryview(self._map)[
+            self._data_offset:self._data_offset + self._count * RECORD.size]
+        words = data.cast("I")
+        quads = data.cast("q")
+        views = LedgerColumns(
+            words[0::WORDS_PER_RECORD],
+            words[1::WORDS_PER_RECORD],
+            words[2::WORDS_PER_RECORD],
+            words[3::WORDS_PER_RECORD],
+            quads[2::QUADS_PER_RECORD],
+            quads[3::QUADS_PER_RECORD],
+            quads[4::QUADS_PER_RECORD],
+            quads[5::QUADS_PER_RECORD],
+        )
+        self._views.extend((data, words, quads) + tuple(views))
+        return views
+
+    def close(self):
+        """Libera las vistas y cierra el mapa"""
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -3,59 +3,138 @@ Gym Membership Management System
 Sistema de Gestión de Membresías de Gimnasio
 """
 
+from time import perf_counter_ns
+
+import gym_render
+from gym_catalog import current_catalog, reload_catalog
+# Tablas y reglas por defecto, reexportadas para quien las importaba de aquí
+from gym_defaults import (  # pylint: disable=unused-import
+    DEFAULT_ADDITIONAL_FEATURES,
+    DEFAULT_MEMBERSHIP_PLANS,
+    DEFAULT_PREMIUM_FEATURES,
+    GROUP_DISCOUNT_MIN_MEMBERS,
+    GROUP_DISCOUNT_RATE,
+    PREMIUM_SURCHARGE_RATE,
+    SPECIAL_OFFERS,
+)
+from gym_money import Cents, rate_to_basis_points, to_dollars
+# Desglose e instrumentación, reexportados para quien los importaba de aquí
+from gym_quote import (  # pylint: disable=unused-import
+    QuoteBreakdown,
+    active_metrics,
+    build_quote,
+    confirmed_cost,
+    dollars_breakdown,
+    set_metrics,
+    stage,
+)
+from gym_rules import PERCENT_DISCOUNT, PERCENT_SURCHARGE
+
 #Kevin Magallanes y Cesar mera
-class GymMembership:
+
+
+def _rate_label(rules):
+    """
+    Retorna las tasas de los ajustes porcentuales para los mensajes
+
+    Args:
+        rules: PricingRule aplicadas en un ajuste
+
+    Returns:
+        str: " (10%)" para una regla de 10%, " (10% + 5%)" para dos, o ""
+             si alguna regla es de monto fijo
+    """
+    if not rules or any(rule.kind not in (PERCENT_DISCOUNT, PERCENT_SURCHARGE)
+                        for rule in rules):
+        return ""
+    rates = " + ".join(f"{rate_to_basis_points(rule.value) / 100:g}%" for rule in rules)
+    return f" ({rates})"
+
+
+class _CatalogTables(type):
+    """
+    Expone las tablas de precios del catálogo vigente como atributos de clase
+
+    Leer una tabla retorna la vista de solo lectura de la instantánea
+    publicada; reemplazarla publica una nueva versión del catálogo.
+    """
+
+    MEMBERSHIP_PLANS = property(
+        lambda cls: current_catalog().plans,
+        lambda cls, plans: reload_catalog(plans=plans))
+    ADDITIONAL_FEATURES = property(
+        lambda cls: current_catalog().additional_features,
+        lambda cls, prices: reload_catalog(additional_features=prices))
+    PREMIUM_FEATURES = property(
+        lambda cls: current_catalog().premium_features,
+        lambda cls, prices: reload_catalog(premium_features=prices))
+
+
+class GymMembership(metaclass=_CatalogTables):
     """Clase principal para manejar las membresías del gimnasio"""
     
     # Planes de membresía disponibles
-    MEMBERSHIP_PLANS = {
-        "Basic": {
-            "cost": 50,
-            "benefits": ["Acceso a área de pesas", "Vestidores"]
-        },
-        "Premium": {
-            "cost": 100,
-            "benefits": ["Acceso a área de pesas", "Vestidores", "Sauna", "Piscina"]
-        },
-        "Family": {
-            "cost": 150,
-            "benefits": ["Acceso familiar hasta 4 personas", "Todas las áreas", "Clases grupales incluidas"]
-        }
-    }
+    MEMBERSHIP_PLANS = property(_CatalogTables.MEMBERSHIP_PLANS.fget)
     
     # Características adicionales disponibles
-    ADDITIONAL_FEATURES = {
-        "Personal Training": 40,
-        "Group Classes": 25,
-        "Nutrition Consultation": 30,
-        "Locker Rental": 10
-    }
+    ADDITIONAL_FEATURES = property(_CatalogTables.ADDITIONAL_FEATURES.fget)
     
     # Características premium
-    PREMIUM_FEATURES = {
-        "Exclusive Gym Access": 80,
-        "Specialized Training Program": 60
-    }
+    PREMIUM_FEATURES = property(_CatalogTables.PREMIUM_FEATURES.fget)
     
     def __init__(self):
         """Inicializa el sistema de membresías"""
         self.selected_plan = None
-        self.additional_features = []
-        self.premium_features = []
+        # Conjuntos ordenados: nombre -> precio en centavos en la versión del catálogo
+        self.additional_features = {}
+        self.premium_features = {}
         self.num_members = 1
         self.total_cost = 0
+        # Subtotales acumulados en centavos y versión del catálogo con que se calcularon
+        self._additional_cents = 0
+        self._premium_cents = 0
+        self._catalog_version = None
+    
+    @classmethod
+    def from_selection(cls, plan=None, additional_features=(), premium_features=(),
+                       num_members=1):
+        """
+        Crea una membresía a partir de una selección, sin imprimir nada
+        
+        Args:
+            plan: Nombre del plan (o None)
+            additional_features: Características adicionales
+            premium_features: Características premium
+            num_members: Número de miembros
+            
+        Returns:
+            GymMembership: Membresía con la selección aplicada
+            
+        Raises:
+            ValueError: Si algún nombre no está disponible o los miembros son inválidos
+        """
+        gym = cls()
+        catalog = current_catalog()
+        if plan is not None:
+            if plan not in catalog.plans:
+                raise ValueError(f"El plan '{plan}' no está disponible.")
+            gym.selected_plan = plan
+        if num_members < 1:
+            raise ValueError("El número de miembros debe ser al menos 1.")
+        gym.num_members = num_members
+        for feature in additional_features:
+            if feature not in catalog.additional_cents:
+                raise ValueError(f"La característica '{feature}' no está disponible.")
+            gym._add_feature(gym.additional_features, feature, catalog)
+        for feature in premium_features:
+            if feature not in catalog.premium_cents:
+                raise ValueError(f"La característica premium '{feature}' no está disponible.")
+            gym._add_feature(gym.premium_features, feature, catalog)
+        return gym
     
     def display_membership_plans(self):
         """Muestra los planes de membresía disponibles"""
-        print("\n" + "="*60)
-        print("PLANES DE MEMBRESÍA DISPONIBLES")
-        print("="*60)
-        for plan_name, details in self.MEMBERSHIP_PLANS.items():
-            print(f"\n{plan_name}: ${details['cost']}/mes")
-            print("Beneficios:")
-            for benefit in details['benefits']:
-                print(f"  - {benefit}")
-        print("="*60 + "\n")
+        gym_render.write(gym_render.render_plans(current_catalog().plans))
     
     def select_membership_plan(self, plan_name):
         """
@@ -67,7 +146,7 @@ class GymMembership:
         Returns:
             bool: True si la selección fue exitosa, False si no
         """
-        if plan_name not in self.MEMBERSHIP_PLANS:
+        if plan_name not in current_catalog().plans:
             print(f"Error: El plan '{plan_name}' no está disponible.")
             return False
         
@@ -85,11 +164,14 @@ class GymMembership:
         Returns:
             bool: True si se agregó exitosamente, False si no
         """
-        if feature_name not in self.ADDITIONAL_FEATURES:
+        catalog = current_catalog()
+        if feature_name not in catalog.additional_cents:
             print(f"Error: La característica '{feature_name}' no está disponible.")
             return False
         
-        self.additional_features.append(feature_name)
+        if not self._add_feature(self.additional_features, feature_name, catalog):
+            print(f"✓ Característica '{feature_name}' ya estaba agregada.")
+            return True
         print(f"✓ Característica '{feature_name}' agregada.")
         return True
     
@@ -103,14 +185,91 @@ class GymMembership:
         Returns:
             bool: True si se agregó exitosamente, False si no
         """
-        if feature_name not in self.PREMIUM_FEATURES:
+        catalog = current_catalog()
+        if feature_name not in catalog.premium_cents:
             print(f"Error: La característica premium '{feature_name}' no está disponible.")
             return False
         
-        self.premium_features.append(feature_name)
+        if not self._add_feature(self.premium_features, feature_name, catalog):
+            print(f"✓ Característica premium '{feature_name}' ya estaba agregada.")
+            return True
         print(f"✓ Característica premium '{feature_name}' agregada.")
         return True
     
+    def remove_additional_feature(self, feature_name):
+        """
+        Quita una característica adicional
+        
+        Args:
+            feature_name: Nombre de la característica a quitar
+            
+        Returns:
+            bool: True si se quitó exitosamente, False si no estaba agregada
+        """
+        if feature_name not in self.additional_features:
+            print(f"Error: La característica '{feature_name}' no está agregada.")
+            return False
+        
+        self._additional_cents -= self.additional_features.pop(feature_name)
+        print(f"✓ Característica '{feature_name}' quitada.")
+        return True
+    
+    def remove_premium_feature(self, feature_name):
+        """
+        Quita una característica premium
+        
+        Args:
+            feature_name: Nombre de la característica premium a quitar
+            
+        Returns:
+            bool: True si se quitó exitosamente, False si no estaba agregada
+        """
+        if feature_name not in self.premium_features:
+            print(f"Error: La característica premium '{feature_name}' no está agregada.")
+            return False
+        
+        self._premium_cents -= self.premium_features.pop(feature_name)
+        print(f"✓ Característica premium '{feature_name}' quitada.")
+        return True
+    
+    def _add_feature(self, features, feature_name, catalog):
+        """
+        Agrega una característica y actualiza su subtotal acumulado
+        
+        Returns:
+            bool: True si se agregó, False si ya estaba agregada
+        """
+        if feature_name in features:
+            return False
+        self._sync_feature_costs(catalog)
+        if features is self.additional_features:
+            price = catalog.additional_cents[feature_name]
+            self._additional_cents += price
+        else:
+            price = catalog.premium_cents[feature_name]
+            self._premium_cents += price
+        features[feature_name] = price
+        return True
+    
+    def _sync_feature_costs(self, catalog):
+        """
+        Recalcula los subtotales si se calcularon con otra versión del catálogo
+        
+        Raises:
+            ValueError: Si una característica agregada ya no existe en el catálogo
+        """
+        if self._catalog_version == catalog.version:
+            return
+        for features, prices in ((self.additional_features, catalog.additional_cents),
+                                 (self.premium_features, catalog.premium_cents)):
+            for feature in features:
+                if feature not in prices:
+                    raise ValueError(f"La característica '{feature}' ya no está disponible.")
+                features[feature] = prices[feature]
+        self._additional_cents = sum(self.additional_features.values())
+        self._premium_cents = sum(self.premium_features.values())
+        self._catalog_version = catalog.version
+    
     def set_number_of_members(self, num):
         """
         Establece el número de miembros para descuento grupal
@@ -137,7 +296,7 @@ class GymMembership:
         """
         if not self.selected_plan:
             return 0
-        return self.MEMBERSHIP_PLANS[self.selected_plan]["cost"]
+        return current_catalog().plans[self.selected_plan]["cost"]
     
     def calculate_additional_features_cost(self):
         """
@@ -146,10 +305,8 @@ class GymMembership:
         Returns:
             float: Costo total de características adicionales
         """
-        total = 0
-        for feature in self.additional_features:
-            total += self.ADDITIONAL_FEATURES[feature]
-        return total
+        self._sync_feature_costs(current_catalog())
+        return to_dollars(self._additional_cents)
     
     def calculate_premium_features_cost(self):
         """
@@ -158,14 +315,28 @@ class GymMembership:
         Returns:
             float: Costo total de características premium
         """
-        total = 0
-        for feature in self.premium_features:
-            total += self.PREMIUM_FEATURES[feature]
-        return total
+        self._sync_feature_costs(current_catalog())
+        return to_dollars(self._premium_cents)
+    
+    def _adjustment(self, name, subtotal):
+        """
+        Calcula un ajuste del desglose sobre un monto
+
+        Returns:
+            tuple: (ajuste en dólares, tasas para el mensaje)
+        """
+        catalog = current_catalog()
+        # Igual que build_quote: el monto se lleva al centavo antes de convertirlo
+        amount = Cents.from_dollars(round(subtotal, 2))
+        has_premium = len(self.premium_features) > 0
+        adjustment = catalog.adjustment_cents(name, amount, self.num_members, has_premium)
+        label = _rate_label(catalog.applied_rules(name, amount, self.num_members, has_premium))
+        return to_dollars(adjustment), label
     
     def apply_group_discount(self, subtotal):
         """
-        Aplica descuento del 10% si hay 2 o más miembros
+        Aplica los descuentos porcentuales de las reglas del catálogo
+        (por defecto 10% si hay 2 o más miembros)
         
         Args:
             subtotal: Subtotal antes del descuento
@@ -173,17 +344,16 @@ class GymMembership:
         Returns:
             float: Descuento aplicado
         """
-        if self.num_members >= 2:
-            discount = subtotal * 0.10
-            print(f"✓ Descuento grupal aplicado (10%): -${discount:.2f}")
-            return discount
-        return 0
+        discount, label = self._adjustment("group_discount", subtotal)
+        if discount:
+            print(f"✓ Descuento grupal aplicado{label}: -${discount:.2f}")
+        return discount
     
     def apply_special_offer_discount(self, subtotal):
         """
-        Aplica descuentos especiales según el total
-        - Si excede $200: descuento de $20
-        - Si excede $400: descuento de $50
+        Aplica los descuentos fijos de las reglas del catálogo
+        - Por defecto, si excede $200: descuento de $20
+        - Por defecto, si excede $400: descuento de $50
         
         Args:
             subtotal: Subtotal antes del descuento
@@ -191,17 +361,15 @@ class GymMembership:
         Returns:
             float: Descuento aplicado
         """
-        if subtotal > 400:
-            print("✓ Descuento especial aplicado: -$50")
-            return 50
-        elif subtotal > 200:
-            print("✓ Descuento especial aplicado: -$20")
-            return 20
-        return 0
+        discount, _ = self._adjustment("special_discount", subtotal)
+        if discount:
+            print(f"✓ Descuento especial aplicado: -${discount}")
+        return discount
     
     def apply_premium_surcharge(self, subtotal):
         """
-        Aplica recargo del 15% si hay características premium
+        Aplica los recargos de las reglas del catálogo
+        (por defecto 15% si hay características premium)
         
         Args:
             subtotal: Subtotal antes del recargo
@@ -209,11 +377,51 @@ class GymMembership:
         Returns:
             float: Recargo aplicado
         """
-        if len(self.premium_features) > 0:
-            surcharge = subtotal * 0.15
-            print(f"✓ Recargo premium aplicado (15%): +${surcharge:.2f}")
-            return surcharge
-        return 0
+        surcharge, label = self._adjustment("premium_surcharge", subtotal)
+        if surcharge:
+            print(f"✓ Recargo premium aplicado{label}: +${surcharge:.2f}")
+        return surcharge
+    
+    def quote(self):
+        """
+        Calcula la cotización en modo silencioso, sin escribir en stdout
+        
+        Los montos se calculan en centavos enteros con una sola versión del
+        catálogo, aunque otra se publique a la mitad, y el desglose los
+        entrega en dólares.
+        
+        Returns:
+            QuoteBreakdown: Desglose de la cotización, o None si no hay plan
+        """
+        if not self.selected_plan:
+            return None
+        # Toda la cotización usa una sola versión del catálogo
+        return self._quote(current_catalog())
+    
+    def _quote(self, catalog):
+        """Calcula la cotización con un catálogo fijo (ver quote)"""
+        metrics = active_metrics()
+        if metrics is not None:
+            mark = perf_counter_ns()
+        base_cost = catalog.plan_cents.get(self.selected_plan)
+        if base_cost is None:
+            raise ValueError(f"El plan '{self.selected_plan}' ya no está disponible.")
+        if metrics is not None:
+            mark = stage(metrics, "base_cost", mark)
+        self._sync_feature_costs(catalog)
+        if metrics is not None:
+            stage(metrics, "features", mark)
+        return build_quote(
+            self.selected_plan,
+            self.num_members,
+            self.additional_features,
+            self.premium_features,
+            base_cost,
+            self._additional_cents,
+            self._premium_cents,
+            catalog,
+            in_cents=True,
+        )
     
     def calculate_total_cost(self):
         """
@@ -225,61 +433,45 @@ class GymMembership:
         if not self.selected_plan:
             print("Error: No se ha seleccionado un plan de membresía.")
             return -1
-        
-        # Costo base
-        base_cost = self.calculate_base_cost()
-        
-        # Costo de características adicionales
-        additional_cost = self.calculate_additional_features_cost()
-        
-        # Costo de características premium
-        premium_cost = self.calculate_premium_features_cost()
-        
-        # Subtotal antes de descuentos
-        subtotal = base_cost + additional_cost + premium_cost
-        
-        print(f"\nCosto base de membresía: ${base_cost}")
-        print(f"Características adicionales: ${additional_cost}")
-        print(f"Características premium: ${premium_cost}")
-        print(f"Subtotal: ${subtotal}")
-        
-        # Aplicar descuento grupal
-        group_discount = self.apply_group_discount(subtotal)
-        
-        # Aplicar descuento especial
-        special_discount = self.apply_special_offer_discount(subtotal)
-        
-        # Calcular total después de descuentos
-        total_after_discounts = subtotal - group_discount - special_discount
-        
-        # Aplicar recargo premium
-        premium_surcharge = self.apply_premium_surcharge(total_after_discounts)
+        # Los mensajes muestran las tasas de la misma versión del catálogo
+        catalog = current_catalog()
+        breakdown = self._quote(catalog)
+        
+        print(f"\nCosto base de membresía: ${breakdown.base_cost}")
+        print(f"Características adicionales: ${breakdown.additional_cost}")
+        print(f"Características premium: ${breakdown.premium_cost}")
+        print(f"Subtotal: ${breakdown.subtotal}")
+        
+        subtotal = Cents.from_dollars(breakdown.subtotal)
+        has_premium = len(self.premium_features) > 0
+        if breakdown.group_discount:
+            label = _rate_label(catalog.applied_rules(
+                "group_discount", subtotal, self.num_members, has_premium))
+            print(f"✓ Descuento grupal aplicado{label}: -${breakdown.group_discount:.2f}")
+        if breakdown.special_discount:
+            print(f"✓ Descuento especial aplicado: -${breakdown.special_discount}")
+        if breakdown.premium_surcharge:
+            label = _rate_label(catalog.applied_rules(
+                "premium_surcharge", subtotal, self.num_members, has_premium))
+            print(f"✓ Recargo premium aplicado{label}: +${breakdown.premium_surcharge:.2f}")
         
         # Total final
-        self.total_cost = total_after_discounts + premium_surcharge
+        self.total_cost = breakdown.total
         
-        return round(self.total_cost, 2)
+        return breakdown.total
     
     def display_summary(self):
         """Muestra un resumen de la membresía seleccionada"""
-        print("\n" + "="*60)
-        print("RESUMEN DE MEMBRESÍA")
-        print("="*60)
-        print(f"Plan seleccionado: {self.selected_plan}")
-        print(f"Número de miembros: {self.num_members}")
-        
-        if self.additional_features:
-            print("\nCaracterísticas adicionales:")
-            for feature in self.additional_features:
-                print(f"  - {feature} (${self.ADDITIONAL_FEATURES[feature]})")
-        
-        if self.premium_features:
-            print("\nCaracterísticas premium:")
-            for feature in self.premium_features:
-                print(f"  - {feature} (${self.PREMIUM_FEATURES[feature]})")
-        
-        print(f"\nCosto total: ${self.total_cost:.2f}")
-        print("="*60 + "\n")
+        catalog = current_catalog()
+        gym_render.write(gym_render.render_summary(
+            self.selected_plan,
+            self.num_members,
+            self.additional_features,
+            self.premium_features,
+            catalog.additional_features,
+            catalog.premium_features,
+            self.total_cost,
+        ))
     
     def confirm_membership(self):
         """
@@ -333,9 +525,8 @@ def main():
         return -1
     
     # Características adicionales
-    print("\nCaracterísticas adicionales disponibles:")
-    for feature, cost in gym.ADDITIONAL_FEATURES.items():
-        print(f"  - {feature}: ${cost}")
+    gym_render.write(gym_render.render_feature_listing(
+        "Características adicionales disponibles:", gym.ADDITIONAL_FEATURES))
     
     print("\n¿Desea agregar características adicionales? (s/n): ", end="")
     if input().strip().lower() in ['s', 'si', 'yes']:
@@ -346,9 +537,8 @@ def main():
                 gym.add_additional_feature(feature.strip())
     
     # Características premium
-    print("\nCaracterísticas premium disponibles:")
-    for feature, cost in gym.PREMIUM_FEATURES.items():
-        print(f"  - {feature}: ${cost}")
+    gym_render.write(gym_render.render_feature_listing(
+        "Características premium disponibles:", gym.PREMIUM_FEATURES))
     
     print("\n¿Desea agregar características premium? (s/n): ", end="")
     if input().strip().lower() in ['s', 'si', 'yes']:
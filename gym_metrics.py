@@ -0,0 +1,156 @@
+"""
+Métricas del cálculo de precios
+Tiempos por etapa y contadores de descuentos y recargos aplicados
+"""
+
+import contextlib
+import json
+import threading
+
+import gym_quote
+
+
+class MetricsRegistry:
+    """Acumula tiempos por etapa y contadores de ramas"""
+
+    def __init__(self):
+        """Inicializa el registro vacío"""
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+        self._hooks = []
+
+    def record(self, stage, elapsed_ns):
+        """
+        Registra la duración de una etapa
+
+        Args:
+            stage: Nombre de la etapa
+            elapsed_ns: Duración en nanosegundos
+        """
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                self._stages[stage] = [1, elapsed_ns, elapsed_ns]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed_ns
+                if elapsed_ns > stats[2]:
+                    stats[2] = elapsed_ns
+
+    def increment(self, name, amount=1):
+        """
+        Incrementa un contador
+
+        Args:
+            name: Nombre del contador
+            amount: Cantidad a sumar
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """
+        Retorna una copia de las métricas
+
+        Returns:
+            dict: "stages" (count, total_ns, max_ns, mean_ns) y "counters"
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": count,
+                    "total_ns": total,
+                    "max_ns": maximum,
+                    "mean_ns": total / count,
+                }
+                for stage, (count, total, maximum) in self._stages.items()
+            }
+            return {"stages": stages, "counters": dict(self._counters)}
+
+    def reset(self):
+        """Borra todas las métricas"""
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def add_hook(self, hook):
+        """
+        Registra una función que recibe la instantánea en cada export
+
+        Args:
+            hook: Función que recibe el diccionario de snapshot()
+        """
+        self._hooks.append(hook)
+
+    def export(self):
+        """
+        Envía la instantánea actual a todos los hooks
+
+        Returns:
+            dict: Instantánea exportada
+        """
+        snapshot = self.snapshot()
+        for hook in self._hooks:
+            hook(snapshot)
+        return snapshot
+
+    def to_json(self):
+        """Retorna las métricas como texto JSON"""
+        return json.dumps(self.snapshot(), sort_keys=True)
+
+    def to_prometheus(self, prefix="gym_pricing"):
+        """
+        Retorna las métricas en formato de texto de Prometheus
+
+        Args:
+            prefix: Prefijo de los nombres de métricas
+
+        Returns:
+            str: Métricas en formato de exposición de texto
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for stage, stats in sorted(snapshot["stages"].items()):
+            lines.append(f'{prefix}_stage_calls_total{{stage="{stage}"}} {stats["count"]}')
+            lines.append(
+                f'{prefix}_stage_seconds_total{{stage="{stage}"}} {stats["total_ns"] / 1e9:.9f}')
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def enable(registry=None):
+    """
+    Activa la instrumentación del cálculo de precios
+
+    Args:
+        registry: Registro a usar (por defecto uno nuevo)
+
+    Returns:
+        MetricsRegistry: Registro activo
+    """
+    registry = registry or MetricsRegistry()
+    gym_quote.set_metrics(registry)
+    return registry
+
+
+def disable():
+    """Desactiva la instrumentación del cálculo de precios"""
+    gym_quote.set_metrics(None)
+
+
+@contextlib.contextmanager
+def instrumented(registry=None):
+    """
+    Activa la instrumentación dentro de un bloque with
+
+    Yields:
+        MetricsRegistry: Registro activo durante el bloque
+    """
+    registry = registry or MetricsRegistry()
+    previous = gym_quote.set_metrics(registry)
+    try:
+        yield registry
+    finally:
+        gym_quote.set_metrics(previous)
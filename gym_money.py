@@ -0,0 +1,188 @@
+"""
+Dinero en centavos enteros
+Aritmética exacta y reproducible para el cálculo de precios
+"""
+
+from collections import namedtuple
+from decimal import Decimal
+
+# Las tasas se expresan en puntos básicos (1/100 de porcentaje)
+BASIS_POINTS = 10000
+# Redondeo de los porcentajes: las fracciones de exactamente medio centavo se
+# redondean hacia abajo (a favor del cliente en un recargo, en su contra en un
+# descuento); el resto al centavo más cercano. Es el sumando antes de la
+# división entera entre BASIS_POINTS.
+RATE_ROUNDING_OFFSET = BASIS_POINTS // 2 - 1
+
+
+class Cents(int):
+    """Monto en centavos enteros"""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dollars(cls, amount):
+        """
+        Convierte un monto en dólares a centavos sin pérdida
+
+        Args:
+            amount: Monto como int, float, str o Decimal
+
+        Returns:
+            Cents: Monto en centavos
+
+        Raises:
+            ValueError: Si el monto tiene fracciones de centavo
+        """
+        if type(amount) is int:
+            return cls(amount * 100)
+        cents = Decimal(str(amount)) * 100
+        if cents != cents.to_integral_value():
+            raise ValueError(f"El monto {amount} tiene fracciones de centavo.")
+        return cls(int(cents))
+
+    def dollars(self):
+        """Retorna el monto en dólares como float"""
+        return self / 100
+
+    def __str__(self):
+        sign = "-" if self < 0 else ""
+        whole, cents = divmod(abs(int(self)), 100)
+        return f"{sign}${whole}.{cents:02d}"
+
+    def __repr__(self):
+        return f"Cents({int(self)})"
+
+
+def rate_to_basis_points(rate):
+    """
+    Convierte una tasa (0.10) a puntos básicos (1000)
+
+    Raises:
+        ValueError: Si la tasa no se puede expresar en puntos básicos enteros
+    """
+    points = Decimal(str(rate)) * BASIS_POINTS
+    if points != points.to_integral_value():
+        raise ValueError(f"La tasa {rate} no se puede expresar en puntos básicos.")
+    return int(points)
+
+
+def apply_rate(cents, basis_points):
+    """
+    Calcula un porcentaje de un monto, redondeado al centavo
+
+    Es la misma expresión que escribe apply_rate_source() en el código
+    compilado de las reglas.
+
+    Args:
+        cents: Monto en centavos
+        basis_points: Tasa en puntos básicos
+
+    Returns:
+        int: Resultado en centavos
+    """
+    return (cents * basis_points + RATE_ROUNDING_OFFSET) // BASIS_POINTS
+
+
+def apply_rate_source(cents, basis_points):
+    """
+    Retorna apply_rate() como expresión de Python, para el código generado
+
+    Args:
+        cents: Expresión del monto en centavos
+        basis_points: Tasa en puntos básicos
+
+    Returns:
+        str: Expresión equivalente a apply_rate(cents, basis_points)
+    """
+    return f"({cents} * {basis_points} + {RATE_ROUNDING_OFFSET}) // {BASIS_POINTS}"
+
+
+def to_dollars(cents):
+    """
+    Convierte centavos a dólares para mostrar o serializar
+
+    Args:
+        cents: Monto en centavos
+
+    Returns:
+        int o float: Dólares enteros como int (igual que las tablas de
+                     precios) y con centavos como float
+    """
+    whole, fraction = divmod(int(cents), 100)
+    return whole if not fraction else cents / 100
+
+
+# Desglose de una cotización con todos los montos en centavos
+CentsBreakdown = namedtuple("CentsBreakdown", [
+    "plan",
+    "num_members",
+    "additional_features",
+    "premium_features",
+    "base_cost",
+    "additional_cost",
+    "premium_cost",
+    "subtotal",
+    "group_discount",
+    "special_discount",
+    "total_after_discounts",
+    "premium_surcharge",
+    "total",
+])
+
+
+def price_total_cents(subtotal, num_members, has_premium, catalog):
+    """
+    Calcula el total en centavos con las reglas del catálogo
+
+    Cada descuento y recargo se redondea al centavo al calcularse.
+
+    Args:
+        subtotal: Subtotal en centavos
+        num_members: Número de miembros
+        has_premium: True si hay características premium
+        catalog: Catálogo cuyas reglas se aplican
+
+    Returns:
+        int: Total en centavos
+    """
+    return catalog.price_total_cents(subtotal, num_members, has_premium)
+
+
+def build_quote_cents(plan, num_members, additional_features, premium_features,
+                      base_cost, additional_cost, premium_cost, catalog, timer=None):
+    """
+    Construye el desglose de una cotización en centavos
+
+    Los descuentos porcentuales quedan como descuento grupal, los fijos como
+    descuento especial y todos los recargos como recargo premium.
+
+    Args:
+        plan: Nombre del plan
+        num_members: Número de miembros
+        additional_features: Características adicionales seleccionadas
+        premium_features: Características premium seleccionadas
+        base_cost: Costo base en centavos
+        additional_cost: Costo de características adicionales en centavos
+        premium_cost: Costo de características premium en centavos
+        catalog: Catálogo cuyas reglas se aplican
+        timer: Función que se llama al terminar cada ajuste (ver
+               Catalog.timed_breakdown_cents), o None para no medir
+
+    Returns:
+        CentsBreakdown: Desglose con montos Cents
+    """
+    subtotal = base_cost + additional_cost + premium_cost
+    has_premium = len(premium_features) > 0
+    if timer is None:
+        group, special, surcharge, total = catalog.price_breakdown_cents(
+            subtotal, num_members, has_premium)
+    else:
+        group, special, surcharge, total = catalog.timed_breakdown_cents(
+            subtotal, num_members, has_premium, timer)
+    return CentsBreakdown(
+        plan, num_members, tuple(additional_features), tuple(premium_features),
+        Cents(base_cost), Cents(additional_cost), Cents(premium_cost), Cents(subtotal),
+        Cents(group), Cents(special), Cents(subtotal - group - special), Cents(surcharge),
+        Cents(total),
+    )
@@ -0,0 +1,132 @@
+"""
+Optimizador de paquetes de membresía con presupuesto
+Búsqueda por ramificación y poda del paquete más barato que cubre los
+beneficios pedidos por el cliente
+"""
+
+import heapq
+import math
+from decimal import Decimal
+
+from gym_catalog import current_catalog
+
+
+def _lower_bound(catalog, subtotal, num_members, premium):
+    """
+    Cota inferior del total de cualquier paquete que extienda al actual
+
+    Agregar características solo sube el subtotal y, entre dos umbrales de
+    subtotal de las reglas, el total no baja cuando el subtotal sube; pero
+    cruzar un umbral puede bajarlo. La cota evalúa las reglas en el subtotal
+    actual y justo encima de cada umbral todavía no alcanzado, con y sin
+    características premium si todavía no hay ninguna.
+    """
+    price = catalog.price_total_cents
+    candidates = [subtotal] + [threshold + 1 for threshold in catalog.subtotal_thresholds
+                               if threshold >= subtotal]
+    states = (True,) if premium else (False, True)
+    return min(price(amount, num_members, has_premium)
+               for amount in candidates for has_premium in states)
+
+
+def cheapest_packages(required_benefits=(), num_members=1, budget=None, top_k=1,
+                      catalog=None, stats=None):
+    """
+    Busca los paquetes más baratos que cubren los beneficios pedidos
+
+    Un beneficio queda cubierto por un plan que lo incluye o por una
+    característica con ese nombre. Los precios se calculan en centavos con
+    las reglas compiladas del catálogo; la poda supone tasas de descuento
+    menores al 100%.
+
+    Args:
+        required_benefits: Beneficios o características que debe tener el paquete
+        num_members: Número de miembros
+        budget: Total máximo aceptado (opcional)
+        top_k: Número de paquetes a retornar
+        catalog: Catálogo a usar (por defecto el vigente)
+        stats: Diccionario donde se guarda el número de nodos explorados (opcional)
+
+    Returns:
+        list: QuoteBreakdown ordenados del más barato al más caro
+
+    Raises:
+        ValueError: Si top_k o num_members no son válidos
+    """
+    if top_k < 1:
+        raise ValueError("Se debe pedir al menos un paquete.")
+    if num_members < 1:
+        raise ValueError("El número de miembros debe ser al menos 1.")
+    if catalog is None:
+        catalog = current_catalog()
+    required = list(dict.fromkeys(required_benefits))
+    bits = {benefit: 1 << index for index, benefit in enumerate(required)}
+    need = (1 << len(required)) - 1
+    budget_cents = None if budget is None else math.floor(Decimal(str(budget)) * 100)
+    price = catalog.price_total_cents
+
+    # Características de menor a mayor precio (en centavos), con los beneficios que cubren
+    items = sorted(
+        [(cost, False, name, bits.get(name, 0))
+         for name, cost in catalog.additional_cents.items()]
+        + [(cost, True, name, bits.get(name, 0))
+           for name, cost in catalog.premium_cents.items()])
+    suffix_cover = [0] * (len(items) + 1)
+    for index in range(len(items) - 1, -1, -1):
+        suffix_cover[index] = suffix_cover[index + 1] | items[index][3]
+
+    # Montículo de máximos (total negado) con los mejores top_k paquetes
+    best = []
+    nodes = 0
+
+    def limit():
+        worst = -best[0][0] if len(best) == top_k else math.inf
+        return worst if budget_cents is None else min(worst, budget_cents)
+
+    def consider(plan, subtotal, chosen):
+        additional = [name for _, premium, name, _ in chosen if not premium]
+        premium = [name for _, premium, name, _ in chosen if premium]
+        total = price(subtotal, num_members, bool(premium))
+        if total > limit():
+            return
+        entry = (-total, plan, tuple(additional), tuple(premium))
+        if len(best) < top_k:
+            heapq.heappush(best, entry)
+        else:
+            heapq.heappushpop(best, entry)
+
+    def search(plan, index, subtotal, premium, covered, chosen):
+        nonlocal nodes
+        nodes += 1
+        if index == len(items) or (covered | suffix_cover[index]) != need:
+            return
+        # Sin la característica
+        search(plan, index + 1, subtotal, premium, covered, chosen)
+        # Con la característica
+        cost, is_premium, _, mask = items[index]
+        subtotal += cost
+        premium = premium or is_premium
+        if _lower_bound(catalog, subtotal, num_members, premium) > limit():
+            return
+        chosen.append(items[index])
+        if covered | mask == need:
+            consider(plan, subtotal, chosen)
+        search(plan, index + 1, subtotal, premium, covered | mask, chosen)
+        chosen.pop()
+
+    for plan, details in catalog.plans.items():
+        covered = 0
+        for benefit in details["benefits"]:
+            covered |= bits.get(benefit, 0)
+        base_cost = catalog.plan_cents[plan]
+        if _lower_bound(catalog, base_cost, num_members, False) > limit():
+            continue
+        if covered == need:
+            consider(plan, base_cost, [])
+        search(plan, 0, base_cost, False, covered, [])
+
+    if stats is not None:
+        stats["nodes"] = nodes
+    best.sort(key=lambda entry: (-entry[0], entry[1:]))
+    return [catalog.quote(plan, additional, premium, num_members)
+            for _, plan, additional, premium in best]
@@ -0,0 +1,148 @@
+"""
+Cotización en paralelo con un pool de procesos
+Reparte las inscripciones en bloques entre varios núcleos
+"""
+
+import multiprocessing
+from collections import deque
+from itertools import islice
+
+from gym_catalog import Catalog, QuoteCache, current_catalog
+from gym_stream import RECORD_ERRORS, quote_raw_record
+
+# Bloques en vuelo por proceso; limita la memoria usada con archivos grandes
+PENDING_CHUNKS_PER_WORKER = 4
+
+# Estado de cada proceso, inicializado una sola vez por _init_worker
+_worker_catalog = None
+_worker_cache = None
+
+
+def _init_worker(version, plans, additional_features, premium_features, rules):
+    """Recibe el catálogo una sola vez al arrancar el proceso"""
+    global _worker_catalog, _worker_cache
+    _worker_catalog = Catalog(version, plans, additional_features, premium_features, rules)
+    _worker_cache = QuoteCache()
+
+
+def _quote_chunk(chunk):
+    """
+    Cotiza un bloque de registros dentro de un proceso del pool
+
+    Los registros mal formados se devuelven como rechazos, igual que en
+    gym_stream.quote_stream, y no detienen el bloque.
+
+    Args:
+        chunk: Lista de (línea, registro crudo, error de lectura)
+
+    Returns:
+        list: Lista de (línea, QuoteBreakdown o None, error o None, registro)
+    """
+    results = []
+    for line_number, raw, read_error in chunk:
+        try:
+            if read_error is not None:
+                raise ValueError(f"JSON inválido: {read_error}")
+            breakdown = quote_raw_record(raw, _worker_cache, _worker_catalog)
+        except RECORD_ERRORS as error:
+            results.append((line_number, None, str(error), raw))
+            continue
+        results.append((line_number, breakdown, None, None))
+    return results
+
+
+def _chunks(raw_records, chunksize):
+    """Agrupa los registros en bloques listos para enviar a los procesos"""
+    iterator = iter(raw_records)
+    while True:
+        chunk = [
+            (line_number, None, str(raw)) if isinstance(raw, Exception)
+            else (line_number, raw, None)
+            for line_number, raw in islice(iterator, chunksize)
+        ]
+        if not chunk:
+            return
+        yield chunk
+
+
+def quote_stream_parallel(raw_records, rejects=None, workers=None, chunksize=256,
+                          catalog=None):
+    """
+    Cotiza registros crudos repartiéndolos entre varios procesos
+
+    Conserva el orden de entrada y produce los mismos resultados que
+    gym_stream.quote_stream.
+
+    Args:
+        raw_records: Iterable de (número de línea, registro crudo)
+        rejects: Función que recibe (línea, error, registro) (opcional)
+        workers: Número de procesos (por defecto todos los núcleos)
+        chunksize: Registros por tarea
+        catalog: Catálogo a usar (por defecto el vigente)
+
+    Yields:
+        tuple: (número de línea, QuoteBreakdown)
+    """
+    if chunksize < 1:
+        raise ValueError("El tamaño de bloque debe ser al menos 1.")
+    if catalog is None:
+        catalog = current_catalog()
+    workers = workers or multiprocessing.cpu_count()
+    tables = catalog.to_dict()
+    initargs = (catalog.version, tables["plans"], tables["additional_features"],
+                tables["premium_features"], catalog.rules)
+    max_pending = workers * PENDING_CHUNKS_PER_WORKER
+
+    with multiprocessing.Pool(workers, _init_worker, initargs) as pool:
+        pending = deque()
+
+        def drain(limit):
+            while len(pending) > limit:
+                for line_number, breakdown, error, raw in pending.popleft().get():
+                    if breakdown is None:
+                        if rejects is not None:
+                            rejects(line_number, error, raw)
+                        continue
+                    yield line_number, breakdown
+
+        for chunk in _chunks(raw_records, chunksize):
+            pending.append(pool.apply_async(_quote_chunk, (chunk,)))
+            yield from drain(max_pending)
+        yield from drain(0)
+
+
+def quote_records_parallel(records, workers=None, chunksize=256, catalog=None):
+    """
+    Cotiza EnrollmentRecord en paralelo
+
+    Args:
+        records: Iterable de EnrollmentRecord
+        workers: Número de procesos (por defecto todos los núcleos)
+        chunksize: Registros por tarea
+        catalog: Catálogo a usar (por defecto el vigente)
+
+    Returns:
+        list: QuoteBreakdown en el mismo orden de entrada
+
+    Raises:
+        ValueError: Si algún registro es inválido
+    """
+    errors = []
+    raw_records = (
+        (index, {
+            "plan": record.plan,
+            "members": record.num_members,
+            "additional_features": list(record.additional_features),
+            "premium_features": list(record.premium_features),
+        })
+        for index, record in enumerate(records)
+    )
+    results = [
+        breakdown for _, breakdown in quote_stream_parallel(
+            raw_records, lambda line, error, raw: errors.append((line, error)),
+            workers, chunksize, catalog)
+    ]
+    if errors:
+        line_number, error = errors[0]
+        raise ValueError(f"Registro {line_number}: {error}")
+    return results
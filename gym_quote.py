@@ -0,0 +1,138 @@
+"""
+Desglose de cotizaciones e instrumentación del cálculo de precios
+Lo usan el catálogo y GymMembership sin depender uno del otro
+"""
+
+from collections import namedtuple
+from time import perf_counter_ns
+
+from gym_money import Cents, build_quote_cents, to_dollars
+
+# Registro de métricas opcional (ver gym_metrics); None desactiva la instrumentación
+_metrics = None
+
+# Desglose inmutable de una cotización
+QuoteBreakdown = namedtuple("QuoteBreakdown", [
+    "plan",
+    "num_members",
+    "additional_features",
+    "premium_features",
+    "base_cost",
+    "additional_cost",
+    "premium_cost",
+    "subtotal",
+    "group_discount",
+    "special_discount",
+    "total_after_discounts",
+    "premium_surcharge",
+    "total",
+])
+
+
+def dollars_breakdown(breakdown):
+    """
+    Convierte un desglose en centavos a un QuoteBreakdown en dólares
+
+    Args:
+        breakdown: CentsBreakdown
+
+    Returns:
+        QuoteBreakdown: Mismo desglose con los montos en dólares
+    """
+    return QuoteBreakdown(*breakdown[:4], *map(to_dollars, breakdown[4:]))
+
+
+def active_metrics():
+    """Retorna el registro de métricas activo, o None"""
+    return _metrics
+
+
+def set_metrics(registry):
+    """
+    Activa o desactiva la instrumentación del cálculo de precios
+
+    Args:
+        registry: Registro con record(etapa, ns) e increment(nombre), o None
+
+    Returns:
+        El registro activo anterior
+    """
+    global _metrics
+    previous = _metrics
+    _metrics = registry
+    return previous
+
+
+def stage(metrics, name, mark):
+    """Registra la duración de una etapa y retorna el inicio de la siguiente"""
+    now = perf_counter_ns()
+    metrics.record(name, now - mark)
+    return now
+
+
+def _stage_timer(metrics, mark):
+    """Retorna timer(etapa), que registra cada etapa desde el final de la anterior"""
+    def timer(name):
+        nonlocal mark
+        mark = stage(metrics, name, mark)
+    return timer
+
+
+def build_quote(plan, num_members, additional_features, premium_features,
+                base_cost, additional_cost, premium_cost, catalog, in_cents=False):
+    """
+    Construye el desglose de una cotización sin escribir en stdout
+
+    Los descuentos y recargos salen de las reglas compiladas del catálogo,
+    calculadas en centavos enteros. Si hay un registro de métricas activo
+    (ver set_metrics) se registra el tiempo de cada ajuste (group_discount,
+    special_discount y premium_surcharge) y las ramas aplicadas; sin él el
+    cálculo no paga más que una comparación.
+
+    Args:
+        plan: Nombre del plan
+        num_members: Número de miembros
+        additional_features: Características adicionales seleccionadas
+        premium_features: Características premium seleccionadas
+        base_cost: Costo base del plan
+        additional_cost: Costo de las características adicionales
+        premium_cost: Costo de las características premium
+        catalog: Catálogo cuyas reglas se aplican
+        in_cents: True si los costos vienen en centavos enteros
+
+    Returns:
+        QuoteBreakdown: Desglose completo de la cotización, en dólares
+    """
+    if not in_cents:
+        # Las sumas de precios con centavos pueden arrastrar error de punto flotante
+        base_cost, additional_cost, premium_cost = (
+            Cents.from_dollars(round(cost, 2)) for cost in (base_cost, additional_cost, premium_cost))
+    metrics = _metrics
+    timer = None if metrics is None else _stage_timer(metrics, perf_counter_ns())
+    breakdown = build_quote_cents(
+        plan, num_members, additional_features, premium_features,
+        base_cost, additional_cost, premium_cost, catalog, timer)
+    if metrics is not None:
+        if breakdown.group_discount:
+            metrics.increment("group_discount.applied")
+        if breakdown.special_discount:
+            metrics.increment(f"special_offer.{to_dollars(breakdown.special_discount)}")
+        if breakdown.premium_surcharge:
+            metrics.increment("premium_surcharge.applied")
+        metrics.increment("quotes")
+    return dollars_breakdown(breakdown)
+
+
+def confirmed_cost(breakdown):
+    """
+    Calcula el valor que retorna la confirmación de una cotización
+
+    Args:
+        breakdown: QuoteBreakdown confirmado (o None si no hay plan)
+
+    Returns:
+        int: Costo total como entero positivo si es válido, -1 si no
+    """
+    if breakdown is None:
+        return -1
+    return int(breakdown.total) if breakdown.total > 0 else -1
@@ -0,0 +1,290 @@
+"""
+Registro en memoria de membresías con índices secundarios
+Mapas de bits en bloques por plan, característica y tamaño de grupo para consultas rápidas
+"""
+
+import heapq
+from bisect import bisect_right
+
+from gym_compact import CompactMembership, MembershipCodec
+
+# Límite inferior de cada rango de número de miembros
+MEMBER_BUCKETS = (1, 2, 5)
+# Bits por bloque de los mapas de bits
+BLOCK_BITS = 4096
+
+
+def member_bucket(num_members):
+    """
+    Retorna el rango de miembros al que pertenece una membresía
+
+    Args:
+        num_members: Número de miembros
+
+    Returns:
+        str: Etiqueta del rango ("1", "2-4" o "5+")
+    """
+    index = bisect_right(MEMBER_BUCKETS, num_members) - 1
+    if index < 0:
+        raise ValueError("El número de miembros debe ser al menos 1.")
+    return _BUCKET_LABELS[index]
+
+
+def _bucket_label(index):
+    """Construye la etiqueta de un rango de MEMBER_BUCKETS"""
+    low = MEMBER_BUCKETS[index]
+    if index + 1 == len(MEMBER_BUCKETS):
+        return f"{low}+"
+    high = MEMBER_BUCKETS[index + 1] - 1
+    return str(low) if low == high else f"{low}-{high}"
+
+
+_BUCKET_LABELS = tuple(_bucket_label(index) for index in range(len(MEMBER_BUCKETS)))
+
+
+def _bit_positions(bitmap):
+    """Genera las posiciones de los bits encendidos, de menor a mayor"""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield offset * 8 + low.bit_length() - 1
+            byte ^= low
+
+
+class Bitset:
+    """
+    Mapa de bits dividido en bloques de BLOCK_BITS bits
+
+    Cada bloque es un entero y los bloques vacíos no se guardan, así que
+    encender o apagar un bit solo copia su bloque y no todo el mapa.
+    """
+
+    __slots__ = ("_blocks",)
+
+    def __init__(self, blocks=None):
+        """
+        Inicializa el mapa de bits
+
+        Args:
+            blocks: Diccionario número de bloque -> entero no nulo (opcional)
+        """
+        self._blocks = {} if blocks is None else blocks
+
+    def add(self, position):
+        """Enciende el bit de una posición"""
+        block, offset = divmod(position, BLOCK_BITS)
+        self._blocks[block] = self._blocks.get(block, 0) | (1 << offset)
+
+    def discard(self, position):
+        """Apaga el bit de una posición"""
+        block, offset = divmod(position, BLOCK_BITS)
+        word = self._blocks.get(block, 0) & ~(1 << offset)
+        if word:
+            self._blocks[block] = word
+        else:
+            self._blocks.pop(block, None)
+
+    def __and__(self, other):
+        small, large = sorted((self._blocks, other._blocks), key=len)
+        blocks = {}
+        for block, word in small.items():
+            word &= large.get(block, 0)
+            if word:
+                blocks[block] = word
+        return Bitset(blocks)
+
+    def __or__(self, other):
+        blocks = dict(self._blocks)
+        for block, word in other._blocks.items():
+            blocks[block] = blocks.get(block, 0) | word
+        return Bitset(blocks)
+
+    def __bool__(self):
+        return bool(self._blocks)
+
+    def __len__(self):
+        return sum(word.bit_count() for word in self._blocks.values())
+
+    def __iter__(self):
+        for block in sorted(self._blocks):
+            start = block * BLOCK_BITS
+            for position in _bit_positions(self._blocks[block]):
+                yield start + position
+
+
+# Mapa vacío compartido para las claves sin índice; nunca se modifica
+_EMPTY = Bitset()
+
+
+class MemberRegistry:
+    """
+    Registro de membresías activas con índices por plan, característica y grupo
+
+    Cada índice es un Bitset (un bit por membresía), así que una consulta
+    conjuntiva es un AND de pocos mapas. Los identificadores de las bajas
+    se reutilizan para que los mapas no crezcan con cada inscripción.
+    """
+
+    def __init__(self, codec=None):
+        """
+        Inicializa el registro vacío
+
+        Args:
+            codec: Codificador del catálogo (por defecto el vigente)
+        """
+        self.codec = codec or MembershipCodec()
+        self._members = {}
+        self._next_id = 0
+        # Identificadores libres por bajas, el menor primero
+        self._free = []
+        self._active = Bitset()
+        self._by_plan = {}
+        self._by_additional = {}
+        self._by_premium = {}
+        self._by_bucket = {}
+
+    def __len__(self):
+        return len(self._members)
+
+    def __contains__(self, member_id):
+        return member_id in self._members
+
+    @staticmethod
+    def _indexes(compact):
+        """Genera las claves de índice de una membresía compacta"""
+        yield "_by_plan", compact.plan_code
+        for kind, mask in (("_by_additional", compact.additional_mask),
+                           ("_by_premium", compact.premium_mask)):
+            for bit in _bit_positions(mask):
+                yield kind, bit
+        yield "_by_bucket", member_bucket(compact.num_members)
+
+    def enroll(self, membership):
+        """
+        Registra una membresía y actualiza los índices
+
+        Args:
+            membership: GymMembership o CompactMembership
+
+        Returns:
+            int: Identificador de la membresía en el registro (el menor libre)
+        """
+        if not isinstance(membership, CompactMembership):
+            membership = CompactMembership.from_membership(membership, self.codec)
+        if self._free:
+            member_id = heapq.heappop(self._free)
+        else:
+            member_id = self._next_id
+            self._next_id += 1
+        self._members[member_id] = membership
+        self._active.add(member_id)
+        for kind, key in self._indexes(membership):
+            index = getattr(self, kind)
+            postings = index.get(key)
+            if postings is None:
+                postings = index[key] = Bitset()
+            postings.add(member_id)
+        return member_id
+
+    def cancel(self, member_id):
+        """
+        Da de baja una membresía y la quita de los índices
+
+        Args:
+            member_id: Identificador retornado por enroll()
+
+        Raises:
+            KeyError: Si la membresía no está registrada
+        """
+        membership = self._members.pop(member_id)
+        self._active.discard(member_id)
+        for kind, key in self._indexes(membership):
+            index = getattr(self, kind)
+            index[key].discard(member_id)
+            if not index[key]:
+                del index[key]
+        heapq.heappush(self._free, member_id)
+
+    def get(self, member_id):
+        """
+        Retorna una membresía registrada
+
+        Args:
+            member_id: Identificador de la membresía
+
+        Returns:
+            GymMembership: Membresía equivalente
+        """
+        return self._members[member_id].to_membership(self.codec)
+
+    def _feature_bitmap(self, mask, index):
+        """AND de los mapas de bits de las características de una máscara"""
+        bitmap = self._active
+        for bit in _bit_positions(mask):
+            bitmap &= index.get(bit, _EMPTY)
+        return bitmap
+
+    def _bitmap(self, plan=None, additional_features=(), premium_features=(),
+                any_additional=False, any_premium=False, bucket=None):
+        """Calcula el mapa de bits de una consulta"""
+        bitmap = self._active
+        if plan is not None:
+            bitmap &= self._by_plan.get(self.codec.plan_code(plan), _EMPTY)
+        if additional_features:
+            bitmap &= self._feature_bitmap(
+                self.codec.additional_mask(additional_features), self._by_additional)
+        if premium_features:
+            bitmap &= self._feature_bitmap(
+                self.codec.premium_mask(premium_features), self._by_premium)
+        if any_additional:
+            union = _EMPTY
+            for postings in self._by_additional.values():
+                union |= postings
+            bitmap &= union
+        if any_premium:
+            union = _EMPTY
+            for postings in self._by_premium.values():
+                union |= postings
+            bitmap &= union
+        if bucket is not None:
+            if bucket not in _BUCKET_LABELS:
+                raise ValueError(f"Rango de miembros desconocido: {bucket}")
+            bitmap &= self._by_bucket.get(bucket, _EMPTY)
+        return bitmap
+
+    def query(self, plan=None, additional_features=(), premium_features=(),
+              any_additional=False, any_premium=False, bucket=None):
+        """
+        Busca las membresías que cumplen todas las condiciones
+
+        Args:
+            plan: Plan exacto (opcional)
+            additional_features: Características adicionales que deben tener todas
+            premium_features: Características premium que deben tener todas
+            any_additional: Solo membresías con alguna característica adicional
+            any_premium: Solo membresías con alguna característica premium
+            bucket: Rango de miembros, ver member_bucket() (opcional)
+
+        Returns:
+            list: Identificadores de menor a mayor
+
+        Raises:
+            ValueError: Si un plan, característica o rango no existe
+        """
+        return list(self._bitmap(
+            plan, additional_features, premium_features, any_additional, any_premium, bucket))
+
+    def count(self, plan=None, additional_features=(), premium_features=(),
+              any_additional=False, any_premium=False, bucket=None):
+        """
+        Cuenta las membresías que cumplen todas las condiciones, sin listarlas
+
+        Recibe los mismos argumentos que query().
+
+        Returns:
+            int: Número de membresías
+        """
+        return len(self._bitmap(
+            plan, additional_features, premium_features,
+            any_additional, any_premium, bucket))
@@ -0,0 +1,110 @@
+"""
+Renderizado de listados y resúmenes para terminal
+Los listados se generan una vez por versión de las tablas de precios y cada
+pantalla se escribe de una sola vez
+"""
+
+import sys
+
+RULE = "=" * 60
+SUMMARY_HEADER = f"\n{RULE}\nRESUMEN DE MEMBRESÍA\n{RULE}\n"
+
+# Último texto generado por listado: clave -> (tabla de origen, texto).
+# Las tablas publicadas se reemplazan, no se modifican, así que basta
+# comparar la identidad de la tabla para saber si el texto sigue vigente.
+_cache = {}
+
+
+def _cached(key, table, render):
+    """Retorna el texto de una tabla, generándolo solo si la tabla cambió"""
+    entry = _cache.get(key)
+    if entry is None or entry[0] is not table:
+        entry = (table, render(table))
+        _cache[key] = entry
+    return entry[1]
+
+
+def _render_plans(plans):
+    """Genera el listado de planes"""
+    parts = [f"\n{RULE}\nPLANES DE MEMBRESÍA DISPONIBLES\n{RULE}\n"]
+    for plan_name, details in plans.items():
+        parts.append(f"\n{plan_name}: ${details['cost']}/mes\nBeneficios:\n")
+        parts.extend(f"  - {benefit}\n" for benefit in details['benefits'])
+    parts.append(f"{RULE}\n\n")
+    return "".join(parts)
+
+
+def render_plans(plans):
+    """
+    Retorna el listado de planes tal como lo muestra display_membership_plans
+
+    Args:
+        plans: Tabla de planes
+
+    Returns:
+        str: Listado completo
+    """
+    return _cached("plans", plans, _render_plans)
+
+
+def render_feature_listing(title, features):
+    """
+    Retorna el listado de características de main()
+
+    Args:
+        title: Título del listado
+        features: Tabla de precios de las características
+
+    Returns:
+        str: Título y una línea por característica
+    """
+    return _cached(("listing", title), features, lambda table: f"\n{title}\n" + "".join(
+        f"  - {feature}: ${cost}\n" for feature, cost in table.items()))
+
+
+def _summary_lines(kind, prices):
+    """Retorna la línea de resumen de cada característica de una tabla"""
+    return _cached(("summary", kind), prices, lambda table: {
+        feature: f"  - {feature} (${cost})\n" for feature, cost in table.items()})
+
+
+def render_summary(plan, num_members, additional_features, premium_features,
+                   additional_prices, premium_prices, total_cost):
+    """
+    Retorna el resumen de una membresía tal como lo muestra display_summary
+
+    Args:
+        plan: Plan seleccionado
+        num_members: Número de miembros
+        additional_features: Características adicionales seleccionadas
+        premium_features: Características premium seleccionadas
+        additional_prices: Tabla de precios adicionales
+        premium_prices: Tabla de precios premium
+        total_cost: Costo total
+
+    Returns:
+        str: Resumen completo
+    """
+    parts = [SUMMARY_HEADER, f"Plan seleccionado: {plan}\nNúmero de miembros: {num_members}\n"]
+    if additional_features:
+        lines = _summary_lines("additional", additional_prices)
+        parts.append("\nCaracterísticas adicionales:\n")
+        parts.extend(lines[feature] for feature in additional_features)
+    if premium_features:
+        lines = _summary_lines("premium", premium_prices)
+        parts.append("\nCaracterísticas premium:\n")
+        parts.extend(lines[feature] for feature in premium_features)
+    parts.append(f"\nCosto total: ${total_cost:.2f}\n{RULE}\n\n")
+    return "".join(parts)
+
+
+def write(text):
+    """
+    Escribe un texto en la salida estándar con una sola escritura y un flush
+
+    Args:
+        text: Texto a escribir
+    """
+    stream = sys.stdout
+    stream.write(text)
+    stream.flush()
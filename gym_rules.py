@@ -0,0 +1,306 @@
+"""
+Reglas declarativas de descuentos y recargos
+La tabla de reglas se compila en una sola función de precios
+"""
+
+from collections import namedtuple
+
+from gym_defaults import (
+    GROUP_DISCOUNT_MIN_MEMBERS,
+    GROUP_DISCOUNT_RATE,
+    SPECIAL_OFFERS,
+    PREMIUM_SURCHARGE_RATE,
+)
+from gym_money import Cents, apply_rate_source, rate_to_basis_points
+
+# Tipos de regla soportados
+PERCENT_DISCOUNT = "percent_discount"
+FIXED_DISCOUNT = "fixed_discount"
+PERCENT_SURCHARGE = "percent_surcharge"
+FIXED_SURCHARGE = "fixed_surcharge"
+RULE_KINDS = (PERCENT_DISCOUNT, FIXED_DISCOUNT, PERCENT_SURCHARGE, FIXED_SURCHARGE)
+
+# Montos sobre los que se calcula un porcentaje
+SUBTOTAL = "subtotal"
+RUNNING = "running"
+
+# Regla de precios. Las condiciones en None no se evalúan.
+#   value: tasa (0.10) para porcentajes o monto en dólares para montos fijos
+#   base: SUBTOTAL (subtotal original) o RUNNING (total acumulado hasta la regla)
+#   min_members: número mínimo de miembros
+#   subtotal_over: el subtotal debe ser estrictamente mayor a este monto
+#   requires_premium: True si exige características premium
+#   exclusive_group: de las reglas de un mismo grupo solo se aplica la primera que cumpla
+#   order: posición de la regla; las menores se aplican primero
+PricingRule = namedtuple("PricingRule", [
+    "name", "kind", "value", "base", "min_members", "subtotal_over",
+    "requires_premium", "exclusive_group", "order",
+], defaults=[SUBTOTAL, None, None, False, None, 0])
+
+
+def _default_rules():
+    """Construye la tabla de reglas equivalente a GymMembership"""
+    rules = [PricingRule(
+        "group_discount", PERCENT_DISCOUNT, GROUP_DISCOUNT_RATE,
+        min_members=GROUP_DISCOUNT_MIN_MEMBERS, order=10)]
+    for position, (threshold, discount) in enumerate(SPECIAL_OFFERS):
+        rules.append(PricingRule(
+            f"special_offer_{threshold}", FIXED_DISCOUNT, discount,
+            subtotal_over=threshold, exclusive_group="special_offer", order=20 + position))
+    rules.append(PricingRule(
+        "premium_surcharge", PERCENT_SURCHARGE, PREMIUM_SURCHARGE_RATE,
+        base=RUNNING, requires_premium=True, order=30))
+    return tuple(rules)
+
+
+DEFAULT_RULES = _default_rules()
+
+
+def _number(value, name):
+    """Valida que un valor de la tabla sea numérico y lo escribe como literal"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Regla '{name}': se esperaba un número, no {value!r}.")
+    return repr(value)
+
+
+def _cents(value, name):
+    """Valida un monto en dólares y lo escribe como literal en centavos"""
+    _number(value, name)
+    return str(int(Cents.from_dollars(value)))
+
+
+def _validate(rules):
+    """
+    Ordena y valida la tabla de reglas
+
+    Raises:
+        ValueError: Si una regla está mal formada o un grupo exclusivo queda
+                    partido por reglas de otro grupo
+    """
+    ordered = sorted(rules, key=lambda rule: rule.order)
+    closed = set()
+    previous = None
+    for rule in ordered:
+        if not isinstance(rule.name, str) or not rule.name.isprintable():
+            raise ValueError(f"Nombre de regla inválido: {rule.name!r}.")
+        if rule.kind not in RULE_KINDS:
+            raise ValueError(f"Regla '{rule.name}': tipo no soportado '{rule.kind}'.")
+        if rule.base not in (SUBTOTAL, RUNNING):
+            raise ValueError(f"Regla '{rule.name}': base no soportada '{rule.base}'.")
+        group = rule.exclusive_group
+        if group != previous:
+            if group is not None and group in closed:
+                raise ValueError(
+                    f"Regla '{rule.name}': las reglas del grupo exclusivo '{group}' "
+                    "deben tener órdenes consecutivos.")
+            closed.add(previous)
+            previous = group
+    return ordered
+
+
+def member_thresholds(rules):
+    """
+    Retorna los mínimos de miembros que usan las reglas
+
+    El precio de una selección solo depende de cuántos de estos mínimos
+    alcanza el grupo.
+
+    Args:
+        rules: Tabla de PricingRule
+
+    Returns:
+        tuple: Mínimos distintos, de menor a mayor
+    """
+    return tuple(sorted({rule.min_members for rule in rules if rule.min_members is not None}))
+
+
+def subtotal_thresholds(rules):
+    """
+    Retorna los umbrales de subtotal que usan las reglas, en centavos
+
+    Args:
+        rules: Tabla de PricingRule
+
+    Returns:
+        tuple: Umbrales distintos en centavos, de menor a mayor
+    """
+    return tuple(sorted({int(_cents(rule.subtotal_over, rule.name))
+                         for rule in rules if rule.subtotal_over is not None}))
+
+
+def _conditions(rule):
+    """Retorna la condición de una regla como expresión de Python, en centavos"""
+    parts = []
+    if rule.min_members is not None:
+        parts.append(f"num_members >= {_number(rule.min_members, rule.name)}")
+    if rule.subtotal_over is not None:
+        parts.append(f"subtotal > {_cents(rule.subtotal_over, rule.name)}")
+    if rule.requires_premium:
+        parts.append("has_premium")
+    return " and ".join(parts) or "True"
+
+
+def _applies(rule, subtotal, num_members, has_premium):
+    """True si se cumplen las condiciones de una regla (subtotal en centavos)"""
+    return ((rule.min_members is None or num_members >= rule.min_members)
+            and (rule.subtotal_over is None
+                 or subtotal > int(_cents(rule.subtotal_over, rule.name)))
+            and (not rule.requires_premium or has_premium))
+
+
+def applied_rules(rules, subtotal, num_members, has_premium, kinds=None):
+    """
+    Retorna las reglas que aplica la función compilada a una selección
+
+    Args:
+        rules: Tabla de PricingRule
+        subtotal: Subtotal en centavos
+        num_members: Número de miembros
+        has_premium: True si hay características premium
+        kinds: Tipos de regla a considerar (por defecto todos)
+
+    Returns:
+        list: PricingRule aplicadas, en el orden en que se aplican
+    """
+    applied = []
+    taken = set()
+    for rule in _validate(rules):
+        if kinds is not None and rule.kind not in kinds:
+            continue
+        if rule.exclusive_group in taken:
+            continue
+        if _applies(rule, subtotal, num_members, has_premium):
+            applied.append(rule)
+            if rule.exclusive_group is not None:
+                taken.add(rule.exclusive_group)
+    return applied
+
+
+def _amount(rule):
+    """Expresión del ajuste de una regla en centavos, redondeada como apply_rate()"""
+    if rule.kind in (PERCENT_DISCOUNT, PERCENT_SURCHARGE):
+        _number(rule.value, rule.name)
+        base = "subtotal" if rule.base == SUBTOTAL else "total"
+        return apply_rate_source(base, rate_to_basis_points(rule.value))
+    return _cents(rule.value, rule.name)
+
+
+# Acumulador del desglose de cada tipo de regla
+_ACCUMULATORS = {
+    PERCENT_DISCOUNT: "percent_discounts",
+    FIXED_DISCOUNT: "fixed_discounts",
+    PERCENT_SURCHARGE: "surcharges",
+    FIXED_SURCHARGE: "surcharges",
+}
+# Tipos de regla de cada ajuste del desglose, en el orden en que los retorna
+# la función compilada con breakdown=True
+ADJUSTMENT_KINDS = {
+    "group_discount": (PERCENT_DISCOUNT,),
+    "special_discount": (FIXED_DISCOUNT,),
+    "premium_surcharge": (PERCENT_SURCHARGE, FIXED_SURCHARGE),
+}
+# Ajuste del desglose al que pertenece cada tipo de regla
+_ADJUSTMENT_OF_KIND = {kind: name for name, kinds in ADJUSTMENT_KINDS.items() for kind in kinds}
+
+
+def _group_lines(group, breakdown):
+    """Líneas de un grupo de reglas: un if seguido de un elif por regla exclusiva"""
+    lines = []
+    for position, member in enumerate(group):
+        keyword = "if" if position == 0 else "elif"
+        operator = "-=" if member.kind in (PERCENT_DISCOUNT, FIXED_DISCOUNT) else "+="
+        lines.append(f"    # {member.name}")
+        lines.append(f"    {keyword} {_conditions(member)}:")
+        if breakdown:
+            lines.append(f"        amount = {_amount(member)}")
+            lines.append(f"        {_ACCUMULATORS[member.kind]} += amount")
+            lines.append(f"        total {operator} amount")
+        else:
+            lines.append(f"        total {operator} {_amount(member)}")
+    return lines
+
+
+def generate_source(rules, cents=False, breakdown=False, kinds=None, timed=False):
+    """
+    Genera el código fuente de la función de precios
+
+    Todas las variantes calculan en centavos enteros y redondean cada ajuste
+    al centavo; la variante en dólares solo convierte la entrada y la salida.
+
+    Args:
+        rules: Tabla de PricingRule
+        cents: True para recibir y retornar centavos enteros
+        breakdown: True para retornar también los ajustes (solo en centavos)
+        kinds: Tipos de regla a incluir (por defecto todos)
+        timed: True para recibir un cuarto argumento timer y llamar
+               timer(ajuste) al terminar las reglas de cada ajuste (solo con
+               breakdown); un grupo exclusivo cuenta en el ajuste de su
+               primera regla
+
+    Returns:
+        str: Código de la función price(subtotal, num_members, has_premium)
+
+    Raises:
+        ValueError: Si se pide desglose sin centavos o medición sin desglose
+    """
+    if breakdown and not cents:
+        raise ValueError("El desglose solo se genera en centavos.")
+    if timed and not breakdown:
+        raise ValueError("La medición por ajuste solo se genera con desglose.")
+    timer = ", timer" if timed else ""
+    lines = [f"def price(subtotal, num_members, has_premium{timer}):"]
+    if not cents:
+        lines.append("    subtotal = round(subtotal * 100)")
+    lines.append("    total = subtotal")
+    if breakdown:
+        lines.append("    percent_discounts = fixed_discounts = surcharges = 0")
+    ordered = [rule for rule in _validate(rules) if kinds is None or rule.kind in kinds]
+    index = 0
+    adjustment = None
+    while index < len(ordered):
+        rule = ordered[index]
+        if timed and adjustment not in (None, _ADJUSTMENT_OF_KIND[rule.kind]):
+            lines.append(f"    timer({adjustment!r})")
+        adjustment = _ADJUSTMENT_OF_KIND[rule.kind]
+        group = [rule]
+        if rule.exclusive_group is not None:
+            while (index + len(group) < len(ordered)
+                   and ordered[index + len(group)].exclusive_group == rule.exclusive_group):
+                group.append(ordered[index + len(group)])
+        lines.extend(_group_lines(group, breakdown))
+        index += len(group)
+    if timed and adjustment is not None:
+        lines.append(f"    timer({adjustment!r})")
+    if breakdown:
+        lines.append("    return percent_discounts, fixed_discounts, surcharges, total")
+    else:
+        lines.append("    return total" if cents else "    return total / 100")
+    return "\n".join(lines) + "\n"
+
+
+def compile_rules(rules=DEFAULT_RULES, cents=False, breakdown=False, kinds=None,
+                  timed=False):
+    """
+    Compila la tabla de reglas en una función especializada
+
+    La función resultante no recorre la tabla: cada regla queda como una
+    instrucción con sus constantes ya escritas.
+
+    Args:
+        rules: Tabla de PricingRule
+        cents: True para recibir y retornar centavos enteros
+        breakdown: True para retornar (descuentos porcentuales, descuentos
+                   fijos, recargos, total) en centavos
+        kinds: Tipos de regla a incluir (por defecto todos)
+        timed: True para llamar timer(ajuste) tras cada ajuste (ver
+               generate_source)
+
+    Returns:
+        function: price(subtotal, num_members, has_premium)
+    """
+    source = generate_source(rules, cents, breakdown, kinds, timed)
+    namespace = {}
+    exec(compile(source, "<gym_rules>", "exec"), namespace)  # pylint: disable=exec-used
+    price = namespace["price"]
+    price.source = source
+    return price
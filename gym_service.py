@@ -0,0 +1,403 @@
+"""
+Servicio asíncrono de cotización y confirmación
+Protocolo de líneas JSON sobre TCP o socket Unix, con micro-lotes y contrapresión
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import errno
+import itertools
+import json
+import os
+import signal
+import socket
+import stat
+
+from gym_batch import quote_batch_breakdowns
+from gym_catalog import QuoteCache, current_catalog
+from gym_client import DEFAULT_SOCKET
+from gym_quote import confirmed_cost
+from gym_stream import parse_record, result_row
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Permisos del socket Unix: solo el usuario del servicio
+SOCKET_MODE = 0o600
+
+
+class QuoteService:
+    """Servicio de cotizaciones compartido por kioscos y web"""
+
+    def __init__(self, max_batch=64, max_pending=1024,
+                 max_connections=1000, max_inflight=32, cache=None, on_confirm=None):
+        """
+        Inicializa el servicio
+
+        Args:
+            max_batch: Máximo de cotizaciones por micro-lote
+            max_pending: Cotizaciones en cola antes de frenar a los clientes
+            max_connections: Conexiones simultáneas permitidas
+            max_inflight: Solicitudes en curso por conexión
+            cache: QuoteCache a usar (opcional)
+            on_confirm: Función llamada con el QuoteBreakdown al confirmar (opcional);
+                retorna el número de confirmación o un futuro que se resuelve con él
+                (por ejemplo MembershipStore.append, que responde con el id del
+                registro cuando ya es durable)
+        """
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.max_connections = max_connections
+        self.max_inflight = max_inflight
+        self.cache = cache or QuoteCache()
+        self.on_confirm = on_confirm
+        self.batches = 0
+        self.connections = 0
+        self._queue = None
+        self._batcher = None
+        # Números de confirmación locales, solo si no hay on_confirm
+        self._confirmation_ids = itertools.count(1)
+
+    async def start_batcher(self):
+        """Arranca la tarea que agrupa y cotiza las solicitudes"""
+        if self._batcher is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def stop_batcher(self):
+        """Detiene la tarea de micro-lotes"""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+
+    async def _batch_loop(self):
+        """
+        Cotiza juntas las solicitudes que ya están en cola
+
+        No espera a que lleguen más: bajo carga los lotes crecen solos y sin
+        carga cada cotización sale de inmediato. Todo el lote usa la misma
+        versión del catálogo, y el error de una solicitud solo le llega a ella.
+        """
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self.batches += 1
+            self._quote_batch(batch, current_catalog())
+
+    def _quote_batch(self, batch, catalog):
+        """
+        Cotiza un micro-lote en una sola pasada por columnas
+
+        Las selecciones que ya están en la caché no se vuelven a cotizar, y
+        las solicitudes inválidas reciben su error antes de cotizar, así que
+        no detienen a las demás.
+
+        Args:
+            batch: Pares (EnrollmentRecord, futuro) del lote
+            catalog: Catálogo con que se cotiza todo el lote
+        """
+        pending = []
+        for record, future in batch:
+            if future.cancelled():
+                continue
+            try:
+                catalog.validate(record.plan, record.additional_features,
+                                 record.premium_features, record.num_members)
+                breakdown = self.cache.get(record.plan, record.additional_features,
+                                           record.premium_features, record.num_members,
+                                           catalog)
+            except Exception as error:  # pylint: disable=broad-except
+                future.set_exception(error)
+            else:
+                if breakdown is None:
+                    pending.append((record, future))
+                else:
+                    future.set_result(breakdown)
+        if not pending:
+            return
+        records = [record for record, _ in pending]
+        try:
+            breakdowns = quote_batch_breakdowns(
+                [record.plan for record in records],
+                [record.additional_features for record in records],
+                [record.premium_features for record in records],
+                [record.num_members for record in records],
+                catalog,
+            )
+        except Exception as error:  # pylint: disable=broad-except
+            for _, future in pending:
+                future.set_exception(error)
+            return
+        for (_, future), breakdown in zip(pending, breakdowns):
+            self.cache.put(breakdown, catalog)
+            future.set_result(breakdown)
+
+    async def quote(self, record):
+        """
+        Cotiza una inscripción a través del micro-lote
+
+        Espera si la cola está llena (contrapresión).
+
+        Args:
+            record: EnrollmentRecord a cotizar
+
+        Returns:
+            QuoteBreakdown: Desglose de la cotización
+        """
+        await self.start_batcher()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def confirm(self, record):
+        """
+        Confirma una inscripción de forma explícita, sin pedir datos por terminal
+
+        Args:
+            record: EnrollmentRecord a confirmar
+
+        Returns:
+            dict: Número de confirmación (el que asigna on_confirm), valor
+                  confirmado y cotización
+        """
+        breakdown = await self.quote(record)
+        if self.on_confirm is None:
+            confirmation_id = next(self._confirmation_ids)
+        else:
+            confirmation_id = self.on_confirm(breakdown)
+            if isinstance(confirmation_id, concurrent.futures.Future):
+                confirmation_id = await asyncio.wrap_future(confirmation_id)
+        return {
+            "confirmation": confirmation_id,
+            "result": confirmed_cost(breakdown),
+            "quote": result_row(None, breakdown),
+        }
+
+    @staticmethod
+    def catalog_listing():
+        """
+        Retorna los planes y características del catálogo vigente
+
+        Returns:
+            dict: Versión, planes y precios de características
+        """
+        return current_catalog().to_dict()
+
+    def warm_up(self):
+        """Precalcula la caché con cada plan del catálogo vigente"""
+        catalog = current_catalog()
+        for plan in catalog.plans:
+            for num_members in (1, 2):
+                self.cache.quote(plan, num_members=num_members, catalog=catalog)
+
+    async def handle_request(self, message):
+        """
+        Atiende una solicitud ya decodificada
+
+        Args:
+            message: Diccionario con "op" ("quote", "confirm" o "catalog") y la inscripción
+
+        Returns:
+            dict: Respuesta con "ok" y el resultado o el error
+        """
+        response = {"id": message.get("id")} if isinstance(message, dict) else {"id": None}
+        try:
+            if not isinstance(message, dict):
+                raise ValueError("La solicitud debe ser un objeto.")
+            operation = message.get("op", "quote")
+            if operation == "quote":
+                response["quote"] = result_row(None, await self.quote(parse_record(message)))
+            elif operation == "confirm":
+                response.update(await self.confirm(parse_record(message)))
+            elif operation == "catalog":
+                response["catalog"] = self.catalog_listing()
+            else:
+                raise ValueError(f"Operación no soportada: {operation}")
+        except ValueError as error:
+            response.update(ok=False, error=str(error))
+            return response
+        except Exception as error:  # pylint: disable=broad-except
+            # Cualquier otro fallo se responde al cliente sin cerrar la conexión
+            response.update(ok=False, error=f"Error interno: {error}")
+            return response
+        response["ok"] = True
+        return response
+
+    async def handle_connection(self, reader, writer):
+        """
+        Atiende una conexión de líneas JSON
+
+        Las respuestas pueden llegar en otro orden; cada una lleva el "id"
+        de su solicitud.
+        """
+        if self.connections >= self.max_connections:
+            writer.write(b'{"id": null, "ok": false, "error": "Servidor ocupado."}\n')
+            await writer.drain()
+            writer.close()
+            return
+        self.connections += 1
+        inflight = asyncio.Semaphore(self.max_inflight)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line):
+            try:
+                try:
+                    message = json.loads(line)
+                except ValueError as error:
+                    response = {"id": None, "ok": False, "error": f"JSON inválido: {error}"}
+                else:
+                    response = await self.handle_request(message)
+                async with write_lock:
+                    writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                    await writer.drain()
+            finally:
+                inflight.release()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # Deja de leer si la conexión ya tiene demasiadas solicitudes en curso
+                await inflight.acquire()
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Abre el servidor TCP
+
+        Returns:
+            asyncio.Server: Servidor escuchando
+        """
+        await self.start_batcher()
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve_unix(self, path=DEFAULT_SOCKET, mode=SOCKET_MODE):
+        """
+        Abre el servidor en un socket Unix local
+
+        Un socket anterior en la misma ruta solo se reemplaza si nadie lo
+        atiende. El directorio se crea privado si no existe y el socket se
+        crea ya con permisos restringidos.
+
+        Args:
+            path: Ruta del socket
+            mode: Permisos finales del socket
+
+        Returns:
+            asyncio.Server: Servidor escuchando
+
+        Raises:
+            PermissionError: Si el directorio es de otro usuario o cualquiera puede
+                             reemplazar archivos en él
+            FileExistsError: Si la ruta existe y no es un socket
+            OSError: Si otro servicio ya escucha en la ruta
+        """
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        _check_socket_directory(directory)
+        _remove_stale_socket(path)
+        await self.start_batcher()
+        # La máscara es del proceso: se restringe solo mientras se crea el socket
+        previous = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self.handle_connection, path)
+        finally:
+            os.umask(previous)
+        os.chmod(path, mode)
+        return server
+
+
+def _check_socket_directory(directory):
+    """
+    Verifica que nadie más pueda reemplazar el socket en su directorio
+
+    El directorio debe ser del usuario (o de root) y, si otros pueden
+    escribir en él, tener el bit sticky como /tmp.
+
+    Raises:
+        PermissionError: Si el directorio no es seguro
+    """
+    status = os.stat(directory)
+    if status.st_uid not in (os.getuid(), 0):
+        raise PermissionError(errno.EPERM, "El directorio del socket es de otro usuario",
+                              directory)
+    if status.st_mode & 0o022 and not status.st_mode & stat.S_ISVTX:
+        raise PermissionError(errno.EPERM, "Otros usuarios pueden escribir en el directorio",
+                              directory)
+
+
+def _remove_stale_socket(path):
+    """
+    Borra un socket abandonado por un servicio que ya terminó
+
+    Raises:
+        FileExistsError: Si la ruta existe y no es un socket
+        OSError: Si un servicio todavía acepta conexiones en la ruta
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(errno.EEXIST, "La ruta existe y no es un socket", path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.remove(path)
+            return
+    raise OSError(errno.EADDRINUSE, "Otro servicio ya escucha en el socket", path)
+
+
+async def _run(host, port, socket_path=None):
+    """Ejecuta el servicio hasta que se interrumpa"""
+    service = QuoteService()
+    service.warm_up()
+    if socket_path:
+        server = await service.serve_unix(socket_path)
+    else:
+        server = await service.serve(host, port)
+    # SIGTERM detiene el servicio de forma ordenada y limpia el socket
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main(argv=None):
+    """Función principal para ejecutar el servicio"""
+    parser = argparse.ArgumentParser(description="Servicio de cotización de membresías")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", nargs="?", const=DEFAULT_SOCKET, metavar="PATH",
+                        help="Escucha en un socket Unix (servicio residente para kioscos)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_run(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Almacén durable de membresías confirmadas
+SQLite en modo WAL con escrituras agrupadas en un solo commit
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from gym_quote import QuoteBreakdown
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS confirmed_memberships (
+    id INTEGER PRIMARY KEY,
+    confirmed_at REAL NOT NULL,
+    plan TEXT NOT NULL,
+    num_members INTEGER NOT NULL,
+    additional_features TEXT NOT NULL,
+    premium_features TEXT NOT NULL,
+    total REAL NOT NULL,
+    total_cents INTEGER NOT NULL
+)
+"""
+
+# Bajas: una fila por membresía cancelada, con la fecha de la baja
+CANCELLED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cancelled_memberships (
+    id INTEGER PRIMARY KEY REFERENCES confirmed_memberships (id),
+    cancelled_at REAL NOT NULL
+)
+"""
+
+INSERT = """
+INSERT INTO confirmed_memberships
+    (confirmed_at, plan, num_members, additional_features, premium_features, total, total_cents)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Marca de cierre para el hilo escritor
+_CLOSE = object()
+# Muestras de latencia conservadas para las estadísticas
+LATENCY_SAMPLES = 100000
+
+
+def _active_filter(active_only, keyword):
+    """Condición SQL que excluye las bajas, o nada si se piden todas"""
+    if not active_only:
+        return ""
+    return f" {keyword} id NOT IN (SELECT id FROM cancelled_memberships)"
+
+
+class MembershipStore:
+    """Registro durable de membresías confirmadas con commits agrupados"""
+
+    def __init__(self, path, batch_size=512, max_delay=0.0):
+        """
+        Abre (o crea) el almacén
+
+        Al abrirlo, SQLite reproduce el WAL de una sesión interrumpida y
+        se verifica la integridad de la base.
+
+        Args:
+            path: Ruta del archivo SQLite
+            batch_size: Máximo de confirmaciones por commit
+            max_delay: Segundos que se espera para juntar más confirmaciones
+
+        Raises:
+            sqlite3.DatabaseError: Si la base está dañada
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._records = 0
+        self._commits = 0
+        self._commit_seconds = deque(maxlen=LATENCY_SAMPLES)
+        self._latency_seconds = deque(maxlen=LATENCY_SAMPLES)
+        self._started = time.perf_counter()
+
+        connection = self._connect()
+        try:
+            result = connection.execute("PRAGMA quick_check").fetchone()[0]
+            if result != "ok":
+                raise sqlite3.DatabaseError(f"Almacén dañado: {result}")
+            connection.execute(SCHEMA)
+            connection.execute(CANCELLED_SCHEMA)
+            connection.commit()
+        finally:
+            connection.close()
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        """Abre una conexión con durabilidad completa en cada commit"""
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        return connection
+
+    def append(self, breakdown, confirmed_at=None):
+        """
+        Agrega una confirmación a la cola de escritura
+
+        Args:
+            breakdown: QuoteBreakdown confirmado
+            confirmed_at: Marca de tiempo (por defecto ahora)
+
+        Returns:
+            Future: Se resuelve con el id del registro cuando es durable
+        """
+        future = Future()
+        row = (
+            time.time() if confirmed_at is None else confirmed_at,
+            breakdown.plan,
+            breakdown.num_members,
+            json.dumps(list(breakdown.additional_features), ensure_ascii=False),
+            json.dumps(list(breakdown.premium_features), ensure_ascii=False),
+            breakdown.total,
+            int(round(breakdown.total * 100)),
+        )
+        self._queue.put((row, future, time.perf_counter()))
+        return future
+
+    def _write_loop(self):
+        """Escribe las confirmaciones en lotes, un commit (y un fsync) por lote"""
+        connection = self._connect()
+        closing = False
+        while not closing:
+            item = self._queue.get()
+            if item is _CLOSE:
+                break
+            batch = [item]
+            deadline = time.perf_counter() + self.max_delay
+            while len(batch) < self.batch_size:
+                try:
+                    timeout = deadline - time.perf_counter()
+                    item = self._queue.get(timeout=timeout) if timeout > 0 \
+                        else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _CLOSE:
+                    closing = True
+                    break
+                batch.append(item)
+            self._commit(connection, batch)
+        connection.close()
+
+    def _commit(self, connection, batch):
+        """
+        Guarda un lote en una sola transacción y resuelve sus futuros
+
+        Las confirmaciones cuyo futuro se canceló antes de llegar al escritor
+        no se escriben; una vez tomadas ya no se pueden cancelar.
+        """
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        # Las barreras de flush() llegan con fila None y no se escriben
+        rows = [item for item in batch if item[0] is not None]
+        started = time.perf_counter()
+        try:
+            with connection:
+                ids = [connection.execute(INSERT, row).lastrowid for row, _, _ in rows]
+        except sqlite3.Error as error:
+            for _, future, _ in batch:
+                future.set_exception(error)
+            return
+        finished = time.perf_counter()
+        if rows:
+            with self._stats_lock:
+                self._records += len(rows)
+                self._commits += 1
+                self._commit_seconds.append(finished - started)
+                self._latency_seconds.extend(finished - queued for _, _, queued in rows)
+        for row_id, (_, future, _) in zip(ids, rows):
+            future.set_result(row_id)
+        for row, future, _ in batch:
+            if row is None:
+                future.set_result(None)
+
+    def flush(self):
+        """Espera a que todas las confirmaciones encoladas sean durables"""
+        barrier = Future()
+        self._queue.put((None, barrier, time.perf_counter()))
+        barrier.result()
+
+    def close(self):
+        """Escribe lo pendiente y detiene el hilo escritor"""
+        if self._writer.is_alive():
+            self._queue.put(_CLOSE)
+            self._writer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def cancel(self, member_id, cancelled_at=None):
+        """
+        Da de baja una membresía confirmada
+
+        La baja se guarda aparte, así que el registro de la confirmación no
+        cambia. Cancelar dos veces conserva la fecha de la primera baja.
+
+        Args:
+            member_id: Id del registro retornado por append()
+            cancelled_at: Marca de tiempo (por defecto ahora)
+
+        Raises:
+            KeyError: Si no hay una membresía confirmada con ese id
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                if connection.execute("SELECT 1 FROM confirmed_memberships WHERE id = ?",
+                                      (member_id,)).fetchone() is None:
+                    raise KeyError(member_id)
+                connection.execute(
+                    "INSERT OR IGNORE INTO cancelled_memberships (id, cancelled_at) "
+                    "VALUES (?, ?)",
+                    (member_id, time.time() if cancelled_at is None else cancelled_at))
+        finally:
+            connection.close()
+
+    def count(self, active_only=False):
+        """
+        Retorna el número de membresías confirmadas guardadas
+
+        Args:
+            active_only: Si es True, no cuenta las membresías dadas de baja
+        """
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute(
+                "SELECT COUNT(*) FROM confirmed_memberships" + _active_filter(active_only, "WHERE")
+            ).fetchone()[0]
+        finally:
+            connection.close()
+
+    def replay(self, after_id=0, active_only=False):
+        """
+        Genera las confirmaciones guardadas en orden de escritura
+
+        Args:
+            after_id: Solo registros con id mayor a este
+            active_only: Si es True, omite las membresías dadas de baja
+
+        Yields:
+            tuple: (id, marca de tiempo, QuoteBreakdown parcial con plan, miembros,
+                    características y total)
+        """
+        connection = sqlite3.connect(self.path)
+        try:
+            cursor = connection.execute(
+                "SELECT id, confirmed_at, plan, num_members, additional_features, "
+                "premium_features, total FROM confirmed_memberships WHERE id > ?"
+                + _active_filter(active_only, "AND") + " ORDER BY id",
+                (after_id,))
+            for row_id, confirmed_at, plan, members, additional, premium, total in cursor:
+                yield row_id, confirmed_at, QuoteBreakdown(
+                    plan, members, tuple(json.loads(additional)), tuple(json.loads(premium)),
+                    None, None, None, None, None, None, None, None, total)
+        finally:
+            connection.close()
+
+    def stats(self):
+        """
+        Retorna el rendimiento del camino de escritura
+
+        Returns:
+            dict: Registros, commits, tamaño medio de lote, registros/seg y
+                  latencias p50/p99 (ms) de commit y de confirmación
+        """
+        with self._stats_lock:
+            commits = sorted(self._commit_seconds)
+            latencies = sorted(self._latency_seconds)
+            elapsed = time.perf_counter() - self._started
+
+            def percentile(values, fraction):
+                if not values:
+                    return 0.0
+                return values[min(len(values) - 1, int(fraction * len(values)))] * 1000
+
+            return {
+                "records": self._records,
+                "commits": self._commits,
+                "mean_batch": self._records / self._commits if self._commits else 0.0,
+                "records_per_sec": self._records / elapsed if elapsed else 0.0,
+                "commit_p50_ms": percentile(commits, 0.50),
+                "commit_p99_ms": percentile(commits, 0.99),
+                "latency_p50_ms": percentile(latencies, 0.50),
+                "latency_p99_ms": percentile(latencies, 0.99),
+            }
@@ -0,0 +1,349 @@
+"""
+Cotización masiva en streaming
+Lee inscripciones desde CSV o JSONL y escribe las cotizaciones una a una
+"""
+
+import argparse
+import csv
+import json
+import sys
+from collections import namedtuple
+
+from gym_catalog import QuoteCache
+
+# Inscripción a cotizar
+EnrollmentRecord = namedtuple("EnrollmentRecord", [
+    "plan",
+    "num_members",
+    "additional_features",
+    "premium_features",
+])
+
+# Columnas de salida en formato CSV
+OUTPUT_FIELDS = [
+    "line", "plan", "members", "additional_features", "premium_features",
+    "subtotal", "group_discount", "special_discount", "premium_surcharge", "total",
+]
+# Separador de características dentro de una celda CSV
+FEATURE_SEPARATOR = ";"
+# Errores de un registro mal formado: se rechaza ese registro y se sigue
+RECORD_ERRORS = (ValueError, TypeError, AttributeError, OverflowError)
+
+
+def _split_features(value):
+    """
+    Normaliza una lista de características
+
+    Acepta una lista de textos o un texto separado por punto y coma, y
+    quita repetidos.
+
+    Args:
+        value: Lista, texto o None
+
+    Returns:
+        tuple: Nombres de las características
+
+    Raises:
+        ValueError: Si no es una lista o un texto, o algún nombre no es texto
+    """
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        value = value.split(FEATURE_SEPARATOR)
+    elif not isinstance(value, (list, tuple)):
+        raise ValueError("Las características deben ser una lista o un texto.")
+    for name in value:
+        if not isinstance(name, str):
+            raise ValueError(f"Nombre de característica inválido: {name!r}")
+    return tuple(dict.fromkeys(name.strip() for name in value if name.strip()))
+
+
+def _parse_members(value):
+    """
+    Convierte el número de miembros de un registro
+
+    Acepta enteros, textos con un entero y números con valor entero.
+
+    Args:
+        value: Valor leído (None o vacío equivalen a 1)
+
+    Returns:
+        int: Número de miembros
+
+    Raises:
+        ValueError: Si no es un número entero
+    """
+    if value is None or value == "":
+        return 1
+    if isinstance(value, bool):
+        raise ValueError(f"Número de miembros inválido: {value!r}")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"Número de miembros inválido: {value!r}")
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    raise ValueError(f"Número de miembros inválido: {value!r}")
+
+
+def parse_record(raw):
+    """
+    Convierte un registro leído en EnrollmentRecord
+
+    Args:
+        raw: Diccionario con plan, members y características
+
+    Returns:
+        EnrollmentRecord: Inscripción validada en su forma
+
+    Raises:
+        ValueError: Si el registro está incompleto, mal formado o un valor
+                    no es del tipo esperado
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("El registro debe ser un objeto.")
+    plan = raw.get("plan")
+    if plan is not None and not isinstance(plan, str):
+        raise ValueError(f"Plan inválido: {plan!r}")
+    if not plan or not plan.strip():
+        raise ValueError("El registro no tiene plan.")
+    return EnrollmentRecord(
+        plan.strip(),
+        _parse_members(raw.get("members", 1)),
+        _split_features(raw.get("additional_features")),
+        _split_features(raw.get("premium_features")),
+    )
+
+
+def read_raw_records(stream, fmt):
+    """
+    Genera los registros crudos de un archivo
+
+    Args:
+        stream: Archivo de texto abierto
+        fmt: "csv" o "jsonl"
+
+    Yields:
+        tuple: (número de línea, registro crudo o excepción)
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for raw in reader:
+            yield reader.line_num, raw
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as error:
+                yield line_number, error
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def quote_record(record, cache, catalog=None):
+    """
+    Cotiza una inscripción con las reglas de GymMembership
+
+    Args:
+        record: EnrollmentRecord a cotizar
+        cache: QuoteCache a usar
+        catalog: Catálogo a usar (por defecto el vigente)
+
+    Returns:
+        QuoteBreakdown: Desglose de la cotización
+    """
+    return cache.quote(
+        record.plan,
+        record.additional_features,
+        record.premium_features,
+        record.num_members,
+        catalog,
+    )
+
+
+def quote_raw_record(raw, cache, catalog=None):
+    """
+    Valida y cotiza un registro crudo
+
+    Args:
+        raw: Registro crudo, o la excepción con que falló su lectura
+        cache: QuoteCache a usar
+        catalog: Catálogo a usar (por defecto el vigente)
+
+    Returns:
+        QuoteBreakdown: Desglose de la cotización
+
+    Raises:
+        ValueError: Si el registro es inválido
+    """
+    if isinstance(raw, Exception):
+        raise ValueError(f"JSON inválido: {raw}")
+    return quote_record(parse_record(raw), cache, catalog)
+
+
+def quote_stream(raw_records, rejects=None, cache=None):
+    """
+    Cotiza registros crudos de forma incremental
+
+    Los registros inválidos (cualquier error de RECORD_ERRORS) se envían a
+    rejects y no detienen el proceso.
+
+    Args:
+        raw_records: Iterable de (número de línea, registro crudo)
+        rejects: Función que recibe (línea, error, registro) (opcional)
+        cache: QuoteCache a usar (opcional)
+
+    Yields:
+        tuple: (número de línea, QuoteBreakdown)
+    """
+    if cache is None:
+        cache = QuoteCache()
+    for line_number, raw in raw_records:
+        try:
+            breakdown = quote_raw_record(raw, cache)
+        except RECORD_ERRORS as error:
+            if rejects is not None:
+                rejects(line_number, str(error), raw)
+            continue
+        yield line_number, breakdown
+
+
+def result_row(line_number, breakdown):
+    """
+    Convierte una cotización en fila de salida
+
+    Args:
+        line_number: Línea de origen
+        breakdown: QuoteBreakdown de la inscripción
+
+    Returns:
+        dict: Fila con las columnas de OUTPUT_FIELDS
+    """
+    return {
+        "line": line_number,
+        "plan": breakdown.plan,
+        "members": breakdown.num_members,
+        "additional_features": list(breakdown.additional_features),
+        "premium_features": list(breakdown.premium_features),
+        "subtotal": breakdown.subtotal,
+        "group_discount": round(breakdown.group_discount, 2),
+        "special_discount": breakdown.special_discount,
+        "premium_surcharge": round(breakdown.premium_surcharge, 2),
+        "total": breakdown.total,
+    }
+
+
+def write_results(results, stream, fmt):
+    """
+    Escribe las cotizaciones a medida que se generan
+
+    Args:
+        results: Iterable de (número de línea, QuoteBreakdown)
+        stream: Archivo de salida
+        fmt: "csv" o "jsonl"
+
+    Returns:
+        int: Número de cotizaciones escritas
+    """
+    count = 0
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+    for line_number, breakdown in results:
+        row = result_row(line_number, breakdown)
+        if writer is not None:
+            row["additional_features"] = FEATURE_SEPARATOR.join(row["additional_features"])
+            row["premium_features"] = FEATURE_SEPARATOR.join(row["premium_features"])
+            writer.writerow(row)
+        else:
+            stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def reject_writer(stream):
+    """
+    Crea una función que escribe los rechazos como JSONL
+
+    Args:
+        stream: Archivo de rechazos
+
+    Returns:
+        function: Función (línea, error, registro) para quote_stream
+    """
+    def write(line_number, error, raw):
+        if isinstance(raw, Exception):
+            raw = None
+        stream.write(json.dumps(
+            {"line": line_number, "error": error, "record": raw}, ensure_ascii=False) + "\n")
+    return write
+
+
+def _detect_format(path, default="jsonl"):
+    """Deduce el formato a partir de la extensión del archivo"""
+    if path and path.lower().endswith(".csv"):
+        return "csv"
+    if path and path.lower().endswith((".jsonl", ".json")):
+        return "jsonl"
+    return default
+
+
+def main(argv=None):
+    """
+    Ejecuta la cotización masiva sin interacción
+
+    Returns:
+        int: 0 si todo terminó, 1 si hubo rechazos
+    """
+    parser = argparse.ArgumentParser(description="Cotización masiva de inscripciones")
+    parser.add_argument("input", nargs="?", help="Archivo de entrada (por defecto stdin)")
+    parser.add_argument("-o", "--output", help="Archivo de salida (por defecto stdout)")
+    parser.add_argument("-r", "--rejects", help="Archivo de rechazos (por defecto stderr)")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"], help="Formato de entrada")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], default="jsonl",
+                        help="Formato de salida")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Procesos para cotizar en paralelo (0 = todos los núcleos)")
+    parser.add_argument("--chunk-size", type=int, default=256,
+                        help="Registros enviados a cada proceso por tarea")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or _detect_format(args.input)
+    source = open(args.input, encoding="utf-8", newline="") if args.input else sys.stdin
+    target = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    reject_target = open(args.rejects, "w", encoding="utf-8") if args.rejects else sys.stderr
+    write_reject = reject_writer(reject_target)
+    rejected = [0]
+
+    def on_reject(line_number, error, raw):
+        rejected[0] += 1
+        write_reject(line_number, error, raw)
+
+    try:
+        raw_records = read_raw_records(source, fmt)
+        if args.workers == 1:
+            results = quote_stream(raw_records, on_reject)
+        else:
+            # Importación diferida: gym_parallel depende de este módulo
+            from gym_parallel import quote_stream_parallel
+            results = quote_stream_parallel(
+                raw_records, on_reject, args.workers or None, args.chunk_size)
+        written = write_results(results, target, args.output_format)
+    finally:
+        for stream in (source, target, reject_target):
+            if stream not in (sys.stdin, sys.stdout, sys.stderr):
+                stream.close()
+    print(f"Cotizaciones: {written}, rechazos: {rejected[0]}", file=sys.stderr)
+    return 1 if rejected[0] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,598 @@
+"""
+Verificación diferencial de las rutas de cálculo de precios
+Compara cada motor contra un intérprete independiente de las reglas del
+catálogo, al centavo exacto, sobre todo el espacio de configuraciones, con
+casos aleatorios y con tablas de reglas aleatorias
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import math
+import random
+import sys
+import time
+from collections import namedtuple
+from fractions import Fraction
+
+from gym_batch import quote_batch, quote_batch_cents
+from gym_catalog import QuoteCache, current_catalog, distinct_features, reload_catalog
+from gym_membership import GymMembership, build_quote
+from gym_money import Cents, price_total_cents
+from gym_rules import (
+    FIXED_DISCOUNT,
+    PERCENT_DISCOUNT,
+    PERCENT_SURCHARGE,
+    RULE_KINDS,
+    RUNNING,
+    SUBTOTAL,
+    PricingRule,
+)
+from gym_stream import EnrollmentRecord, quote_stream
+
+# Configuración a cotizar
+Case = namedtuple("Case", ["plan", "additional_features", "premium_features", "num_members"])
+
+# Resultados: igual a la referencia al centavo, cualquier otro total, o
+# error solo en uno de los dos
+MATCH = "match"
+MISMATCH = "mismatch"
+ERROR = "error"
+OUTCOMES = (MATCH, MISMATCH, ERROR)
+DEFAULT_EXAMPLES = 5
+# Miembros de los casos aleatorios
+FUZZ_MAX_MEMBERS = 1000
+# Características extra que puede repetir un caso aleatorio
+FUZZ_REPEATS = 2
+
+# Registro de motores: nombre -> función (casos, catálogo) -> totales en centavos
+ENGINES = {}
+
+
+def engine(name):
+    """Registra un motor de precios a verificar"""
+    def register(run):
+        ENGINES[name] = run
+        return run
+    return register
+
+
+class _NullWriter:
+    """Salida que descarta todo lo escrito"""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _to_cents(total):
+    """Convierte un total en dólares (ya redondeado a 2 decimales) a centavos"""
+    return Cents.from_dollars(total)
+
+
+def _each(cases, quote):
+    """Aplica un motor caso por caso; los errores quedan como resultado"""
+    results = []
+    for case in cases:
+        try:
+            results.append(quote(case))
+        except ValueError as error:
+            results.append(error)
+    return results
+
+
+def _columns(cases):
+    """Convierte los casos en columnas para los motores por lote"""
+    return ([case.plan for case in cases], [case.additional_features for case in cases],
+            [case.premium_features for case in cases], [case.num_members for case in cases])
+
+
+def _raw_records(cases):
+    """Convierte los casos en registros crudos de gym_stream"""
+    return [(index, {
+        "plan": case.plan,
+        "members": case.num_members,
+        "additional_features": list(case.additional_features),
+        "premium_features": list(case.premium_features),
+    }) for index, case in enumerate(cases)]
+
+
+def _by_line(cases, results):
+    """Ordena los resultados (línea, total) de un stream; las líneas rechazadas quedan como error"""
+    totals = [ValueError("Registro rechazado.")] * len(cases)
+    for line_number, total in results:
+        totals[line_number] = total
+    return totals
+
+
+def _half_down(amount):
+    """Redondea una cantidad exacta de centavos al entero más cercano, empates hacia abajo"""
+    return math.ceil(amount - Fraction(1, 2))
+
+
+def interpret_rules(case, catalog):
+    """
+    Calcula el total de una configuración recorriendo la tabla de reglas
+
+    No usa la función compilada: evalúa cada regla con fracciones exactas y
+    redondea cada ajuste al centavo con empates hacia abajo, la política
+    documentada de gym_rules.
+
+    Args:
+        case: Configuración
+        catalog: Catálogo con los precios y las reglas
+
+    Returns:
+        int: Total en centavos
+
+    Raises:
+        ValueError: Si la configuración no existe en el catálogo
+    """
+    catalog.validate(*case)
+    additional = distinct_features(case.additional_features)
+    premium = distinct_features(case.premium_features)
+    subtotal = (Cents.from_dollars(catalog.plans[case.plan]["cost"])
+                + sum(Cents.from_dollars(catalog.additional_features[name]) for name in additional)
+                + sum(Cents.from_dollars(catalog.premium_features[name]) for name in premium))
+    total = subtotal
+    applied = set()
+    for rule in sorted(catalog.rules, key=lambda rule: rule.order):
+        if rule.exclusive_group is not None and rule.exclusive_group in applied:
+            continue
+        if rule.min_members is not None and case.num_members < rule.min_members:
+            continue
+        if (rule.subtotal_over is not None
+                and subtotal <= Cents.from_dollars(rule.subtotal_over)):
+            continue
+        if rule.requires_premium and not premium:
+            continue
+        if rule.kind in (PERCENT_DISCOUNT, PERCENT_SURCHARGE):
+            base = subtotal if rule.base == SUBTOTAL else total
+            amount = _half_down(base * Fraction(str(rule.value)))
+        else:
+            amount = Cents.from_dollars(rule.value)
+        total += -amount if rule.kind in (PERCENT_DISCOUNT, FIXED_DISCOUNT) else amount
+        if rule.exclusive_group is not None:
+            applied.add(rule.exclusive_group)
+    return total
+
+
+def reference_cents(cases, catalog=None):
+    """
+    Calcula los totales de referencia con interpret_rules
+
+    Args:
+        cases: Lista de Case
+        catalog: Catálogo a usar (por defecto el vigente)
+
+    Returns:
+        list: Totales en centavos, o la excepción si la configuración es inválida
+    """
+    catalog = catalog or current_catalog()
+    return _each(cases, lambda case: interpret_rules(case, catalog))
+
+
+@engine("GymMembership.calculate_total_cost")
+def _engine_membership_total_cost(cases, catalog):
+    def quote(case):
+        gym = GymMembership.from_selection(*case)
+        return _to_cents(gym.calculate_total_cost())
+    with contextlib.redirect_stdout(_NullWriter()):
+        return _each(cases, quote)
+
+
+@engine("GymMembership.quote")
+def _engine_membership_quote(cases, catalog):
+    return _each(cases, lambda case: _to_cents(GymMembership.from_selection(*case).quote().total))
+
+
+@engine("build_quote")
+def _engine_build_quote(cases, catalog):
+    def quote(case):
+        catalog.validate(*case)
+        additional = distinct_features(case.additional_features)
+        premium = distinct_features(case.premium_features)
+        return _to_cents(build_quote(
+            case.plan, case.num_members, additional, premium,
+            catalog.plans[case.plan]["cost"],
+            sum(catalog.additional_features[name] for name in additional),
+            sum(catalog.premium_features[name] for name in premium),
+            catalog,
+        ).total)
+    return _each(cases, quote)
+
+
+@engine("Catalog.quote")
+def _engine_catalog_quote(cases, catalog):
+    return _each(cases, lambda case: _to_cents(catalog.quote(*case).total))
+
+
+@engine("Catalog.total")
+def _engine_catalog_total(cases, catalog):
+    return _each(cases, lambda case: _to_cents(catalog.total(*case)))
+
+
+@engine("Catalog.quote_cents")
+def _engine_catalog_quote_cents(cases, catalog):
+    return _each(cases, lambda case: catalog.quote_cents(*case).total)
+
+
+@engine("Catalog.total_cents")
+def _engine_catalog_total_cents(cases, catalog):
+    return _each(cases, lambda case: catalog.total_cents(*case))
+
+
+@engine("price_total_cents")
+def _engine_price_total_cents(cases, catalog):
+    def quote(case):
+        catalog.validate(*case)
+        subtotal = (catalog.plan_cents[case.plan]
+                    + sum(catalog.additional_cents[name]
+                          for name in distinct_features(case.additional_features))
+                    + sum(catalog.premium_cents[name]
+                          for name in distinct_features(case.premium_features)))
+        return price_total_cents(subtotal, case.num_members, bool(case.premium_features), catalog)
+    return _each(cases, quote)
+
+
+@engine("QuoteCache")
+def _engine_quote_cache(cases, catalog):
+    cache = QuoteCache(maxsize=len(cases))
+    return _each(cases, lambda case: _to_cents(cache.quote(*case, catalog=catalog).total))
+
+
+@engine("quote_batch")
+def _engine_quote_batch(cases, catalog):
+    return [_to_cents(total) for total in quote_batch(*_columns(cases), catalog=catalog)]
+
+
+@engine("quote_batch_cents")
+def _engine_quote_batch_cents(cases, catalog):
+    return list(quote_batch_cents(*_columns(cases), catalog=catalog))
+
+
+@engine("quote_stream")
+def _engine_quote_stream(cases, catalog):
+    return _by_line(cases, ((line, _to_cents(breakdown.total))
+                            for line, breakdown in quote_stream(_raw_records(cases))))
+
+
+@engine("quote_stream_parallel")
+def _engine_quote_stream_parallel(cases, catalog):
+    # Importaciones diferidas: el pool y el servicio solo se cargan si se verifican
+    from gym_parallel import quote_stream_parallel
+    return _by_line(cases, ((line, _to_cents(breakdown.total))
+                            for line, breakdown in quote_stream_parallel(
+                                _raw_records(cases), workers=2, catalog=catalog)))
+
+
+@engine("QuoteService")
+def _engine_quote_service(cases, catalog):
+    from gym_service import QuoteService
+
+    async def run():
+        service = QuoteService()
+        try:
+            return await asyncio.gather(
+                *(service.quote(EnrollmentRecord(case.plan, case.num_members,
+                                                 case.additional_features,
+                                                 case.premium_features))
+                  for case in cases),
+                return_exceptions=True)
+        finally:
+            await service.stop_batcher()
+    return [result if isinstance(result, Exception) else _to_cents(result.total)
+            for result in asyncio.run(run())]
+
+
+def member_boundaries(catalog=None):
+    """
+    Retorna los números de miembros que cubren cada rama de las reglas
+
+    Args:
+        catalog: Catálogo a usar (por defecto el vigente)
+
+    Returns:
+        tuple: Miembros alrededor de cada mínimo de las reglas y un grupo grande
+    """
+    catalog = catalog or current_catalog()
+    members = {1, FUZZ_MAX_MEMBERS}
+    for threshold in catalog.member_thresholds:
+        members.update((threshold - 1, threshold, threshold + 1))
+    return tuple(sorted(members - {0}))
+
+
+def _subsets(names):
+    """Genera todos los subconjuntos de una lista, en orden de catálogo"""
+    return itertools.chain.from_iterable(
+        itertools.combinations(names, size) for size in range(len(names) + 1))
+
+
+def enumerate_cases(catalog=None):
+    """
+    Genera el espacio completo de configuraciones del catálogo
+
+    Cada plan con cada subconjunto de características adicionales y premium,
+    para cada número de miembros de member_boundaries().
+
+    Args:
+        catalog: Catálogo a recorrer (por defecto el vigente)
+
+    Yields:
+        Case: Configuración válida
+    """
+    catalog = catalog or current_catalog()
+    for plan, additional, premium, num_members in itertools.product(
+            catalog.plans, list(_subsets(list(catalog.additional_features))),
+            list(_subsets(list(catalog.premium_features))), member_boundaries(catalog)):
+        yield Case(plan, additional, premium, num_members)
+
+
+def _fuzz_features(rng, names):
+    """Elige características en cualquier orden y con posibles repetidas"""
+    return tuple(rng.choice(names) for _ in range(rng.randint(0, len(names) + FUZZ_REPEATS)))
+
+
+def fuzz_cases(count, seed=0, catalog=None):
+    """
+    Genera configuraciones aleatorias fuera del espacio enumerado
+
+    Las características llegan en cualquier orden y pueden repetirse, y los
+    miembros toman cualquier valor entre 1 y FUZZ_MAX_MEMBERS.
+
+    Args:
+        count: Número de casos
+        seed: Semilla del generador
+        catalog: Catálogo a usar (por defecto el vigente)
+
+    Yields:
+        Case: Configuración válida
+    """
+    catalog = catalog or current_catalog()
+    rng = random.Random(seed)
+    plans = list(catalog.plans)
+    additional = list(catalog.additional_features)
+    premium = list(catalog.premium_features)
+    for _ in range(count):
+        yield Case(
+            rng.choice(plans),
+            _fuzz_features(rng, additional),
+            _fuzz_features(rng, premium),
+            rng.randint(1, FUZZ_MAX_MEMBERS),
+        )
+
+
+def _timed(run, *args):
+    """Ejecuta una función y retorna (resultado, segundos)"""
+    started = time.perf_counter()
+    result = run(*args)
+    return result, time.perf_counter() - started
+
+
+def verify(cases, engines=None, catalog=None, max_examples=DEFAULT_EXAMPLES):
+    """
+    Compara los motores contra la referencia, caso por caso
+
+    Args:
+        cases: Iterable de Case
+        engines: Nombres de los motores (por defecto todos los registrados)
+        catalog: Catálogo a usar (por defecto el vigente)
+        max_examples: Divergencias guardadas por motor
+
+    Returns:
+        dict: Casos, rendimiento de la referencia y, por motor, el conteo de
+              cada resultado, ejemplos de divergencias y rendimiento
+
+    Raises:
+        ValueError: Si un motor no existe
+    """
+    catalog = catalog or current_catalog()
+    cases = list(cases)
+    names = list(engines or ENGINES)
+    for name in names:
+        if name not in ENGINES:
+            raise ValueError(f"El motor '{name}' no existe.")
+    expected, reference_seconds = _timed(reference_cents, cases, catalog)
+    report = {
+        "cases": len(cases),
+        "reference": {"seconds": reference_seconds,
+                      "cases_per_sec": len(cases) / reference_seconds if reference_seconds else 0.0},
+        "engines": {},
+    }
+    for name in names:
+        totals, seconds = _timed(ENGINES[name], cases, catalog)
+        counts = dict.fromkeys(OUTCOMES, 0)
+        examples = []
+        for case, reference, total in zip(cases, expected, totals):
+            if isinstance(reference, Exception) or isinstance(total, Exception):
+                outcome = MATCH if type(reference) is type(total) else ERROR
+            else:
+                outcome = MATCH if total == reference else MISMATCH
+            counts[outcome] += 1
+            if outcome in (MISMATCH, ERROR) and len(examples) < max_examples:
+                examples.append({"case": case, "reference": reference, "total": total})
+        rate = len(cases) / seconds if seconds else 0.0
+        report["engines"][name] = dict(
+            counts, examples=examples, seconds=seconds, cases_per_sec=rate,
+            speedup=rate / report["reference"]["cases_per_sec"]
+            if report["reference"]["cases_per_sec"] else 0.0)
+    return report
+
+
+def _merge(total, report):
+    """Acumula un reporte de verify en otro"""
+    if not total:
+        total.update(cases=0, reference={"seconds": 0.0}, engines={})
+    total["cases"] += report["cases"]
+    total["reference"]["seconds"] += report["reference"]["seconds"]
+    for name, result in report["engines"].items():
+        merged = total["engines"].setdefault(
+            name, dict(dict.fromkeys(OUTCOMES + ("seconds",), 0), examples=[]))
+        for key in OUTCOMES + ("seconds",):
+            merged[key] += result[key]
+        merged["examples"].extend(result["examples"][:DEFAULT_EXAMPLES - len(merged["examples"])])
+    reference_rate = total["cases"] / total["reference"]["seconds"]
+    total["reference"]["cases_per_sec"] = reference_rate
+    for merged in total["engines"].values():
+        merged["cases_per_sec"] = total["cases"] / merged["seconds"] if merged["seconds"] else 0.0
+        merged["speedup"] = merged["cases_per_sec"] / reference_rate
+    return total
+
+
+def _random_price(rng, low, high):
+    """Precio aleatorio en dólares con centavos"""
+    return Cents(rng.randint(low * 100, high * 100)).dollars()
+
+
+def random_rules(rng, max_rules=6):
+    """
+    Genera una tabla de reglas aleatoria y válida
+
+    Mezcla todos los tipos de regla, ambas bases, condiciones de miembros,
+    de subtotal y de premium, y grupos exclusivos con órdenes consecutivos.
+
+    Args:
+        rng: Generador aleatorio
+        max_rules: Máximo de reglas de la tabla
+
+    Returns:
+        tuple: Tabla de PricingRule
+    """
+    rules = []
+    order = 0
+    count = rng.randint(1, max_rules)
+    while len(rules) < count:
+        size = rng.randint(2, 3) if rng.random() < 0.3 else 1
+        group = f"group_{len(rules)}" if size > 1 else None
+        for _ in range(size):
+            kind = rng.choice(RULE_KINDS)
+            if kind in (PERCENT_DISCOUNT, PERCENT_SURCHARGE):
+                value = rng.randint(1, 3000) / 10000
+            else:
+                value = _random_price(rng, 0, 50)
+            order += rng.randint(1, 5)
+            rules.append(PricingRule(
+                f"rule_{len(rules)}", kind, value,
+                base=rng.choice((SUBTOTAL, RUNNING)),
+                min_members=rng.choice((None, rng.randint(2, 6))),
+                subtotal_over=rng.choice((None, _random_price(rng, 0, 400))),
+                requires_premium=rng.random() < 0.3,
+                exclusive_group=group,
+                order=order,
+            ))
+    # Se barajan para que el orden de la tabla no sea el de aplicación
+    rng.shuffle(rules)
+    return tuple(rules)
+
+
+def verify_random_catalogs(trials, seed=0, engines=None, max_examples=DEFAULT_EXAMPLES,
+                           rules=False, fuzz=0):
+    """
+    Repite la verificación completa con precios (y reglas) aleatorios
+
+    Cada prueba publica un catálogo con los mismos nombres y precios
+    aleatorios con centavos, recorre su espacio completo y al final restaura
+    el catálogo original. Los precios con centavos ejercitan los empates de
+    medio centavo y los umbrales de subtotal.
+
+    Args:
+        trials: Número de catálogos aleatorios
+        seed: Semilla del generador
+        engines: Nombres de los motores (por defecto todos)
+        max_examples: Divergencias guardadas por motor
+        rules: True para publicar también una tabla de reglas aleatoria
+        fuzz: Casos aleatorios adicionales por prueba
+
+    Returns:
+        dict: Reporte acumulado con la misma forma que verify()
+    """
+    rng = random.Random(seed)
+    original = current_catalog()
+    tables = original.to_dict()
+    total = {}
+    try:
+        for trial in range(trials):
+            plans = {name: dict(details, cost=_random_price(rng, 20, 250))
+                     for name, details in tables["plans"].items()}
+            additional = {name: _random_price(rng, 5, 80) for name in tables["additional_features"]}
+            premium = {name: _random_price(rng, 20, 150) for name in tables["premium_features"]}
+            catalog = reload_catalog(plans, additional, premium,
+                                     random_rules(rng) if rules else original.rules)
+            cases = itertools.chain(enumerate_cases(catalog),
+                                    fuzz_cases(fuzz, seed + trial, catalog))
+            _merge(total, verify(cases, engines, catalog, max_examples))
+    finally:
+        reload_catalog(tables["plans"], tables["additional_features"],
+                       tables["premium_features"], original.rules)
+    return total
+
+
+def format_report(report):
+    """Formatea un reporte de verify como tabla de texto"""
+    lines = [
+        f"Casos: {report['cases']:,}; referencia: "
+        f"{report['reference']['cases_per_sec']:,.0f} casos/s",
+        f"{'motor':<36}{'iguales':>10}{'diverg.':>9}{'errores':>9}"
+        f"{'casos/s':>14}{'x ref':>8}",
+    ]
+    for name, result in report["engines"].items():
+        lines.append(
+            f"{name:<36}{result[MATCH]:>10,}{result[MISMATCH]:>9,}"
+            f"{result[ERROR]:>9,}{result['cases_per_sec']:>14,.0f}{result['speedup']:>8.1f}")
+    for name, result in report["engines"].items():
+        for example in result["examples"]:
+            reference, total = (value if isinstance(value, Exception) else Cents(value)
+                                for value in (example["reference"], example["total"]))
+            lines.append(f"DIVERGENCIA {name}: {tuple(example['case'])} "
+                         f"referencia={reference} motor={total}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Ejecuta la verificación desde la línea de comandos
+
+    Returns:
+        int: 0 si ningún motor diverge de la referencia, 1 si alguno diverge
+    """
+    parser = argparse.ArgumentParser(description="Verificación diferencial de precios")
+    parser.add_argument("engines", nargs="*", help="Motores a verificar (por defecto todos)")
+    parser.add_argument("--fuzz", type=int, default=10000, help="Casos aleatorios adicionales")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--price-trials", type=int, default=0,
+                        help="Catálogos con precios aleatorios a verificar")
+    parser.add_argument("--rule-trials", type=int, default=0,
+                        help="Catálogos con precios y reglas aleatorias a verificar")
+    parser.add_argument("--list", action="store_true", help="Lista los motores disponibles")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(ENGINES))
+        return 0
+
+    catalog = current_catalog()
+    cases = itertools.chain(enumerate_cases(catalog), fuzz_cases(args.fuzz, args.seed, catalog))
+    report = verify(cases, args.engines or None, catalog)
+    print(format_report(report))
+    reports = [report]
+    if args.price_trials:
+        print(f"\nCatálogos con precios aleatorios: {args.price_trials}")
+        random_report = verify_random_catalogs(args.price_trials, args.seed, args.engines or None)
+        print(format_report(random_report))
+        reports.append(random_report)
+    if args.rule_trials:
+        print(f"\nCatálogos con reglas aleatorias: {args.rule_trials}")
+        rules_report = verify_random_catalogs(args.rule_trials, args.seed, args.engines or None,
+                                              rules=True, fuzz=args.fuzz // 10)
+        print(format_report(rules_report))
+        reports.append(rules_report)
+    diverged = any(result[MISMATCH] or result[ERROR]
+                   for each in reports for result in each["engines"].values())
+    return 1 if diverged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""
+Generador de carga sintética de inscripciones
+Produce registros reproducibles a partir del catálogo vigente, en el mismo
+formato que lee gym_stream, sin guardarlos en memoria
+"""
+
+import argparse
+import bisect
+import csv
+import io
+import json
+import random
+import sys
+from collections import namedtuple
+
+from gym_catalog import current_catalog
+from gym_stream import FEATURE_SEPARATOR, EnrollmentRecord
+
+# Distribución por defecto del número de miembros (miembros -> peso)
+DEFAULT_MEMBER_WEIGHTS = {1: 55, 2: 20, 3: 10, 4: 10, 6: 5}
+DEFAULT_ADDITIONAL_RATE = 0.3
+DEFAULT_PREMIUM_RATE = 0.1
+# Nombres inexistentes para ejercitar los caminos de error
+INVALID_PLANS = ("Platinum", "basic", "Premium Plus")
+INVALID_FEATURES = ("Sauna", "Pool Access", "personal training")
+# Características sorteadas con una sola tabla de subconjuntos
+_GROUP_BITS = 8
+# Registros escritos por bloque
+WRITE_BATCH = 4096
+
+# Perfil de la carga:
+#   plan_mix: plan -> peso (None = todos los planes por igual)
+#   additional_rates / premium_rates: tasa de adopción, común (float) o por
+#       característica (dict)
+#   member_weights: miembros -> peso
+#   invalid_rate: fracción de registros con un nombre inexistente
+WorkloadProfile = namedtuple(
+    "WorkloadProfile",
+    ["plan_mix", "additional_rates", "premium_rates", "member_weights", "invalid_rate"],
+    defaults=(None, DEFAULT_ADDITIONAL_RATE, DEFAULT_PREMIUM_RATE, DEFAULT_MEMBER_WEIGHTS, 0.0),
+)
+
+
+def _cumulative(weights, kind):
+    """
+    Prepara un sorteo por pesos
+
+    Returns:
+        tuple: (valores, pesos acumulados)
+
+    Raises:
+        ValueError: Si algún peso es negativo o todos son cero
+    """
+    values, cumulative, total = [], [], 0.0
+    for value, weight in weights.items():
+        if weight < 0:
+            raise ValueError(f"El peso de {kind} '{value}' no puede ser negativo.")
+        if weight:
+            total += weight
+            values.append(value)
+            cumulative.append(total)
+    if not values:
+        raise ValueError(f"Se necesita al menos un peso positivo de {kind}.")
+    # Normalizados a 1.0 exacto: random() < 1.0 nunca sale de la tabla
+    cumulative = [weight / total for weight in cumulative]
+    cumulative[-1] = 1.0
+    return values, cumulative
+
+
+def _rates(rates, prices, kind):
+    """
+    Normaliza las tasas de adopción de una tabla de características
+
+    Raises:
+        ValueError: Si una tasa no está entre 0 y 1 o la característica no existe
+    """
+    if isinstance(rates, dict):
+        unknown = set(rates) - set(prices)
+        if unknown:
+            raise ValueError(f"La característica {kind} '{sorted(unknown)[0]}' no está disponible.")
+        rates = {feature: rates.get(feature, 0.0) for feature in prices}
+    else:
+        rates = dict.fromkeys(prices, rates)
+    for feature, rate in rates.items():
+        if not 0 <= rate <= 1:
+            raise ValueError(f"La tasa de '{feature}' debe estar entre 0 y 1.")
+    return rates
+
+
+def _subset_tables(rates):
+    """
+    Prepara el sorteo de subconjuntos de características
+
+    Cada característica se adopta de forma independiente con su tasa. En vez
+    de un sorteo por característica se sortea un subconjunto completo por
+    grupo de hasta _GROUP_BITS características.
+
+    Returns:
+        list: (subconjuntos, pesos acumulados) por grupo
+    """
+    features = list(rates.items())
+    tables = []
+    for start in range(0, len(features), _GROUP_BITS):
+        group = features[start:start + _GROUP_BITS]
+        weights = {}
+        for mask in range(1 << len(group)):
+            chosen, weight = [], 1.0
+            for bit, (feature, rate) in enumerate(group):
+                if mask >> bit & 1:
+                    chosen.append(feature)
+                    weight *= rate
+                else:
+                    weight *= 1 - rate
+            weights[tuple(chosen)] = weight
+        tables.append(_cumulative(weights, "subconjunto"))
+    return tables
+
+
+def generate_records(count, seed=0, profile=None, catalog=None):
+    """
+    Genera inscripciones sintéticas reproducibles
+
+    La misma semilla, perfil y catálogo producen siempre la misma secuencia.
+
+    Args:
+        count: Número de registros (None = sin fin)
+        seed: Semilla del generador
+        profile: WorkloadProfile (por defecto el perfil estándar)
+        catalog: Catálogo del que se toman los nombres (por defecto el vigente)
+
+    Yields:
+        EnrollmentRecord: Inscripción, posiblemente con un nombre inexistente
+
+    Raises:
+        ValueError: Si el perfil no es válido para el catálogo
+    """
+    profile = profile or WorkloadProfile()
+    catalog = catalog or current_catalog()
+    plan_mix = profile.plan_mix or dict.fromkeys(catalog.plans, 1)
+    unknown = set(plan_mix) - set(catalog.plans)
+    if unknown:
+        raise ValueError(f"El plan '{sorted(unknown)[0]}' no está disponible.")
+    if any(members < 1 for members in profile.member_weights):
+        raise ValueError("El número de miembros debe ser al menos 1.")
+    if not 0 <= profile.invalid_rate <= 1:
+        raise ValueError("La fracción de nombres inválidos debe estar entre 0 y 1.")
+    plans = _cumulative(plan_mix, "plan")
+    members = _cumulative(profile.member_weights, "miembros")
+    additional = _subset_tables(_rates(profile.additional_rates,
+                                       catalog.additional_features, "adicional"))
+    premium = _subset_tables(_rates(profile.premium_rates, catalog.premium_features, "premium"))
+    invalid_rate = profile.invalid_rate
+
+    rng = random.Random(seed)
+    draw = rng.random
+    pick = bisect.bisect
+    plan_values, plan_cumulative = plans
+    member_values, member_cumulative = members
+    produced = 0
+    while count is None or produced < count:
+        chosen = []
+        for tables in (additional, premium):
+            features = ()
+            for values, cumulative in tables:
+                features += values[pick(cumulative, draw())]
+            chosen.append(features)
+        record = EnrollmentRecord(
+            plan_values[pick(plan_cumulative, draw())],
+            member_values[pick(member_cumulative, draw())],
+            *chosen)
+        if invalid_rate and draw() < invalid_rate:
+            field = rng.randrange(3)
+            if field == 0:
+                record = record._replace(plan=rng.choice(INVALID_PLANS))
+            elif field == 1:
+                record = record._replace(
+                    additional_features=record.additional_features + (rng.choice(INVALID_FEATURES),))
+            else:
+                record = record._replace(
+                    premium_features=record.premium_features + (rng.choice(INVALID_FEATURES),))
+        yield record
+        produced += 1
+
+
+def _fragment(value, fragments):
+    """Retorna el JSON de un nombre o tupla de nombres, generándolo una sola vez"""
+    text = fragments.get(value)
+    if text is None:
+        data = list(value) if isinstance(value, tuple) else value
+        text = fragments[value] = json.dumps(data, ensure_ascii=False)
+    return text
+
+
+def _render_jsonl(record, fragments):
+    """Serializa un registro como línea JSONL"""
+    return (f'{{"plan": {_fragment(record.plan, fragments)}, '
+            f'"members": {record.num_members}, '
+            f'"additional_features": {_fragment(record.additional_features, fragments)}, '
+            f'"premium_features": {_fragment(record.premium_features, fragments)}}}\n')
+
+
+def write_workload(records, stream, fmt="jsonl"):
+    """
+    Escribe inscripciones en el formato de entrada de gym_stream
+
+    Args:
+        records: Iterable de EnrollmentRecord
+        stream: Archivo de texto de salida
+        fmt: "csv" o "jsonl"
+
+    Returns:
+        int: Número de registros escritos
+    """
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Formato no soportado: {fmt}")
+    count = 0
+    fragments = {}
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n") if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(["plan", "members", "additional_features", "premium_features"])
+    for record in records:
+        if writer is not None:
+            writer.writerow([record.plan, record.num_members,
+                             FEATURE_SEPARATOR.join(record.additional_features),
+                             FEATURE_SEPARATOR.join(record.premium_features)])
+        else:
+            buffer.write(_render_jsonl(record, fragments))
+        count += 1
+        if count % WRITE_BATCH == 0:
+            stream.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+    stream.write(buffer.getvalue())
+    return count
+
+
+def _parse_weights(text, convert=str):
+    """Convierte "nombre=peso,nombre=peso" en diccionario"""
+    weights = {}
+    for item in text.split(","):
+        name, separator, weight = item.rpartition("=")
+        if not separator:
+            raise argparse.ArgumentTypeError(f"Se esperaba nombre=valor: {item!r}")
+        weights[convert(name.strip())] = float(weight)
+    return weights
+
+
+def _parse_rates(text):
+    """Acepta una tasa común o tasas por característica"""
+    try:
+        return float(text)
+    except ValueError:
+        return _parse_weights(text)
+
+
+def main(argv=None):
+    """
+    Genera un archivo de carga sintética
+
+    Returns:
+        int: 0 si terminó
+    """
+    parser = argparse.ArgumentParser(description="Generador de carga de inscripciones")
+    parser.add_argument("count", type=int, help="Número de registros")
+    parser.add_argument("-o", "--output", help="Archivo de salida (por defecto stdout)")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"], default="jsonl")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--plan-mix", type=_parse_weights, help="Plan=peso,...")
+    parser.add_argument("--additional-rates", type=_parse_rates, default=DEFAULT_ADDITIONAL_RATE,
+                        help="Tasa común o Característica=tasa,...")
+    parser.add_argument("--premium-rates", type=_parse_rates, default=DEFAULT_PREMIUM_RATE,
+                        help="Tasa común o Característica=tasa,...")
+    parser.add_argument("--members", type=lambda text: _parse_weights(text, int),
+                        default=DEFAULT_MEMBER_WEIGHTS, help="miembros=peso,...")
+    parser.add_argument("--invalid-rate", type=float, default=0.0,
+                        help="Fracción de registros con un nombre inexistente")
+    args = parser.parse_args(argv)
+
+    profile = WorkloadProfile(args.plan_mix, args.additional_rates, args.premium_rates,
+                              args.members, args.invalid_rate)
+    records = generate_records(args.count, args.seed, profile)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as target:
+            written = write_workload(records, target, args.format)
+    else:
+        written = write_workload(records, sys.stdout, args.format)
+    print(f"Registros: {written}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,8 +5,10 @@ Tests unitarios para el Sistema de Gestión de Membresías
 #Hola prueba
 #Hola pruebaGA
 
+import contextlib
+import io
 import unittest
-from gym_membership import GymMembership
+from gym_membership import GymMembership, confirmed_cost
 
 
 class TestGymMembership(unittest.TestCase):
@@ -303,6 +305,154 @@ class TestGymMembership(unittest.TestCase):
         result = self.gym.set_number_of_members(-1)
         self.assertFalse(result)
 
+    
+    # Tests para cotización silenciosa
+    def test_quote_breakdown(self):
+        """Test: Desglose completo de la cotización silenciosa"""
+        self.gym.select_membership_plan("Premium")
+        self.gym.set_number_of_members(3)
+        self.gym.add_additional_feature("Personal Training")
+        self.gym.add_additional_feature("Group Classes")
+        self.gym.add_premium_feature("Exclusive Gym Access")
+        breakdown = self.gym.quote()
+        self.assertEqual(breakdown.subtotal, 245)
+        self.assertAlmostEqual(breakdown.group_discount, 24.5)
+        self.assertEqual(breakdown.special_discount, 20)
+        # Cada ajuste se redondea al centavo: 30.075 -> 30.07
+        self.assertEqual(breakdown.premium_surcharge, 30.07)
+        self.assertEqual(breakdown.total, self.gym.calculate_total_cost())
+    
+    def test_quote_writes_nothing(self):
+        """Test: La cotización silenciosa no escribe en stdout"""
+        self.gym.select_membership_plan("Family")
+        self.gym.set_number_of_members(4)
+        self.gym.add_premium_feature("Exclusive Gym Access")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.gym.quote()
+        self.assertEqual(output.getvalue(), "")
+    
+    def test_quote_is_immutable(self):
+        """Test: El desglose no se puede modificar"""
+        self.gym.select_membership_plan("Basic")
+        breakdown = self.gym.quote()
+        with self.assertRaises(AttributeError):
+            breakdown.total = 0
+    
+    def test_quote_no_plan_selected(self):
+        """Test: Cotización silenciosa sin plan seleccionado"""
+        self.assertIsNone(self.gym.quote())
+
+    
+    # Tests para características sin duplicados y subtotales acumulados
+    def test_duplicate_additional_feature_ignored(self):
+        """Test: Agregar dos veces la misma característica no la duplica"""
+        self.assertTrue(self.gym.add_additional_feature("Locker Rental"))
+        self.assertTrue(self.gym.add_additional_feature("Locker Rental"))
+        self.assertEqual(len(self.gym.additional_features), 1)
+        self.assertEqual(self.gym.calculate_additional_features_cost(), 10)
+    
+    def test_remove_additional_feature(self):
+        """Test: Quitar una característica adicional actualiza el subtotal"""
+        self.gym.add_additional_feature("Personal Training")
+        self.gym.add_additional_feature("Group Classes")
+        self.assertTrue(self.gym.remove_additional_feature("Personal Training"))
+        self.assertNotIn("Personal Training", self.gym.additional_features)
+        self.assertEqual(self.gym.calculate_additional_features_cost(), 25)
+    
+    def test_remove_missing_feature(self):
+        """Test: Quitar una característica que no está agregada"""
+        self.assertFalse(self.gym.remove_additional_feature("Personal Training"))
+        self.assertFalse(self.gym.remove_premium_feature("Exclusive Gym Access"))
+    
+    def test_remove_premium_feature_drops_surcharge(self):
+        """Test: Quitar la última característica premium elimina el recargo"""
+        self.gym.select_membership_plan("Basic")
+        self.gym.add_premium_feature("Exclusive Gym Access")
+        self.gym.remove_premium_feature("Exclusive Gym Access")
+        self.assertEqual(self.gym.calculate_premium_features_cost(), 0)
+        self.assertEqual(self.gym.calculate_total_cost(), 50)
+    
+    def test_feature_costs_follow_replaced_price_table(self):
+        """Test: Los subtotales se recalculan si se reemplaza la tabla de precios"""
+        self.gym.add_additional_feature("Locker Rental")
+        original = GymMembership.ADDITIONAL_FEATURES
+        GymMembership.ADDITIONAL_FEATURES = dict(original, **{"Locker Rental": 15})
+        try:
+            self.assertEqual(self.gym.calculate_additional_features_cost(), 15)
+        finally:
+            GymMembership.ADDITIONAL_FEATURES = original
+    
+    def test_from_selection(self):
+        """Test: Crear una membresía desde una selección sin imprimir"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            gym = GymMembership.from_selection(
+                "Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3)
+        self.assertEqual(output.getvalue(), "")
+        self.assertAlmostEqual(gym.quote().total, 230.57, places=2)
+        with self.assertRaises(ValueError):
+            GymMembership.from_selection("Gold")
+
+    
+    def test_confirmed_cost(self):
+        """Test: Valor de confirmación sin entrada interactiva"""
+        self.gym.select_membership_plan("Premium")
+        self.gym.add_premium_feature("Exclusive Gym Access")
+        self.assertEqual(confirmed_cost(self.gym.quote()), 207)
+        self.assertEqual(confirmed_cost(None), -1)
+
+    
+    def test_total_cost_messages_match_original(self):
+        """Test: Los mensajes de calculate_total_cost muestran las tasas como antes"""
+        cases = [
+            (("Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3),
+             "\nCosto base de membresía: $100\nCaracterísticas adicionales: $65\n"
+             "Características premium: $80\nSubtotal: $245\n"
+             "✓ Descuento grupal aplicado (10%): -$24.50\n"
+             "✓ Descuento especial aplicado: -$20\n"
+             "✓ Recargo premium aplicado (15%): +$30.07\n", 230.57),
+            (("Family", ["Personal Training", "Nutrition Consultation"],
+              ["Exclusive Gym Access", "Specialized Training Program"], 4),
+             "\nCosto base de membresía: $150\nCaracterísticas adicionales: $70\n"
+             "Características premium: $140\nSubtotal: $360\n"
+             "✓ Descuento grupal aplicado (10%): -$36.00\n"
+             "✓ Descuento especial aplicado: -$20\n"
+             "✓ Recargo premium aplicado (15%): +$45.60\n", 349.6),
+            (("Basic",),
+             "\nCosto base de membresía: $50\nCaracterísticas adicionales: $0\n"
+             "Características premium: $0\nSubtotal: $50\n", 50),
+        ]
+        for selection, expected_output, expected_total in cases:
+            gym = GymMembership.from_selection(*selection)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                total = gym.calculate_total_cost()
+            self.assertEqual(output.getvalue(), expected_output)
+            self.assertAlmostEqual(total, expected_total, places=2)
+    
+    def test_adjustment_messages_show_rate(self):
+        """Test: Los métodos de ajuste muestran la tasa de la regla"""
+        self.gym.set_number_of_members(2)
+        self.gym.add_premium_feature("Exclusive Gym Access")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.gym.apply_group_discount(100)
+            self.gym.apply_special_offer_discount(250)
+            self.gym.apply_premium_surcharge(100)
+        self.assertEqual(output.getvalue(),
+                         "✓ Descuento grupal aplicado (10%): -$10.00\n"
+                         "✓ Descuento especial aplicado: -$20\n"
+                         "✓ Recargo premium aplicado (15%): +$15.00\n")
+    
+    def test_adjustments_round_subtotal_to_cents(self):
+        """Test: Los ajustes aceptan subtotales con error de punto flotante"""
+        self.gym.set_number_of_members(2)
+        self.gym.add_premium_feature("Exclusive Gym Access")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertAlmostEqual(self.gym.apply_group_discount(0.1 + 0.2), 0.03, places=2)
+            self.assertAlmostEqual(self.gym.apply_premium_surcharge(200.505), 30.07, places=2)
+
 
 if __name__ == '__main__':
     # Ejecutar los tests
@@ -0,0 +1,126 @@
+"""
+Unit Tests for the revenue and attach-rate aggregation
+Tests unitarios para los agregados de ingresos y adopción
+"""
+
+import os
+import tempfile
+import unittest
+
+from gym_analytics import RevenueSummary
+from gym_catalog import current_catalog, reload_catalog
+from gym_compact import MembershipCodec
+from gym_ledger import LedgerReader, LedgerWriter
+
+SELECTIONS = [
+    ("Basic", [], [], 1),
+    ("Basic", ["Personal Training"], [], 2),
+    ("Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3),
+    ("Family", ["Group Classes"], ["Specialized Training Program"], 5),
+    ("Premium", [], [], 1),
+]
+
+
+class TestRevenueSummary(unittest.TestCase):
+    """Clase de tests para el resumen de ingresos"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.catalog = current_catalog()
+        self.codec = MembershipCodec(self.catalog)
+        self.quotes = [self.catalog.quote_cents(*selection) for selection in SELECTIONS * 40]
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "confirmed.ledger")
+        with LedgerWriter(self.path, self.codec) as writer:
+            for breakdown in self.quotes:
+                writer.append_quote(breakdown)
+
+    def tearDown(self):
+        """Restaura el catálogo y limpia los archivos"""
+        reload_catalog(self.catalog.plans, self.catalog.additional_features,
+                       self.catalog.premium_features, self.catalog.rules)
+        self.directory.cleanup()
+
+    def test_sums_stored_totals(self):
+        """Test: El resumen suma los totales confirmados del libro"""
+        summary = RevenueSummary(self.codec)
+        summary.update_ledger(self.path)
+        result = summary.summary()
+        self.assertEqual(result["memberships"], 200)
+        self.assertEqual(result["revenue"], sum(q.total for q in self.quotes))
+        self.assertEqual(result["revenue_by_plan"]["Premium"],
+                         sum(q.total for q in self.quotes if q.plan == "Premium"))
+        self.assertEqual(result["memberships_by_plan"]["Family"], 40)
+        self.assertAlmostEqual(result["additional_attach_rates"]["Personal Training"], 0.4)
+        self.assertAlmostEqual(result["premium_attach_rates"]["Exclusive Gym Access"], 0.2)
+
+    def test_sums_stored_adjustments(self):
+        """Test: El resumen suma los descuentos y recargos confirmados del libro"""
+        summary = RevenueSummary(self.codec)
+        summary.update_ledger(self.path)
+        result = summary.summary()
+        self.assertEqual(result["group_discounts"], sum(q.group_discount for q in self.quotes))
+        self.assertEqual(result["special_discounts"],
+                         sum(q.special_discount for q in self.quotes))
+        self.assertEqual(result["premium_surcharges"],
+                         sum(q.premium_surcharge for q in self.quotes))
+        self.assertGreater(result["group_discounts"], 0)
+        self.assertGreater(result["premium_surcharges"], 0)
+
+    def test_price_change_keeps_confirmed_revenue(self):
+        """Test: Cambiar precios o retirar un plan no altera los ingresos ya confirmados"""
+        expected = sum(q.total for q in self.quotes)
+        plans = {name: dict(plan, cost=plan["cost"] * 2)
+                 for name, plan in self.catalog.plans.items() if name != "Family"}
+        reload_catalog(plans=plans)
+        summary = RevenueSummary()
+        summary.update_ledger(self.path)
+        result = summary.summary()
+        self.assertEqual(result["revenue"], expected)
+        self.assertEqual(result["memberships_by_plan"]["Family"], 40)
+
+    def test_segments_use_their_own_names(self):
+        """Test: Cada segmento del libro se traduce con los nombres de su encabezado"""
+        catalog = reload_catalog(additional_features=dict(
+            {"Sauna": 15}, **self.catalog.additional_features))
+        sauna = catalog.quote_cents("Basic", ["Sauna"], [], 1)
+        with LedgerWriter(self.path) as writer:
+            writer.append_quote(sauna)
+        summary = RevenueSummary(self.codec)
+        summary.update_ledger(self.path)
+        result = summary.summary()
+        self.assertEqual(result["memberships"], 201)
+        self.assertEqual(result["revenue"], sum(q.total for q in self.quotes) + sauna.total)
+        self.assertAlmostEqual(result["additional_attach_rates"]["Sauna"], 1 / 201)
+        self.assertAlmostEqual(result["additional_attach_rates"]["Personal Training"], 80 / 201)
+
+    def test_incremental_update(self):
+        """Test: Agregar confirmaciones nuevas equivale a recalcular todo"""
+        summary = RevenueSummary(self.codec)
+        summary.update_ledger(self.path)
+        before = summary.summary()["revenue"]
+        with LedgerReader(self.path) as reader:
+            extra, amounts = reader.record(2)
+        summary.add(extra, amounts)
+        expected = RevenueSummary(self.codec)
+        expected.update_ledger(self.path)
+        expected.add(extra, self.quotes[2])
+        self.assertEqual(summary.summary(), expected.summary())
+        self.assertEqual(summary.summary()["revenue"] - before, self.quotes[2].total)
+
+    def test_row_without_plan_is_rejected(self):
+        """Test: Una fila sin plan no se cuenta en silencio"""
+        with self.assertRaises(ValueError):
+            RevenueSummary(self.codec).update_columns([0], [0], [0], [5000], [0], [0], [0])
+
+    def test_empty_summary(self):
+        """Test: Un resumen sin filas tiene todo en cero"""
+        result = RevenueSummary().summary()
+        self.assertEqual(result["memberships"], 0)
+        self.assertEqual(result["revenue"], 0)
+        self.assertEqual(result["premium_surcharges"], 0)
+        self.assertEqual(result["additional_attach_rates"]["Group Classes"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
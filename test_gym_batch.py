@@ -0,0 +1,82 @@
+"""
+Unit Tests for batch quoting
+Tests unitarios para la cotización por lotes
+"""
+
+import contextlib
+import io
+import unittest
+
+from gym_batch import quote_batch
+from gym_membership import GymMembership
+
+
+def scalar_total(plan, additional, premium, members):
+    """Calcula el total con la ruta individual, sin imprimir"""
+    gym = GymMembership()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if plan is not None:
+            gym.select_membership_plan(plan)
+        gym.set_number_of_members(members)
+        for feature in additional:
+            gym.add_additional_feature(feature)
+        for feature in premium:
+            gym.add_premium_feature(feature)
+        return gym.calculate_total_cost()
+
+
+class TestQuoteBatch(unittest.TestCase):
+    """Clase de tests para quote_batch"""
+
+    ROWS = [
+        ("Basic", [], [], 1),
+        ("Basic", ["Personal Training"], [], 1),
+        ("Premium", [], [], 2),
+        ("Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3),
+        ("Family", list(GymMembership.ADDITIONAL_FEATURES),
+         list(GymMembership.PREMIUM_FEATURES), 5),
+        ("Basic", [], ["Exclusive Gym Access"], 1),
+        (None, [], [], 1),
+    ]
+
+    def test_batch_matches_scalar_path(self):
+        """Test: El lote coincide con calculate_total_cost fila por fila"""
+        totals = quote_batch(*[list(column) for column in zip(*self.ROWS)])
+        for row, total in zip(self.ROWS, totals):
+            self.assertEqual(total, scalar_total(*row))
+
+    def test_batch_repeated_features_charged_once(self):
+        """Test: Una característica repetida se cobra una sola vez, igual que GymMembership"""
+        totals = quote_batch(["Basic"], [["Locker Rental"] * 2],
+                             [["Exclusive Gym Access"] * 2], [1])
+        self.assertEqual(list(totals), [161.0])
+        self.assertEqual(totals[0], scalar_total("Basic", ["Locker Rental"] * 2,
+                                                 ["Exclusive Gym Access"] * 2, 1))
+
+    def test_batch_empty(self):
+        """Test: Un lote vacío devuelve un arreglo vacío"""
+        self.assertEqual(len(quote_batch([], [], [], [])), 0)
+
+    def test_batch_length_mismatch(self):
+        """Test: Columnas de distinta longitud"""
+        with self.assertRaises(ValueError):
+            quote_batch(["Basic"], [[]], [], [1])
+
+    def test_batch_invalid_plan(self):
+        """Test: Plan inválido en el lote"""
+        with self.assertRaises(ValueError):
+            quote_batch(["Gold"], [[]], [[]], [1])
+
+    def test_batch_invalid_feature(self):
+        """Test: Característica inválida en el lote"""
+        with self.assertRaises(ValueError):
+            quote_batch(["Basic"], [["Sauna"]], [[]], [1])
+
+    def test_batch_invalid_members(self):
+        """Test: Número de miembros inválido en el lote"""
+        with self.assertRaises(ValueError):
+            quote_batch(["Basic"], [[]], [[]], [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
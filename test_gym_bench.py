@@ -0,0 +1,73 @@
+"""
+Unit Tests for the pricing benchmark suite
+Tests unitarios para la suite de benchmarks
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from gym_bench import BENCHMARKS, find_regressions, main, measure, run_benchmarks
+
+
+class TestGymBench(unittest.TestCase):
+    """Clase de tests para los benchmarks"""
+
+    def test_required_benchmarks_registered(self):
+        """Test: Las rutas principales tienen benchmark"""
+        for name in ("select_membership_plan", "add_additional_feature",
+                     "calculate_total_cost", "display_summary", "quote_batch_1000"):
+            self.assertIn(name, BENCHMARKS)
+
+    def test_feature_benchmark_adds_and_removes(self):
+        """Test: El benchmark de características agrega distintas y también quita"""
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            operation = BENCHMARKS["add_additional_feature"]()
+            self.assertTrue(all(operation() for _ in range(20)))
+        self.assertNotIn("ya estaba", output.getvalue())
+        self.assertIn("quitada", output.getvalue())
+
+    def test_rules_reference_matches_compiled(self):
+        """Test: La referencia escrita a mano calcula lo mismo que las reglas compiladas"""
+        hand_written = BENCHMARKS["rules_hand_written"]()
+        compiled = BENCHMARKS["rules_compiled"]()
+        self.assertAlmostEqual(hand_written(), compiled(), delta=0.01)
+
+    def test_measure_reports_metrics(self):
+        """Test: La medición reporta ops/seg, percentiles y memoria"""
+        result = measure(lambda: sum(range(10)), samples=5, inner=3)
+        self.assertGreater(result["ops_per_sec"], 0)
+        self.assertLessEqual(result["p50_us"], result["p99_us"])
+        self.assertIn("peak_alloc_bytes", result)
+
+    def test_benchmarks_do_not_print(self):
+        """Test: Los benchmarks descartan la salida de los métodos"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            results = run_benchmarks(["display_summary"], samples=2, inner=2)
+        self.assertEqual(output.getvalue(), "")
+        self.assertIn("display_summary", results)
+
+    def test_find_regressions(self):
+        """Test: Se detecta una caída mayor al umbral"""
+        baseline = {"a": {"ops_per_sec": 1000}, "b": {"ops_per_sec": 1000}}
+        results = {"a": {"ops_per_sec": 700}, "b": {"ops_per_sec": 900},
+                   "c": {"ops_per_sec": 1}}
+        self.assertEqual(find_regressions(results, baseline, 0.25), [("a", 1000, 700)])
+
+    def test_main_fails_on_regression(self):
+        """Test: La línea de comandos falla si hay regresión"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump({"quote": {"ops_per_sec": 1e12}}, handle)
+            with contextlib.redirect_stdout(io.StringIO()):
+                status = main(["quote", "--samples", "2", "--inner", "2", "--baseline", path])
+        self.assertEqual(status, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+Unit Tests for the monthly billing run
+Tests unitarios para la facturación mensual
+"""
+
+import csv
+import os
+import tempfile
+import unittest
+
+from gym_billing import BillingRecord, BillingRun, store_source
+from gym_catalog import current_catalog, reload_catalog
+from gym_store import MembershipStore
+
+SELECTIONS = [
+    ("Basic", 1, (), ()),
+    ("Premium", 3, ("Personal Training", "Group Classes"), ("Exclusive Gym Access",)),
+    ("Family", 4, ("Locker Rental",), ()),
+]
+
+
+def make_records(count):
+    """Genera membresías activas con ids consecutivos"""
+    return [BillingRecord(member_id, *SELECTIONS[member_id % len(SELECTIONS)])
+            for member_id in range(1, count + 1)]
+
+
+class Interrupted(Exception):
+    """Simula una caída a mitad de la corrida"""
+
+
+class TestBillingRun(unittest.TestCase):
+    """Clase de tests para la facturación"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, "invoices.csv")
+        self.records = make_records(250)
+
+    def tearDown(self):
+        """Limpia los archivos temporales"""
+        self.directory.cleanup()
+
+    def source(self, fail_after=None):
+        """Fuente de prueba que puede fallar después de cierto número de registros"""
+        def generate(after_id):
+            for count, record in enumerate(r for r in self.records if r.member_id > after_id):
+                if fail_after is not None and count == fail_after:
+                    raise Interrupted()
+                yield record
+        return generate
+
+    def read_invoices(self, path=None):
+        """Lee las facturas (o los rechazos) escritos"""
+        with open(path or self.output, encoding="utf-8", newline="") as handle:
+            return list(csv.DictReader(handle))
+
+    def test_full_run(self):
+        """Test: Cada membresía recibe una factura con el total en centavos exactos"""
+        summary = BillingRun("2026-10", self.output, checkpoint_every=50).run(self.source())
+        invoices = self.read_invoices()
+        self.assertEqual(summary["invoices"], 250)
+        self.assertEqual(len(invoices), 250)
+        catalog = current_catalog()
+        expected = catalog.quote_cents("Premium", SELECTIONS[1][2], SELECTIONS[1][3], 3).total
+        self.assertEqual(invoices[0]["invoice"], "2026-10-00000001")
+        self.assertEqual(invoices[0]["total"], f"{expected / 100:.2f}")
+        self.assertEqual(summary["amount_cents"],
+                         sum(round(float(row["total"]) * 100) for row in invoices))
+
+    def test_resume_after_interruption(self):
+        """Test: Una corrida interrumpida se reanuda sin duplicar ni perder facturas"""
+        with self.assertRaises(Interrupted):
+            BillingRun("2026-10", self.output, checkpoint_every=40).run(self.source(130))
+        summary = BillingRun("2026-10", self.output, checkpoint_every=40).run(self.source())
+        self.assertEqual(summary["resumed_from"], 120)
+        resumed = self.read_invoices()
+
+        for path in (self.output, self.output + ".rejects", self.output + ".ckpt"):
+            os.remove(path)
+        BillingRun("2026-10", self.output).run(self.source())
+        self.assertEqual(resumed, self.read_invoices())
+
+    def test_resume_keeps_starting_catalog(self):
+        """Test: Una corrida reanudada cobra con el catálogo con que empezó"""
+        catalog = current_catalog()
+        with self.assertRaises(Interrupted):
+            BillingRun("2026-10", self.output, checkpoint_every=40).run(self.source(130))
+        plans = {name: dict(plan, cost=plan["cost"] * 2) for name, plan in catalog.plans.items()}
+        try:
+            reload_catalog(plans=plans)
+            summary = BillingRun("2026-10", self.output, checkpoint_every=40).run(self.source())
+        finally:
+            reload_catalog(catalog.plans, catalog.additional_features,
+                           catalog.premium_features, catalog.rules)
+        self.assertEqual(summary["resumed_from"], 120)
+        resumed = self.read_invoices()
+
+        for path in (self.output, self.output + ".rejects", self.output + ".ckpt"):
+            os.remove(path)
+        BillingRun("2026-10", self.output).run(self.source())
+        self.assertEqual(resumed, self.read_invoices())
+
+    def test_discontinued_plan_is_rejected(self):
+        """Test: Una membresía con un plan retirado va a rechazos y la corrida sigue"""
+        self.records[9] = self.records[9]._replace(plan="Básico Étoile")
+        self.records[20] = self.records[20]._replace(additional_features=("Sauna",))
+        summary = BillingRun("2026-10", self.output).run(self.source())
+        self.assertEqual((summary["invoices"], summary["rejected"]), (248, 2))
+        rejects = self.read_invoices(self.output + ".rejects")
+        self.assertEqual([row["member_id"] for row in rejects], ["10", "21"])
+        self.assertEqual(rejects[0]["plan"], "Básico Étoile")
+        self.assertEqual(len(self.read_invoices()), 248)
+
+    def test_resume_with_non_ascii_text(self):
+        """Test: Reanudar trunca en bytes exactos aunque haya texto no ASCII"""
+        for index in range(0, 250, 7):
+            self.records[index] = self.records[index]._replace(plan="Básico Étoile")
+        with self.assertRaises(Interrupted):
+            BillingRun("2026-10", self.output, checkpoint_every=40).run(self.source(130))
+        BillingRun("2026-10", self.output, checkpoint_every=40).run(self.source())
+        resumed = (self.read_invoices(), self.read_invoices(self.output + ".rejects"))
+
+        for path in (self.output, self.output + ".rejects", self.output + ".ckpt"):
+            os.remove(path)
+        BillingRun("2026-10", self.output).run(self.source())
+        self.assertEqual(resumed,
+                         (self.read_invoices(), self.read_invoices(self.output + ".rejects")))
+
+    def test_completed_run_is_not_repeated(self):
+        """Test: Volver a ejecutar una corrida terminada no factura de nuevo"""
+        BillingRun("2026-10", self.output).run(self.source())
+        summary = BillingRun("2026-10", self.output).run(self.source())
+        self.assertEqual(summary["invoices"], 250)
+        self.assertEqual(summary["resumed_from"], 250)
+        self.assertEqual(len(self.read_invoices()), 250)
+        with self.assertRaises(ValueError):
+            BillingRun("2026-11", self.output).run(self.source())
+
+    def test_progress_reports_eta(self):
+        """Test: El avance reporta velocidad y tiempo restante"""
+        reports = []
+        BillingRun("2026-10", self.output, report_interval=0,
+                   progress=lambda *args: reports.append(args)).run(self.source(), total=250)
+        invoices, total, rate, eta = reports[-1]
+        self.assertEqual((invoices, total), (250, 250))
+        self.assertGreater(rate, 0)
+        self.assertEqual(eta, 0)
+
+    def test_store_source(self):
+        """Test: Facturar las membresías del almacén de confirmaciones"""
+        catalog = current_catalog()
+        with MembershipStore(os.path.join(self.directory.name, "store.db")) as store:
+            for plan, members, additional, premium in SELECTIONS:
+                store.append(catalog.quote(plan, additional, premium, members))
+            store.flush()
+            summary = BillingRun("2026-10", self.output).run(store_source(store))
+        self.assertEqual(summary["invoices"], 3)
+        self.assertEqual([row["plan"] for row in self.read_invoices()],
+                         ["Basic", "Premium", "Family"])
+
+    def test_cancelled_memberships_are_not_billed(self):
+        """Test: Las membresías dadas de baja no se facturan"""
+        catalog = current_catalog()
+        with MembershipStore(os.path.join(self.directory.name, "store.db")) as store:
+            ids = [store.append(catalog.quote(plan, additional, premium, members)).result()
+                   for plan, members, additional, premium in SELECTIONS]
+            store.cancel(ids[1])
+            store.cancel(ids[1])
+            with self.assertRaises(KeyError):
+                store.cancel(ids[-1] + 100)
+            self.assertEqual((store.count(), store.count(active_only=True)), (3, 2))
+            summary = BillingRun("2026-10", self.output).run(store_source(store))
+        self.assertEqual(summary["invoices"], 2)
+        self.assertEqual([row["plan"] for row in self.read_invoices()], ["Basic", "Family"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Unit Tests for the versioned catalog and quote cache
+Tests unitarios para el catálogo versionado y la caché de cotizaciones
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+import gym_catalog
+from gym_bench import stress_catalog
+from gym_catalog import QuoteCache, current_catalog, load_catalog, reload_catalog
+from gym_membership import GymMembership
+
+
+class TestCatalog(unittest.TestCase):
+    """Clase de tests para el catálogo y la caché"""
+
+    def setUp(self):
+        """Guarda el catálogo vigente antes de cada test"""
+        self.original = current_catalog()
+        self.cache = QuoteCache(maxsize=2)
+
+    def tearDown(self):
+        """Restaura los precios originales"""
+        reload_catalog(
+            self.original.plans,
+            self.original.additional_features,
+            self.original.premium_features,
+        )
+
+    def test_catalog_quote_matches_membership(self):
+        """Test: El catálogo cotiza igual que GymMembership"""
+        breakdown = current_catalog().quote(
+            "Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3)
+        self.assertAlmostEqual(breakdown.total, 230.57, places=2)
+
+    def test_repeated_features_charged_once(self):
+        """Test: Las características repetidas se cobran una sola vez en todas las rutas"""
+        catalog = current_catalog()
+        selection = ("Basic", ["Locker Rental", "Locker Rental"],
+                     ["Exclusive Gym Access", "Exclusive Gym Access"], 1)
+        breakdown = catalog.quote(*selection)
+        self.assertEqual(breakdown.total, 161)
+        self.assertEqual(breakdown.additional_features, ("Locker Rental",))
+        self.assertEqual(catalog.total(*selection), 161)
+        self.assertEqual(catalog.total_cents(*selection), 16100)
+        self.assertEqual(catalog.quote_cents(*selection).total, 16100)
+        self.assertEqual(QuoteCache().quote(*selection).total, 161)
+
+    def test_catalog_quote_invalid_plan(self):
+        """Test: Plan inexistente en el catálogo"""
+        with self.assertRaises(ValueError):
+            current_catalog().quote("Gold")
+
+    def test_reload_bumps_version_and_syncs_class(self):
+        """Test: Recargar publica una nueva versión y actualiza la clase"""
+        catalog = reload_catalog(additional_features={"Locker Rental": 12})
+        self.assertEqual(catalog.version, self.original.version + 1)
+        self.assertIs(current_catalog(), catalog)
+        self.assertEqual(GymMembership.ADDITIONAL_FEATURES, {"Locker Rental": 12})
+        self.assertEqual(catalog.plans, self.original.plans)
+
+    def test_published_catalog_is_immutable(self):
+        """Test: Una versión publicada no se puede modificar"""
+        catalog = current_catalog()
+        with self.assertRaises(TypeError):
+            catalog.additional_features["Locker Rental"] = 1
+        with self.assertRaises(TypeError):
+            catalog.plans["Basic"]["cost"] = 1
+        tables = catalog.to_dict()
+        tables["additional_features"]["Locker Rental"] = 1
+        self.assertEqual(catalog.additional_features["Locker Rental"], 10)
+
+    def test_class_tables_are_catalog_views(self):
+        """Test: Las tablas de GymMembership son la versión publicada, de solo lectura"""
+        with self.assertRaises(TypeError):
+            # pylint: disable-next=unsupported-assignment-operation
+            GymMembership.ADDITIONAL_FEATURES["Locker Rental"] = 1
+        gym = GymMembership.from_selection("Basic", ["Locker Rental"])
+        self.assertIs(gym.ADDITIONAL_FEATURES, current_catalog().additional_features)
+        GymMembership.ADDITIONAL_FEATURES = {"Locker Rental": 20}
+        self.assertEqual(current_catalog().version, self.original.version + 1)
+        self.assertEqual(gym.quote().additional_cost, 20)
+        reload_catalog(additional_features={})
+        with self.assertRaises(ValueError):
+            gym.quote()
+
+    def test_pinned_snapshot_survives_reload(self):
+        """Test: Quien ya obtuvo el catálogo sigue cotizando con esa versión"""
+        pinned = current_catalog()
+        reload_catalog(plans={"Basic": {"cost": 999, "benefits": []}})
+        self.assertEqual(pinned.quote("Basic").total, 50)
+        self.assertEqual(current_catalog().quote("Basic").total, 999 - 50)
+
+    def test_concurrent_quotes_during_reloads(self):
+        """Test: Cotizar en varios hilos mientras cambian los precios no mezcla versiones"""
+        result = stress_catalog(threads=4, seconds=0.3)
+        self.assertEqual(result["torn_reads"], 0)
+        self.assertGreater(result["reloads"], 1)
+        self.assertGreater(result["quotes"], 0)
+        self.assertEqual(current_catalog().plans, self.original.plans)
+
+    def test_load_catalog_from_json(self):
+        """Test: Cargar precios desde un archivo JSON"""
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as handle:
+            json.dump({"premium_features": {"Exclusive Gym Access": 90}}, handle)
+        try:
+            catalog = load_catalog(handle.name)
+        finally:
+            os.remove(handle.name)
+        self.assertEqual(catalog.premium_features, {"Exclusive Gym Access": 90})
+
+    def test_cache_hits_and_misses(self):
+        """Test: Cotizaciones repetidas se sirven desde la caché"""
+        first = self.cache.quote("Basic", ["Locker Rental"], [], 2)
+        second = self.cache.quote("Basic", ["Locker Rental"], [], 5)
+        self.assertEqual(first.total, second.total)
+        self.assertEqual(second.num_members, 5)
+        self.assertEqual(self.cache.info()["hits"], 1)
+        self.assertEqual(self.cache.info()["misses"], 1)
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test: La caché respeta su tamaño máximo"""
+        self.cache.quote("Basic")
+        self.cache.quote("Premium")
+        self.cache.quote("Basic")
+        self.cache.quote("Family")
+        self.assertEqual(self.cache.info()["size"], 2)
+        self.cache.quote("Basic")
+        self.assertEqual(self.cache.info()["hits"], 2)
+
+    def test_cache_invalidated_on_reload(self):
+        """Test: Un cambio de catálogo invalida la caché"""
+        self.assertEqual(self.cache.quote("Basic").total, 50)
+        reload_catalog(plans={"Basic": {"cost": 55, "benefits": []}})
+        self.assertEqual(self.cache.quote("Basic").total, 55)
+        self.assertEqual(self.cache.info()["hits"], 0)
+        self.assertEqual(self.cache.info()["version"], gym_catalog.current_catalog().version)
+
+
+if __name__ == '__main__':
+    unittest.main()
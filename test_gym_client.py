@@ -0,0 +1,144 @@
+"""
+Unit Tests for the resident daemon client
+Tests unitarios para el cliente del servicio residente
+"""
+
+import asyncio
+import contextlib
+import functools
+import io
+import os
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+from gym_client import build_message, default_socket_path, main, request
+from gym_service import QuoteService
+
+
+class TestBuildMessage(unittest.TestCase):
+    """Clase de tests para la construcción de solicitudes"""
+
+    def test_quote_message(self):
+        """Test: Argumentos de cotización"""
+        message = build_message(["quote", "Premium", "3", "Personal Training;Group Classes"])
+        self.assertEqual(message, {
+            "op": "quote", "plan": "Premium", "members": "3",
+            "additional_features": "Personal Training;Group Classes",
+        })
+
+    def test_default_socket_is_per_user(self):
+        """Test: Sin GYM_SOCKET el socket vive en el directorio de ejecución del usuario"""
+        with unittest.mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": "/run/user/1000"}):
+            os.environ.pop("GYM_SOCKET", None)
+            self.assertEqual(default_socket_path(), "/run/user/1000/gym_membership.sock")
+        with unittest.mock.patch.dict(os.environ, {"GYM_SOCKET": "/srv/gym.sock"}):
+            self.assertEqual(default_socket_path(), "/srv/gym.sock")
+        with unittest.mock.patch.dict(os.environ, {"TMPDIR": "/tmp"}):
+            os.environ.pop("GYM_SOCKET", None)
+            os.environ.pop("XDG_RUNTIME_DIR", None)
+            self.assertEqual(default_socket_path(),
+                             f"/tmp/gym-{os.getuid()}/gym_membership.sock")
+
+    def test_truncated_reply_is_reported(self):
+        """Test: Una respuesta vacía o cortada termina con error, sin traza"""
+        for reply in (b"", b'{"ok": tr'):
+            with self.subTest(reply=reply), tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "gym.sock")
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+                    server.bind(path)
+                    server.listen(1)
+                    thread = threading.Thread(target=self._reply_once, args=(server, reply))
+                    thread.start()
+                    errors = io.StringIO()
+                    with unittest.mock.patch("gym_client.request",
+                                             functools.partial(request, path=path)), \
+                            contextlib.redirect_stderr(errors):
+                        self.assertEqual(main(["catalog"]), 1)
+                    thread.join()
+                self.assertIn("no se pudo conectar con el servicio", errors.getvalue())
+
+    @staticmethod
+    def _reply_once(server, reply):
+        """Acepta una conexión, envía reply y la cierra"""
+        connection, _ = server.accept()
+        with connection:
+            connection.recv(65536)
+            connection.sendall(reply)
+
+    def test_invalid_arguments(self):
+        """Test: Argumentos inválidos"""
+        with self.assertRaises(ValueError):
+            build_message([])
+        with self.assertRaises(ValueError):
+            build_message(["confirm"])
+
+
+class TestDaemon(unittest.IsolatedAsyncioTestCase):
+    """Clase de tests para el servicio en socket Unix"""
+
+    async def asyncSetUp(self):
+        """Arranca el servicio en un socket temporal"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "gym.sock")
+        self.service = QuoteService()
+        self.service.warm_up()
+        self.server = await self.service.serve_unix(self.path)
+
+    async def asyncTearDown(self):
+        """Detiene el servicio"""
+        self.server.close()
+        await self.server.wait_closed()
+        await self.service.stop_batcher()
+        self.directory.cleanup()
+
+    async def test_quote_and_confirm(self):
+        """Test: Cotizar y confirmar a través del socket"""
+        quote = await asyncio.to_thread(
+            request, build_message(["quote", "Basic", "1", "Personal Training"]), self.path)
+        self.assertTrue(quote["ok"])
+        self.assertEqual(quote["quote"]["total"], 90)
+        confirm = await asyncio.to_thread(
+            request, build_message(["confirm", "Basic", "2"]), self.path)
+        self.assertEqual(confirm["result"], 45)
+        self.assertGreater(self.service.cache.info()["hits"], 0)
+
+    async def test_socket_is_private(self):
+        """Test: El socket solo lo puede usar el usuario del servicio"""
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    async def test_live_socket_is_not_replaced(self):
+        """Test: No se reemplaza el socket de un servicio que sigue atendiendo"""
+        with self.assertRaises(OSError):
+            await QuoteService().serve_unix(self.path)
+        response = await asyncio.to_thread(request, {"op": "catalog"}, self.path)
+        self.assertTrue(response["ok"])
+
+    async def test_stale_socket_is_replaced(self):
+        """Test: Un socket abandonado se reemplaza y un archivo común no se toca"""
+        stale = os.path.join(self.directory.name, "stale.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as abandoned:
+            abandoned.bind(stale)
+        service = QuoteService()
+        server = await service.serve_unix(stale)
+        server.close()
+        await server.wait_closed()
+        await service.stop_batcher()
+        regular = os.path.join(self.directory.name, "notes.txt")
+        with open(regular, "w", encoding="utf-8") as handle:
+            handle.write("no borrar")
+        with self.assertRaises(FileExistsError):
+            await QuoteService().serve_unix(regular)
+        self.assertTrue(os.path.exists(regular))
+
+    async def test_catalog_listing(self):
+        """Test: El cliente obtiene el catálogo del servicio"""
+        response = await asyncio.to_thread(request, {"op": "catalog"}, self.path)
+        self.assertIn("Family", response["catalog"]["plans"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Unit Tests for the compact membership representation
+Tests unitarios para la representación compacta de membresías
+"""
+
+import contextlib
+import io
+import unittest
+
+from gym_compact import NO_PLAN, CompactMembership, MembershipCodec, MembershipColumns
+from gym_membership import GymMembership
+
+
+def make_membership(plan, additional=(), premium=(), members=1):
+    """Crea un GymMembership sin imprimir"""
+    gym = GymMembership()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if plan is not None:
+            gym.select_membership_plan(plan)
+        for feature in additional:
+            gym.add_additional_feature(feature)
+        for feature in premium:
+            gym.add_premium_feature(feature)
+        gym.set_number_of_members(members)
+    return gym
+
+
+class TestCompactMembership(unittest.TestCase):
+    """Clase de tests para la representación compacta"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.codec = MembershipCodec()
+
+    def test_slots_without_dict(self):
+        """Test: La membresía compacta no tiene __dict__"""
+        self.assertFalse(hasattr(CompactMembership(), "__dict__"))
+
+    def test_encode_membership(self):
+        """Test: Codificar plan y características"""
+        gym = make_membership("Premium", ["Group Classes", "Locker Rental"],
+                              ["Exclusive Gym Access"], 3)
+        compact = CompactMembership.from_membership(gym, self.codec)
+        self.assertEqual(compact.plan_code, 2)
+        self.assertEqual(compact.additional_mask, 0b1010)
+        self.assertEqual(compact.premium_mask, 0b01)
+        self.assertEqual(compact.num_members, 3)
+
+    def test_no_plan_code(self):
+        """Test: Membresía sin plan"""
+        compact = CompactMembership.from_membership(GymMembership(), self.codec)
+        self.assertEqual(compact.plan_code, NO_PLAN)
+        self.assertIsNone(compact.to_membership(self.codec).selected_plan)
+
+    def test_invalid_plan_rejected(self):
+        """Test: Plan inexistente al codificar"""
+        with self.assertRaises(ValueError):
+            self.codec.plan_code("Gold")
+
+    def test_columns_round_trip(self):
+        """Test: Las columnas reconstruyen las membresías originales"""
+        originals = [
+            make_membership("Basic"),
+            make_membership("Family", list(GymMembership.ADDITIONAL_FEATURES),
+                            list(GymMembership.PREMIUM_FEATURES), 4),
+            make_membership("Premium", ["Personal Training"], [], 2),
+        ]
+        columns = MembershipColumns.from_memberships(originals, self.codec)
+        self.assertEqual(len(columns), 3)
+        for original, rebuilt in zip(originals, columns.memberships()):
+            self.assertEqual(rebuilt.selected_plan, original.selected_plan)
+            self.assertEqual(list(rebuilt.additional_features),
+                             list(original.additional_features))
+            self.assertEqual(list(rebuilt.premium_features), list(original.premium_features))
+            self.assertEqual(rebuilt.num_members, original.num_members)
+        self.assertEqual(columns.nbytes(), 3 * 13)
+
+
+if __name__ == '__main__':
+    unittest.main()
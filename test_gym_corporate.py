@@ -0,0 +1,79 @@
+"""
+Unit Tests for corporate bulk enrollment
+Tests unitarios para la inscripción corporativa masiva
+"""
+
+import unittest
+
+from gym_catalog import current_catalog
+from gym_corporate import VOLUME_TIERS, price_roster, volume_discount_rate
+
+SELECTIONS = [
+    ("Basic", [], []),
+    ("Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"]),
+    ("Family", ["Locker Rental"], []),
+]
+
+
+def make_roster(count):
+    """Genera una nómina repartida entre las selecciones de prueba"""
+    return [(f"E{index:05d}",) + SELECTIONS[index % len(SELECTIONS)] for index in range(count)]
+
+
+class TestCorporate(unittest.TestCase):
+    """Clase de tests para la inscripción corporativa"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.catalog = current_catalog()
+
+    def test_volume_tiers(self):
+        """Test: Escalones de descuento por volumen"""
+        self.assertEqual(volume_discount_rate(1), 0.0)
+        self.assertEqual(volume_discount_rate(2), 0.10)
+        self.assertEqual(volume_discount_rate(50), 0.12)
+        self.assertEqual(volume_discount_rate(3000), 0.20)
+        self.assertEqual(volume_discount_rate(300, tiers=((100, 0.5),)), 0.5)
+        self.assertEqual(VOLUME_TIERS[-1][1], 0.10)
+
+    def test_small_group_matches_individual_quotes(self):
+        """Test: Debajo de 50 empleados cada línea vale lo mismo que una cotización grupal"""
+        for line in price_roster(make_roster(6)):
+            quote = self.catalog.quote_cents(
+                line.plan, line.additional_features, line.premium_features, 2)
+            self.assertEqual(line.total, quote.total)
+            self.assertEqual(line.volume_discount, quote.group_discount)
+
+    def test_large_account_one_pass(self):
+        """Test: 3000 empleados se cotizan con una cotización por selección distinta"""
+        totals = {}
+        lines = list(price_roster(make_roster(3000), totals=totals))
+        self.assertEqual(len(lines), 3000)
+        self.assertEqual(totals["lines"], 3000)
+        self.assertEqual(totals["distinct_selections"], 3)
+        self.assertEqual(totals["total"], sum(line.total for line in lines))
+        basic = lines[0]
+        self.assertEqual(basic.volume_discount, 1000)
+        self.assertEqual(basic.total, 4000)
+        self.assertEqual(totals["total"],
+                         totals["subtotal"] - totals["volume_discount"]
+                         - totals["special_discount"] + totals["premium_surcharge"])
+
+    def test_streams_lines(self):
+        """Test: Las líneas salen antes de leer toda la nómina"""
+        roster = iter(make_roster(2) + [("E9", "Gold", [], [])])
+        lines = price_roster(roster, headcount=3)
+        self.assertEqual(next(lines).employee, "E00000")
+        self.assertEqual(next(lines).employee, "E00001")
+        with self.assertRaisesRegex(ValueError, "E9"):
+            next(lines)
+
+    def test_duplicate_features_counted_once(self):
+        """Test: Una característica repetida se cobra una sola vez"""
+        line, = price_roster([("E1", "Basic", ["Locker Rental", "Locker Rental"], [])])
+        self.assertEqual(line.additional_features, ("Locker Rental",))
+        self.assertEqual(line.total, 6000)
+
+
+if __name__ == '__main__':
+    unittest.main()
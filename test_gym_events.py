@@ -0,0 +1,164 @@
+"""
+Unit Tests for event-sourced membership sessions
+Tests unitarios para las sesiones de membresía con registro de eventos
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from gym_catalog import current_catalog, reload_catalog
+from gym_compact import CompactMembership
+from gym_events import EVENT, EventLog, rebuild
+
+
+class TestEventLog(unittest.TestCase):
+    """Clase de tests para el log de eventos"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "sessions.events")
+        # Los métodos de GymMembership imprimen confirmaciones
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+
+    def tearDown(self):
+        """Limpia los archivos"""
+        self.quiet.__exit__(None, None, None)
+        self.directory.cleanup()
+
+    def run_session(self, log):
+        """Registra una sesión típica y retorna la membresía"""
+        gym = log.session()
+        gym.select_membership_plan("Premium")
+        gym.add_additional_feature("Personal Training")
+        gym.add_additional_feature("Group Classes")
+        gym.add_premium_feature("Exclusive Gym Access")
+        gym.remove_additional_feature("Personal Training")
+        gym.set_number_of_members(3)
+        return gym
+
+    def test_state_follows_session(self):
+        """Test: El estado registrado coincide con la membresía de la sesión"""
+        with EventLog(self.path) as log:
+            gym = self.run_session(log)
+            self.assertEqual(log.state(gym.session_id),
+                             CompactMembership.from_membership(gym, log.codec))
+            self.assertEqual(len(log), 6)
+
+    def test_failed_changes_are_not_recorded(self):
+        """Test: Los cambios rechazados no agregan eventos"""
+        with EventLog(self.path) as log:
+            gym = log.session()
+            self.assertFalse(gym.select_membership_plan("Platinum"))
+            self.assertFalse(gym.remove_premium_feature("Exclusive Gym Access"))
+            self.assertFalse(gym.set_number_of_members(0))
+            self.assertEqual(len(log), 0)
+
+    def test_repeated_changes_are_not_recorded(self):
+        """Test: Repetir un cambio que no modifica nada no agrega eventos"""
+        with EventLog(self.path) as log:
+            gym = self.run_session(log)
+            self.assertTrue(gym.add_additional_feature("Group Classes"))
+            self.assertTrue(gym.add_premium_feature("Exclusive Gym Access"))
+            self.assertTrue(gym.select_membership_plan("Premium"))
+            self.assertTrue(gym.set_number_of_members(3))
+            self.assertEqual(len(log), 6)
+
+    def test_unencodable_change_leaves_session_unchanged(self):
+        """Test: Un nombre que el log no conoce falla antes de modificar la membresía"""
+        catalog = current_catalog()
+        with EventLog(self.path) as log:
+            gym = self.run_session(log)
+            reload_catalog(additional_features=dict(catalog.additional_features, Sauna=15))
+            try:
+                with self.assertRaises(ValueError):
+                    gym.add_additional_feature("Sauna")
+            finally:
+                reload_catalog(catalog.plans, catalog.additional_features,
+                               catalog.premium_features, catalog.rules)
+            self.assertNotIn("Sauna", gym.additional_features)
+            self.assertEqual(len(log), 6)
+            self.assertEqual(log.state(gym.session_id),
+                             CompactMembership.from_membership(gym, log.codec))
+
+    def test_reopen_replays_log(self):
+        """Test: Al reabrir el log se recuperan todas las sesiones"""
+        with EventLog(self.path, snapshot_every=1000) as log:
+            first = self.run_session(log)
+            second = log.session()
+            second.select_membership_plan("Family")
+            expected = log.state()
+        with EventLog(self.path) as log:
+            self.assertEqual(log.state(), expected)
+            self.assertEqual(log.replayed, 7)
+            self.assertNotIn(log.session().session_id, (first.session_id, second.session_id))
+        self.assertEqual(rebuild(self.path), expected)
+        self.assertEqual(rebuild(self.path, second.session_id), expected[second.session_id])
+
+    def test_snapshot_bounds_replay(self):
+        """Test: Con instantáneas solo se reproducen los eventos posteriores"""
+        with EventLog(self.path, snapshot_every=4) as log:
+            self.run_session(log)
+            self.run_session(log)
+            expected = log.state()
+        self.assertTrue(os.path.exists(self.path + ".snapshot"))
+        with EventLog(self.path) as log:
+            self.assertEqual(log.state(), expected)
+            self.assertEqual(log.replayed, 12 % 4)
+
+    def test_restore_continues_session(self):
+        """Test: Una sesión reconstruida sigue registrando cambios"""
+        with EventLog(self.path) as log:
+            session_id = self.run_session(log).session_id
+        with EventLog(self.path) as log:
+            gym = log.restore(session_id)
+            self.assertEqual(gym.selected_plan, "Premium")
+            self.assertEqual(list(gym.additional_features), ["Group Classes"])
+            self.assertEqual(gym.num_members, 3)
+            self.assertTrue(gym.add_additional_feature("Nutrition Consultation"))
+        self.assertEqual(rebuild(self.path, session_id),
+                         CompactMembership.from_membership(gym, log.codec))
+
+    def test_torn_tail_is_discarded(self):
+        """Test: Un evento incompleto al final se descarta al reabrir"""
+        with EventLog(self.path) as log:
+            self.run_session(log)
+            expected = log.state()
+        with open(self.path, "ab") as stream:
+            stream.write(b"\x01" * (EVENT.size - 1))
+        with EventLog(self.path) as log:
+            self.assertEqual(log.state(), expected)
+            self.run_session(log)
+        self.assertEqual(len(rebuild(self.path)), 2)
+
+    def test_stale_snapshot_is_ignored(self):
+        """Test: Una instantánea más nueva que el log no se usa"""
+        with EventLog(self.path, snapshot_every=6) as log:
+            self.run_session(log)
+        with open(self.path, "r+b") as stream:
+            stream.truncate(os.path.getsize(self.path) - EVENT.size)
+        with EventLog(self.path) as log:
+            self.assertEqual(len(log), 5)
+            self.assertEqual(log.replayed, 5)
+            self.assertEqual(log.state(1).num_members, 1)
+
+    def test_truncated_snapshot_is_ignored(self):
+        """Test: Una instantánea con menos sesiones que su encabezado no se usa"""
+        with EventLog(self.path, snapshot_every=6) as log:
+            self.run_session(log)
+            self.run_session(log)
+            expected = log.state()
+        snapshot = self.path + ".snapshot"
+        with open(snapshot, "r+b") as stream:
+            stream.truncate(os.path.getsize(snapshot) - 1)
+        with EventLog(self.path) as log:
+            self.assertEqual(log.state(), expected)
+            self.assertEqual(log.replayed, 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Unit Tests for the binary membership ledger
+Tests unitarios para el libro binario de membresías
+"""
+
+import os
+import tempfile
+import unittest
+
+from gym_catalog import current_catalog, reload_catalog
+from gym_compact import CompactMembership, MembershipCodec
+from gym_ledger import (
+    RECORD,
+    ConfirmedAmounts,
+    LedgerReader,
+    LedgerWriter,
+    segment_paths,
+    total_to_cents,
+)
+from gym_money import Cents
+
+
+class TestLedger(unittest.TestCase):
+    """Clase de tests para el libro binario"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.catalog = current_catalog()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "confirmed.ledger")
+        self.quotes = [
+            self.catalog.quote_cents("Basic", [], [], 1),
+            self.catalog.quote_cents("Premium", ["Personal Training", "Group Classes"],
+                                     ["Exclusive Gym Access"], 3),
+            self.catalog.quote_cents("Family", ["Group Classes"], [], 4),
+        ]
+
+    def tearDown(self):
+        """Restaura el catálogo y limpia los archivos"""
+        reload_catalog(self.catalog.plans, self.catalog.additional_features,
+                       self.catalog.premium_features, self.catalog.rules)
+        self.directory.cleanup()
+
+    def write_quotes(self):
+        """Escribe las cotizaciones de prueba"""
+        with LedgerWriter(self.path) as writer:
+            for breakdown in self.quotes:
+                writer.append_quote(breakdown)
+
+    def test_round_trip(self):
+        """Test: Los registros se leen tal como se escribieron"""
+        self.write_quotes()
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(len(reader), 3)
+            self.assertEqual(reader.catalog_version, self.catalog.version)
+            entry = list(reader.entries())[1]
+            self.assertEqual(entry.plan, "Premium")
+            self.assertEqual(entry.additional_features, ("Personal Training", "Group Classes"))
+            self.assertEqual(entry.premium_features, ("Exclusive Gym Access",))
+            self.assertEqual(entry.num_members, 3)
+            self.assertEqual(entry.total_cents, self.quotes[1].total)
+            self.assertEqual(entry.group_discount_cents, self.quotes[1].group_discount)
+            self.assertEqual(entry.special_discount_cents, self.quotes[1].special_discount)
+            self.assertEqual(entry.premium_surcharge_cents, self.quotes[1].premium_surcharge)
+
+    def test_columns_are_zero_copy_views(self):
+        """Test: Las columnas son vistas sobre el archivo mapeado"""
+        self.write_quotes()
+        with LedgerReader(self.path) as reader:
+            columns = reader.columns()
+            self.assertIsInstance(columns.total_cents, memoryview)
+            self.assertEqual(sum(columns.total_cents), sum(q.total for q in self.quotes))
+            self.assertEqual(columns.num_members.tolist(), [1, 3, 4])
+            self.assertEqual(columns.group_discount_cents.tolist(),
+                             [q.group_discount for q in self.quotes])
+            self.assertEqual(columns.premium_surcharge_cents.tolist(),
+                             [q.premium_surcharge for q in self.quotes])
+            codec = MembershipCodec()
+            self.assertEqual(columns.plan_codes.tolist(),
+                             [codec.plan_code(q.plan) for q in self.quotes])
+            self.assertEqual(columns.additional_masks[1],
+                             codec.additional_mask(["Personal Training", "Group Classes"]))
+
+    def test_header_survives_catalog_change(self):
+        """Test: El libro se lee con sus propios nombres aunque cambie el catálogo"""
+        self.write_quotes()
+        reload_catalog(plans={"Student": {"cost": 30, "benefits": ["Gym access"]}},
+                       additional_features={}, premium_features={})
+        with LedgerReader(self.path) as reader:
+            self.assertEqual([entry.plan for entry in reader.entries()],
+                             ["Basic", "Premium", "Family"])
+        # Otro diccionario empieza un segmento nuevo en vez de fallar
+        with LedgerWriter(self.path, MembershipCodec()) as writer:
+            self.assertEqual(writer.segment_path, self.path + ".1")
+        self.assertEqual(segment_paths(self.path), [self.path, self.path + ".1"])
+
+    def test_new_feature_starts_segment(self):
+        """Test: Una cotización con una característica nueva abre un segmento con otro encabezado"""
+        with LedgerWriter(self.path) as writer:
+            writer.append_quote(self.quotes[0])
+            catalog = reload_catalog(additional_features=dict(
+                self.catalog.additional_features, Sauna=15))
+            writer.append_quote(catalog.quote("Basic", ["Sauna"]))
+            writer.append_quote(self.quotes[1])
+            with self.assertRaises(ValueError):
+                writer.append_quote(self.catalog.quote("Basic")._replace(plan="Gold"))
+        self.assertEqual(segment_paths(self.path), [self.path, self.path + ".1"])
+        with LedgerReader(self.path) as reader:
+            self.assertEqual([entry.plan for entry in reader.entries()], ["Basic"])
+        with LedgerReader(self.path + ".1") as reader:
+            entries = list(reader.entries())
+            self.assertEqual(reader.catalog_version, catalog.version)
+            self.assertEqual(entries[0].additional_features, ("Sauna",))
+            self.assertEqual(entries[0].total_cents, 6500)
+            self.assertEqual(entries[1].total_cents, self.quotes[1].total)
+        # Al reabrir se sigue agregando al último segmento
+        with LedgerWriter(self.path) as writer:
+            self.assertEqual(writer.segment_path, self.path + ".1")
+
+    def test_torn_tail_is_discarded(self):
+        """Test: Un registro incompleto al final se ignora y se descarta al reabrir"""
+        self.write_quotes()
+        with open(self.path, "ab") as stream:
+            stream.write(b"\x01\x02\x03")
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(len(reader), 3)
+        with LedgerWriter(self.path) as writer:
+            writer.append(CompactMembership(1, 0, 0, 1), ConfirmedAmounts(5000, 0, 0, 0))
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(len(reader), 4)
+            self.assertEqual(reader.record(3)[1].total, 5000)
+        self.assertEqual((os.path.getsize(self.path) - reader._data_offset) % RECORD.size, 0)
+
+    def test_rejects_foreign_file(self):
+        """Test: Un archivo que no es libro se rechaza"""
+        with open(self.path, "wb") as stream:
+            stream.write(b"plan,num_members\n" * 4)
+        with self.assertRaises(ValueError):
+            LedgerReader(self.path)
+
+    def test_total_to_cents(self):
+        """Test: Totales en dólares se convierten con medio centavo hacia abajo"""
+        self.assertEqual(total_to_cents(230.575), 23057)
+        self.assertEqual(total_to_cents(45.0), 4500)
+        self.assertEqual(total_to_cents(50), 5000)
+        self.assertEqual(total_to_cents(Cents(12345)), 12345)
+
+
+if __name__ == '__main__':
+    unittest.main()
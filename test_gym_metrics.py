@@ -0,0 +1,67 @@
+"""
+Unit Tests for pricing instrumentation
+Tests unitarios para las métricas del cálculo de precios
+"""
+
+import contextlib
+import io
+import unittest
+
+import gym_quote
+from gym_metrics import MetricsRegistry, instrumented
+from gym_membership import GymMembership
+
+
+class TestGymMetrics(unittest.TestCase):
+    """Clase de tests para la instrumentación"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.gym = GymMembership.from_selection(
+            "Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3)
+
+    def test_disabled_by_default(self):
+        """Test: La instrumentación está desactivada por defecto"""
+        self.assertIsNone(gym_quote.active_metrics())
+
+    def test_stage_timings_and_branch_counters(self):
+        """Test: Se registran etapas y ramas aplicadas"""
+        with instrumented() as registry, contextlib.redirect_stdout(io.StringIO()):
+            total = self.gym.calculate_total_cost()
+            GymMembership.from_selection("Basic").calculate_total_cost()
+        self.assertAlmostEqual(total, 230.57, places=2)
+        snapshot = registry.snapshot()
+        for stage in ("base_cost", "features", "group_discount", "special_discount",
+                      "premium_surcharge"):
+            self.assertEqual(snapshot["stages"][stage]["count"], 2)
+        self.assertEqual(snapshot["counters"], {
+            "quotes": 2,
+            "group_discount.applied": 1,
+            "special_offer.20": 1,
+            "premium_surcharge.applied": 1,
+        })
+        self.assertIsNone(gym_quote.active_metrics())
+
+    def test_instrumented_results_match(self):
+        """Test: La ruta instrumentada produce el mismo desglose"""
+        expected = self.gym.quote()
+        with instrumented():
+            self.assertEqual(self.gym.quote(), expected)
+
+    def test_export_hooks_and_prometheus(self):
+        """Test: Exportar las métricas a hooks y en formato Prometheus"""
+        registry = MetricsRegistry()
+        exported = []
+        registry.add_hook(exported.append)
+        with instrumented(registry):
+            self.gym.quote()
+        registry.export()
+        self.assertEqual(exported[0]["counters"]["quotes"], 1)
+        text = registry.to_prometheus()
+        self.assertIn('gym_pricing_events_total{event="quotes"} 1', text)
+        registry.reset()
+        self.assertEqual(registry.snapshot(), {"stages": {}, "counters": {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
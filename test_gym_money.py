@@ -0,0 +1,113 @@
+"""
+Unit Tests for integer-cents money
+Tests unitarios para el dinero en centavos enteros
+"""
+
+import unittest
+
+from gym_batch import quote_batch_cents
+from gym_catalog import current_catalog, reload_catalog
+from gym_membership import GymMembership
+from gym_money import Cents, apply_rate, apply_rate_source, price_total_cents
+
+
+class TestCents(unittest.TestCase):
+    """Clase de tests para Cents y el redondeo"""
+
+    def test_from_dollars_is_exact(self):
+        """Test: Convertir dólares a centavos sin pérdida"""
+        self.assertEqual(Cents.from_dollars(230.57), 23057)
+        self.assertEqual(Cents.from_dollars("0.1"), 10)
+        with self.assertRaises(ValueError):
+            Cents.from_dollars(0.001)
+
+    def test_format(self):
+        """Test: Formato de montos en centavos"""
+        self.assertEqual(str(Cents(23057)), "$230.57")
+        self.assertEqual(str(Cents(-5)), "-$0.05")
+        self.assertEqual(Cents(23057).dollars(), 230.57)
+
+    def test_round_half_down(self):
+        """Test: Medio centavo se redondea hacia abajo, el resto al más cercano"""
+        self.assertEqual(apply_rate(20050, 1500), 3007)
+        self.assertEqual(apply_rate(20051, 1500), 3008)
+        self.assertEqual(apply_rate(13950, 1500), 2092)
+        self.assertEqual(apply_rate(15500, 1000), 1550)
+
+    def test_compiled_rounding_matches_apply_rate(self):
+        """Test: El código generado de las reglas redondea igual que apply_rate"""
+        for points in (1, 1000, 1500, 3333):
+            expression = apply_rate_source("cents", points)
+            for cents in range(0, 40001, 7):
+                self.assertEqual(eval(expression, {"cents": cents}),  # pylint: disable=eval-used
+                                 apply_rate(cents, points))
+
+    def test_half_cent_surcharge_rounds_down(self):
+        """Test: Cambio intencional respecto al cálculo en flotantes de la versión original
+
+        Basic + Group Classes + Exclusive Gym Access con 2 miembros: el recargo
+        de 15% sobre $139.50 es $20.925, que se redondea a $20.92. La versión
+        original sumaba el flotante sin redondear y daba $160.43.
+        """
+        breakdown = current_catalog().quote_cents(
+            "Basic", ["Group Classes"], ["Exclusive Gym Access"], 2)
+        self.assertEqual(breakdown.premium_surcharge, 2092)
+        self.assertEqual(breakdown.total, 16042)
+        gym = GymMembership.from_selection(
+            "Basic", ["Group Classes"], ["Exclusive Gym Access"], 2)
+        self.assertEqual(gym.quote().total, 160.42)
+
+    def test_complex_scenario_in_cents(self):
+        """Test: Escenario complejo exacto en centavos"""
+        breakdown = current_catalog().quote_cents(
+            "Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3)
+        self.assertEqual(breakdown.subtotal, 24500)
+        self.assertEqual(breakdown.group_discount, 2450)
+        self.assertEqual(breakdown.special_discount, 2000)
+        self.assertEqual(breakdown.premium_surcharge, 3007)
+        self.assertEqual(breakdown.total, 23057)
+        self.assertEqual(price_total_cents(24500, 3, True, current_catalog()), 23057)
+
+    def test_batch_cents_matches_catalog(self):
+        """Test: El lote en centavos coincide con la cotización individual"""
+        rows = [
+            ("Basic", [], [], 1),
+            ("Family", list(GymMembership.ADDITIONAL_FEATURES),
+             list(GymMembership.PREMIUM_FEATURES), 5),
+            ("Premium", ["Locker Rental"], ["Specialized Training Program"], 2),
+        ]
+        totals = quote_batch_cents(*[list(column) for column in zip(*rows)])
+        for row, total in zip(rows, totals):
+            self.assertEqual(total, current_catalog().quote_cents(*row).total)
+        self.assertEqual(list(quote_batch_cents([None], [[]], [[]], [1])), [-1])
+
+    def test_membership_prices_in_cents(self):
+        """Test: La ruta interactiva suma y cotiza en centavos, igual que el catálogo"""
+        original = current_catalog()
+        try:
+            catalog = reload_catalog(additional_features={"Towel": 0.1, "Water": 0.2})
+            gym = GymMembership.from_selection("Premium", ["Towel", "Water"], [], 2)
+            self.assertEqual(gym.calculate_additional_features_cost(), 0.3)
+            self.assertEqual(gym.quote(), catalog.quote("Premium", ["Towel", "Water"], [], 2))
+            self.assertEqual(Cents.from_dollars(gym.quote().total),
+                             catalog.quote_cents("Premium", ["Towel", "Water"], [], 2).total)
+        finally:
+            reload_catalog(original.plans, original.additional_features,
+                           original.premium_features, original.rules)
+
+    def test_dollar_quote_matches_cents(self):
+        """Test: El desglose en dólares es el mismo cálculo en centavos, incluidos los empates"""
+        catalog = current_catalog()
+        for plan in catalog.plans:
+            for members in (1, 2):
+                for premium in ([], ["Exclusive Gym Access"]):
+                    for additional in ([], ["Personal Training", "Nutrition Consultation"]):
+                        cents = catalog.quote_cents(plan, additional, premium, members)
+                        dollars = catalog.quote(plan, additional, premium, members)
+                        self.assertEqual(Cents.from_dollars(dollars.total), cents.total)
+                        self.assertEqual(Cents.from_dollars(dollars.premium_surcharge),
+                                         cents.premium_surcharge)
+
+
+if __name__ == '__main__':
+    unittest.main()
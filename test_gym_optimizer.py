@@ -0,0 +1,94 @@
+"""
+Unit Tests for the budget-constrained package optimizer
+Tests unitarios para el optimizador de paquetes
+"""
+
+import itertools
+import unittest
+
+from gym_catalog import Catalog, current_catalog
+from gym_optimizer import cheapest_packages
+
+
+def brute_force(catalog, required, num_members, budget=None):
+    """Cotiza todas las combinaciones que cubren los beneficios pedidos"""
+    additional = list(catalog.additional_features)
+    premium = list(catalog.premium_features)
+    totals = []
+    for plan, details in catalog.plans.items():
+        for a in range(len(additional) + 1):
+            for chosen_a in itertools.combinations(additional, a):
+                for p in range(len(premium) + 1):
+                    for chosen_p in itertools.combinations(premium, p):
+                        offered = set(details["benefits"]) | set(chosen_a) | set(chosen_p)
+                        if not set(required) <= offered:
+                            continue
+                        total = catalog.quote(plan, chosen_a, chosen_p, num_members).total
+                        if budget is None or total <= budget:
+                            totals.append(total)
+    return sorted(totals)
+
+
+class TestOptimizer(unittest.TestCase):
+    """Clase de tests para el optimizador"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.catalog = current_catalog()
+
+    def test_matches_brute_force(self):
+        """Test: El resultado coincide con enumerar todas las combinaciones"""
+        requirements = [
+            (), ("Sauna",), ("Personal Training", "Piscina"),
+            ("Exclusive Gym Access", "Group Classes"),
+            ("Personal Training", "Group Classes", "Nutrition Consultation"),
+        ]
+        for required in requirements:
+            for members in (1, 3):
+                expected = brute_force(self.catalog, required, members)[:3]
+                found = cheapest_packages(required, members, top_k=3, catalog=self.catalog)
+                self.assertEqual([q.total for q in found], expected, (required, members))
+
+    def test_cheaper_with_extra_feature(self):
+        """Test: Agregar una característica no pedida puede abaratar el paquete"""
+        best, = cheapest_packages(
+            ["Piscina", "Personal Training", "Group Classes", "Nutrition Consultation"])
+        self.assertEqual(best.plan, "Premium")
+        self.assertIn("Locker Rental", best.additional_features)
+        self.assertEqual(best.total, 185)
+
+    def test_budget(self):
+        """Test: Solo se retornan paquetes dentro del presupuesto"""
+        found = cheapest_packages(["Exclusive Gym Access"], budget=160, top_k=10)
+        self.assertTrue(found)
+        self.assertTrue(all(q.total <= 160 for q in found))
+        self.assertEqual(cheapest_packages(["Exclusive Gym Access"], budget=100), [])
+
+    def test_unknown_benefit(self):
+        """Test: Un beneficio que nadie ofrece no tiene paquetes"""
+        self.assertEqual(cheapest_packages(["Cancha de tenis"]), [])
+
+    def test_pruning_on_large_catalog(self):
+        """Test: Con decenas de características la búsqueda poda el espacio"""
+        catalog = Catalog(
+            99, dict(self.catalog.plans),
+            {f"Extra {i}": 5 + i * 3 for i in range(24)},
+            {f"Premium {i}": 40 + i * 7 for i in range(8)},
+        )
+        stats = {}
+        found = cheapest_packages(["Extra 3", "Premium 1"], 2, top_k=5,
+                                  catalog=catalog, stats=stats)
+        self.assertEqual(len(found), 5)
+        self.assertEqual(found, sorted(found, key=lambda q: q.total))
+        self.assertLess(stats["nodes"], 3 * 2 ** 16)
+
+    def test_invalid_arguments(self):
+        """Test: Argumentos inválidos"""
+        with self.assertRaises(ValueError):
+            cheapest_packages(top_k=0)
+        with self.assertRaises(ValueError):
+            cheapest_packages(num_members=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit Tests for process-pool quoting
+Tests unitarios para la cotización en paralelo
+"""
+
+import io
+import json
+import unittest
+
+from gym_catalog import Catalog, current_catalog
+from gym_parallel import quote_records_parallel, quote_stream_parallel
+from gym_stream import EnrollmentRecord, quote_stream, read_raw_records
+
+
+def sample_input(count):
+    """Genera un JSONL con inscripciones válidas e inválidas"""
+    plans = ["Basic", "Premium", "Family", "Gold"]
+    lines = []
+    for index in range(count):
+        lines.append(json.dumps({
+            "plan": plans[index % 4],
+            "members": index % 5 + 1,
+            "additional_features": ["Personal Training", "Locker Rental"][:index % 3],
+            "premium_features": ["Exclusive Gym Access"][:index % 2],
+        }))
+    return "\n".join(lines) + "\n"
+
+
+class TestGymParallel(unittest.TestCase):
+    """Clase de tests para la cotización en paralelo"""
+
+    def test_parallel_matches_single_process(self):
+        """Test: El pool produce los mismos resultados y en el mismo orden"""
+        data = sample_input(200)
+        serial_rejects, parallel_rejects = [], []
+        serial = list(quote_stream(
+            read_raw_records(io.StringIO(data), "jsonl"),
+            lambda line, error, raw: serial_rejects.append(line)))
+        parallel = list(quote_stream_parallel(
+            read_raw_records(io.StringIO(data), "jsonl"),
+            lambda line, error, raw: parallel_rejects.append(line),
+            workers=2, chunksize=7))
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel_rejects, serial_rejects)
+        self.assertEqual(len(serial_rejects), 50)
+
+    def test_parallel_rejects_malformed_values(self):
+        """Test: Los registros con valores mal formados van a rechazos en cada proceso"""
+        data = ('{"plan": "Basic", "additional_features": [1]}\n'
+                '{"plan": "Basic", "members": 1e400}\n'
+                '{"plan": 5}\n'
+                '{"plan": "Basic"}\n')
+        rejects = []
+        results = list(quote_stream_parallel(
+            read_raw_records(io.StringIO(data), "jsonl"),
+            lambda line, error, raw: rejects.append(line), workers=2, chunksize=1))
+        self.assertEqual([line for line, _ in results], [4])
+        self.assertEqual(rejects, [1, 2, 3])
+
+    def test_parallel_uses_shipped_catalog(self):
+        """Test: Los procesos usan el catálogo recibido"""
+        base = current_catalog()
+        catalog = Catalog(base.version + 100, {"Basic": {"cost": 70, "benefits": []}},
+                          base.additional_features, base.premium_features)
+        results = quote_records_parallel(
+            [EnrollmentRecord("Basic", 1, (), ())], workers=1, catalog=catalog)
+        self.assertEqual(results[0].total, 70)
+
+    def test_parallel_records_invalid(self):
+        """Test: Un registro inválido genera ValueError"""
+        with self.assertRaises(ValueError):
+            quote_records_parallel([EnrollmentRecord("Gold", 1, (), ())], workers=1)
+
+    def test_invalid_chunk_size(self):
+        """Test: Tamaño de bloque inválido"""
+        with self.assertRaises(ValueError):
+            list(quote_stream_parallel([], chunksize=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Unit Tests for the in-memory member registry
+Tests unitarios para el registro de membresías con índices
+"""
+
+import unittest
+
+from gym_compact import CompactMembership, MembershipCodec
+from gym_registry import BLOCK_BITS, Bitset, MemberRegistry, member_bucket
+
+SELECTIONS = [
+    ("Basic", ["Locker Rental"], [], 1),
+    ("Family", ["Personal Training"], [], 4),
+    ("Family", ["Personal Training", "Locker Rental"], ["Exclusive Gym Access"], 6),
+    ("Premium", [], ["Specialized Training Program"], 2),
+    ("Family", [], [], 3),
+]
+
+
+class TestMemberRegistry(unittest.TestCase):
+    """Clase de tests para el registro con índices secundarios"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.codec = MembershipCodec()
+        self.registry = MemberRegistry(self.codec)
+        self.ids = [
+            self.registry.enroll(CompactMembership(
+                self.codec.plan_code(plan), self.codec.additional_mask(additional),
+                self.codec.premium_mask(premium), members))
+            for plan, additional, premium, members in SELECTIONS
+        ]
+
+    def test_member_bucket(self):
+        """Test: Rangos de número de miembros"""
+        self.assertEqual([member_bucket(n) for n in (1, 2, 4, 5, 40)],
+                         ["1", "2-4", "2-4", "5+", "5+"])
+        with self.assertRaises(ValueError):
+            member_bucket(0)
+
+    def test_conjunctive_queries(self):
+        """Test: Consultas que combinan plan, características y rango"""
+        self.assertEqual(self.registry.query(additional_features=["Locker Rental"]), [0, 2])
+        self.assertEqual(self.registry.query(
+            plan="Family", additional_features=["Personal Training"]), [1, 2])
+        self.assertEqual(self.registry.query(any_premium=True), [2, 3])
+        self.assertEqual(self.registry.query(plan="Family", bucket="2-4"), [1, 4])
+        self.assertEqual(self.registry.count(plan="Family", any_additional=True), 2)
+        self.assertEqual(self.registry.count(), 5)
+
+    def test_matches_full_scan(self):
+        """Test: Las consultas coinciden con recorrer todas las membresías"""
+        for feature in self.codec.additional_features:
+            expected = [i for i, selection in enumerate(SELECTIONS) if feature in selection[1]]
+            self.assertEqual(self.registry.query(additional_features=[feature]), expected)
+
+    def test_cancel_updates_indexes(self):
+        """Test: Dar de baja quita la membresía de todos los índices"""
+        self.registry.cancel(2)
+        self.assertNotIn(2, self.registry)
+        self.assertEqual(self.registry.query(additional_features=["Locker Rental"]), [0])
+        self.assertEqual(self.registry.query(any_premium=True), [3])
+        self.assertEqual(self.registry.count(bucket="5+"), 0)
+        self.assertEqual(len(self.registry), 4)
+        with self.assertRaises(KeyError):
+            self.registry.cancel(2)
+        # El identificador dado de baja se reutiliza
+        self.assertEqual(self.registry.enroll(CompactMembership(1, 0, 0, 1)), 2)
+        self.assertEqual(self.registry.enroll(CompactMembership(1, 0, 0, 1)), 5)
+        self.assertEqual(self.registry.query(plan="Basic"), [0, 2, 5])
+
+    def test_churn_keeps_ids_dense(self):
+        """Test: Inscribir y dar de baja muchas veces no hace crecer los identificadores"""
+        for _ in range(1000):
+            self.registry.cancel(4)
+            self.assertEqual(self.registry.enroll(
+                CompactMembership(self.codec.plan_code("Family"), 0, 0, 3)), 4)
+        self.assertEqual(self.registry.query(plan="Family", bucket="2-4"), [1, 4])
+
+    def test_bitset_blocks(self):
+        """Test: El mapa de bits en bloques opera igual que un entero"""
+        first, second = Bitset(), Bitset()
+        positions = [0, 5, BLOCK_BITS - 1, BLOCK_BITS, 3 * BLOCK_BITS + 7]
+        for position in positions:
+            first.add(position)
+        for position in positions[1:4]:
+            second.add(position)
+        second.add(10 * BLOCK_BITS)
+        self.assertEqual(list(first), positions)
+        self.assertEqual(list(first & second), positions[1:4])
+        self.assertEqual(len(first | second), len(positions) + 1)
+        for position in positions:
+            first.discard(position)
+        self.assertFalse(first)
+
+    def test_get_returns_membership(self):
+        """Test: Se reconstruye la membresía registrada"""
+        gym = self.registry.get(3)
+        self.assertEqual(gym.selected_plan, "Premium")
+        self.assertEqual(list(gym.premium_features), ["Specialized Training Program"])
+
+    def test_unknown_names_rejected(self):
+        """Test: Nombres inexistentes en la consulta"""
+        with self.assertRaises(ValueError):
+            self.registry.query(plan="Gold")
+        with self.assertRaises(ValueError):
+            self.registry.query(additional_features=["Sauna"])
+        with self.assertRaises(ValueError):
+            self.registry.query(bucket="3")
+
+
+if __name__ == '__main__':
+    unittest.main()
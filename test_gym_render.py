@@ -0,0 +1,86 @@
+"""
+Unit Tests for the cached terminal rendering
+Tests unitarios para el renderizado de listados y resúmenes
+"""
+
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+import gym_render
+from gym_membership import GymMembership
+
+
+def legacy_summary(gym):
+    """Resumen generado con un print por línea, como antes del renderizado"""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        print("\n" + "="*60)
+        print("RESUMEN DE MEMBRESÍA")
+        print("="*60)
+        print(f"Plan seleccionado: {gym.selected_plan}")
+        print(f"Número de miembros: {gym.num_members}")
+        if gym.additional_features:
+            print("\nCaracterísticas adicionales:")
+            for feature in gym.additional_features:
+                print(f"  - {feature} (${gym.ADDITIONAL_FEATURES[feature]})")
+        if gym.premium_features:
+            print("\nCaracterísticas premium:")
+            for feature in gym.premium_features:
+                print(f"  - {feature} (${gym.PREMIUM_FEATURES[feature]})")
+        print(f"\nCosto total: ${gym.total_cost:.2f}")
+        print("="*60 + "\n")
+    return out.getvalue()
+
+
+class TestRender(unittest.TestCase):
+    """Clase de tests para el renderizado"""
+
+    def test_plans_listing_matches_prints(self):
+        """Test: El listado de planes es idéntico al de los print originales"""
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            print("\n" + "="*60)
+            print("PLANES DE MEMBRESÍA DISPONIBLES")
+            print("="*60)
+            for plan_name, details in GymMembership.MEMBERSHIP_PLANS.items():
+                print(f"\n{plan_name}: ${details['cost']}/mes")
+                print("Beneficios:")
+                for benefit in details['benefits']:
+                    print(f"  - {benefit}")
+            print("="*60 + "\n")
+        self.assertEqual(gym_render.render_plans(GymMembership.MEMBERSHIP_PLANS),
+                         out.getvalue())
+
+    def test_summary_matches_prints(self):
+        """Test: El resumen es idéntico al de los print originales"""
+        gym = GymMembership.from_selection(
+            "Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            gym.calculate_total_cost()
+        for membership in (gym, GymMembership()):
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                membership.display_summary()
+            self.assertEqual(out.getvalue(), legacy_summary(membership))
+
+    def test_listing_cached_per_table(self):
+        """Test: El listado se genera una vez y se regenera si cambia la tabla"""
+        table = {"Locker Rental": 10}
+        first = gym_render.render_feature_listing("Título:", table)
+        self.assertIs(gym_render.render_feature_listing("Título:", table), first)
+        changed = gym_render.render_feature_listing("Título:", {"Locker Rental": 12})
+        self.assertEqual(changed, "\nTítulo:\n  - Locker Rental: $12\n")
+
+    def test_single_write_per_screen(self):
+        """Test: Cada pantalla se escribe con una sola escritura"""
+        stream = mock.Mock()
+        with mock.patch("sys.stdout", stream):
+            GymMembership().display_membership_plans()
+        stream.write.assert_called_once()
+        stream.flush.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Unit Tests for the declarative pricing rules
+Tests unitarios para las reglas declarativas de precios
+"""
+
+import unittest
+
+from gym_batch import quote_batch
+from gym_catalog import QuoteCache, current_catalog, reload_catalog
+from gym_membership import GymMembership, build_quote
+from gym_optimizer import cheapest_packages
+from gym_rules import (
+    DEFAULT_RULES,
+    FIXED_DISCOUNT,
+    PERCENT_DISCOUNT,
+    PricingRule,
+    compile_rules,
+    generate_source,
+)
+
+
+class TestPricingRules(unittest.TestCase):
+    """Clase de tests para el motor de reglas"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.catalog = current_catalog()
+
+    def tearDown(self):
+        """Restaura el catálogo original"""
+        reload_catalog(self.catalog.plans, self.catalog.additional_features,
+                       self.catalog.premium_features, self.catalog.rules)
+
+    def test_default_rules_match_reference(self):
+        """Test: Las reglas por defecto reproducen calculate_total_cost"""
+        price = compile_rules()
+        for subtotal in (50, 130, 200, 201, 245, 400, 401, 630, 245.05):
+            for members in (1, 2):
+                for premium in ((), ("Exclusive Gym Access",)):
+                    expected = build_quote("Basic", members, (), premium, subtotal, 0, 0,
+                                           self.catalog).total
+                    self.assertEqual(price(subtotal, members, bool(premium)), expected)
+
+    def test_catalog_total_uses_compiled_rules(self):
+        """Test: El total compilado del catálogo coincide con la cotización"""
+        args = ("Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3)
+        self.assertEqual(self.catalog.total(*args), self.catalog.quote(*args).total)
+        self.assertEqual(self.catalog.total_cents(*args), self.catalog.quote_cents(*args).total)
+
+    def test_seasonal_promotion(self):
+        """Test: Una promoción nueva se agrega sin cambiar código"""
+        promotion = PricingRule("summer", FIXED_DISCOUNT, 15, min_members=4, order=25)
+        catalog = reload_catalog(rules=DEFAULT_RULES + (promotion,))
+        self.assertEqual(catalog.total("Family", [], [], 4), 150 - 15 - 15)
+        self.assertEqual(catalog.total("Family", [], [], 1), 150)
+        self.assertEqual(catalog.total_cents("Family", [], [], 4), 12000)
+
+    def test_promotion_reaches_every_quote_path(self):
+        """Test: Una promoción cambia los precios de todas las rutas de cotización"""
+        promotion = PricingRule("summer", FIXED_DISCOUNT, 15, min_members=4, order=25)
+        reload_catalog(rules=DEFAULT_RULES + (promotion,))
+        self.assertEqual(GymMembership.from_selection("Family", num_members=4).quote().total, 120)
+        self.assertEqual(current_catalog().quote("Family", [], [], 4).total, 120)
+        self.assertEqual(list(quote_batch(["Family"], [[]], [[]], [4])), [120])
+        self.assertEqual(build_quote("Family", 4, (), (), 150, 0, 0, current_catalog()).total, 120)
+        best, = cheapest_packages(["Clases grupales incluidas"], 4)
+        self.assertEqual(best.total, 120)
+
+    def test_cache_keyed_on_member_thresholds(self):
+        """Test: La caché distingue los grupos que alcanzan mínimos distintos"""
+        promotion = PricingRule("crowd", PERCENT_DISCOUNT, 0.05, min_members=5, order=15)
+        catalog = reload_catalog(rules=DEFAULT_RULES + (promotion,))
+        self.assertEqual(catalog.member_thresholds, (2, 5))
+        self.assertEqual([catalog.pricing_members(n) for n in (1, 2, 4, 5, 9)], [1, 2, 2, 5, 5])
+        cache = QuoteCache()
+        self.assertEqual(cache.quote("Premium", num_members=2).total, 90)
+        self.assertEqual(cache.quote("Premium", num_members=6).total, 85)
+        self.assertEqual(cache.quote("Premium", num_members=4).total, 90)
+        self.assertEqual(cache.info()["hits"], 1)
+
+    def test_split_exclusive_group_rejected(self):
+        """Test: Un grupo exclusivo partido por otra regla no se compila"""
+        rules = DEFAULT_RULES + (
+            PricingRule("late_offer", FIXED_DISCOUNT, 5, exclusive_group="special_offer",
+                        order=40),)
+        with self.assertRaises(ValueError):
+            compile_rules(rules)
+
+    def test_exclusive_group_compiles_to_elif(self):
+        """Test: Las reglas de un grupo exclusivo no se acumulan"""
+        source = generate_source(DEFAULT_RULES)
+        self.assertIn("elif subtotal > 20000", source)
+        self.assertEqual(compile_rules()(450, 1, False), 400)
+
+    def test_timed_breakdown_matches_breakdown(self):
+        """Test: La variante medida calcula el mismo desglose y marca cada ajuste"""
+        breakdown = compile_rules(cents=True, breakdown=True)
+        timed = compile_rules(cents=True, breakdown=True, timed=True)
+        for args in ((24500, 3, True), (5000, 1, False), (45000, 2, True)):
+            stages = []
+            self.assertEqual(timed(*args, stages.append), breakdown(*args))
+            self.assertEqual(stages, ["group_discount", "special_discount", "premium_surcharge"])
+        with self.assertRaises(ValueError):
+            compile_rules(cents=True, timed=True)
+
+    def test_invalid_rules_rejected(self):
+        """Test: Reglas mal formadas no se compilan"""
+        with self.assertRaises(ValueError):
+            compile_rules([PricingRule("x", "cashback", 5)])
+        with self.assertRaises(ValueError):
+            compile_rules([PricingRule("x", FIXED_DISCOUNT, "5; import os")])
+        with self.assertRaises(ValueError):
+            compile_rules([PricingRule("x\nimport os", FIXED_DISCOUNT, 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Unit Tests for the asyncio quote service
+Tests unitarios para el servicio asíncrono de cotización
+"""
+
+import asyncio
+import json
+import unittest
+import unittest.mock
+
+from gym_batch import quote_batch_breakdowns
+from gym_catalog import current_catalog
+from gym_service import QuoteService
+from gym_stream import EnrollmentRecord
+
+
+class TestQuoteService(unittest.IsolatedAsyncioTestCase):
+    """Clase de tests para QuoteService"""
+
+    async def asyncSetUp(self):
+        """Configuración antes de cada test"""
+        self.confirmed = []
+        self.service = QuoteService(
+            max_batch=16,
+            on_confirm=self.record_confirmation)
+
+    def record_confirmation(self, breakdown):
+        """Guarda la confirmación y retorna su número"""
+        self.confirmed.append(breakdown)
+        return 100 + len(self.confirmed)
+
+    async def asyncTearDown(self):
+        """Detiene el servicio"""
+        await self.service.stop_batcher()
+
+    async def test_concurrent_quotes_are_batched(self):
+        """Test: Una ráfaga de cotizaciones se agrupa en micro-lotes"""
+        record = EnrollmentRecord("Premium", 3, ("Personal Training", "Group Classes"),
+                                  ("Exclusive Gym Access",))
+        results = await asyncio.gather(*[self.service.quote(record) for _ in range(64)])
+        self.assertEqual(len(results), 64)
+        self.assertAlmostEqual(results[0].total, 230.57, places=2)
+        self.assertLessEqual(self.service.batches, 8)
+
+    async def test_batch_error_stays_with_its_request(self):
+        """Test: Un lote con una solicitud inválida cotiza las demás en una pasada"""
+        records = [EnrollmentRecord("Premium", 3, ("Personal Training", "Group Classes"),
+                                    ("Exclusive Gym Access",)),
+                   EnrollmentRecord("Gold", 1, (), ()),
+                   EnrollmentRecord("Family", 4, ("Locker Rental", "Locker Rental"), ())]
+        with unittest.mock.patch("gym_service.quote_batch_breakdowns",
+                                 wraps=quote_batch_breakdowns) as batch_call:
+            results = await asyncio.gather(*[self.service.quote(record) for record in records],
+                                           return_exceptions=True)
+        self.assertEqual(batch_call.call_count, 1)
+        self.assertIsInstance(results[1], ValueError)
+        catalog = current_catalog()
+        self.assertEqual(results[0], catalog.quote(
+            "Premium", ["Personal Training", "Group Classes"], ["Exclusive Gym Access"], 3))
+        self.assertEqual(results[2], catalog.quote("Family", ["Locker Rental"], [], 4))
+
+    async def test_confirm_is_explicit(self):
+        """Test: Confirmar no pide datos por terminal"""
+        response = await self.service.handle_request(
+            {"id": 7, "op": "confirm", "plan": "Basic", "members": 1})
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["id"], 7)
+        self.assertEqual(response["result"], 50)
+        self.assertEqual(response["confirmation"], 101)
+        self.assertEqual(self.confirmed[0].plan, "Basic")
+
+    async def test_invalid_request(self):
+        """Test: Solicitudes inválidas devuelven error sin detener el servicio"""
+        response = await self.service.handle_request({"op": "quote", "plan": "Gold"})
+        self.assertFalse(response["ok"])
+        response = await self.service.handle_request({"op": "cancel", "plan": "Basic"})
+        self.assertFalse(response["ok"])
+
+    async def test_unexpected_error_is_answered(self):
+        """Test: Un error inesperado responde al cliente y no detiene el micro-lote"""
+        record = EnrollmentRecord("Basic", 1, (), ())
+        with unittest.mock.patch("gym_service.quote_batch_breakdowns",
+                                 side_effect=RuntimeError("falla")):
+            response = await self.service.handle_request({"id": 3, "plan": "Basic"})
+        self.assertEqual((response["id"], response["ok"]), (3, False))
+        self.assertIn("falla", response["error"])
+        self.assertEqual((await self.service.quote(record)).total, 50)
+
+        def failing_confirm(breakdown):
+            raise OSError("disco lleno")
+        self.service.on_confirm = failing_confirm
+        response = await self.service.handle_request({"op": "confirm", "plan": "Basic"})
+        self.assertFalse(response["ok"])
+        self.assertIn("disco lleno", response["error"])
+
+    async def test_idle_quote_is_not_delayed(self):
+        """Test: Sin carga una cotización forma su propio lote de inmediato"""
+        await self.service.quote(EnrollmentRecord("Basic", 1, (), ()))
+        await self.service.quote(EnrollmentRecord("Family", 2, (), ()))
+        self.assertEqual(self.service.batches, 2)
+
+    async def test_line_protocol_over_tcp(self):
+        """Test: Cotizar y confirmar a través de TCP"""
+        server = await self.service.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b'{"id": 1, "op": "quote", "plan": "Family", "members": 2}\n')
+            writer.write(b'no es json\n')
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(2)]
+            writer.close()
+            await writer.wait_closed()
+        by_id = {response["id"]: response for response in responses}
+        self.assertEqual(by_id[1]["quote"]["total"], 135)
+        self.assertFalse(by_id[None]["ok"])
+
+    async def test_connection_limit(self):
+        """Test: Se rechazan conexiones por encima del límite"""
+        self.service.max_connections = 0
+        server = await self.service.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            response = json.loads(await reader.readline())
+            writer.close()
+        self.assertFalse(response["ok"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Unit Tests for the durable confirmed-membership store
+Tests unitarios para el almacén durable de membresías confirmadas
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from gym_catalog import current_catalog
+from gym_service import QuoteService
+from gym_store import MembershipStore
+from gym_stream import parse_record
+
+
+class TestMembershipStore(unittest.TestCase):
+    """Clase de tests para el almacén de confirmaciones"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "confirmed.db")
+        self.breakdown = current_catalog().quote(
+            "Premium", ["Personal Training"], ["Exclusive Gym Access"], 2)
+
+    def tearDown(self):
+        """Limpia los archivos temporales"""
+        self.directory.cleanup()
+
+    def test_append_is_durable_when_future_resolves(self):
+        """Test: El futuro se resuelve con el id una vez guardado"""
+        with MembershipStore(self.path) as store:
+            row_id = store.append(self.breakdown).result(timeout=5)
+            self.assertEqual(row_id, 1)
+            self.assertEqual(store.count(), 1)
+
+    def test_group_commit(self):
+        """Test: Una ráfaga de confirmaciones usa menos commits que registros"""
+        with MembershipStore(self.path, max_delay=0.01) as store:
+            futures = []
+
+            def burst():
+                futures.extend(store.append(self.breakdown) for _ in range(200))
+
+            threads = [threading.Thread(target=burst) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            store.flush()
+            self.assertEqual(sorted(f.result() for f in futures), list(range(1, 801)))
+            stats = store.stats()
+        self.assertEqual(stats["records"], 800)
+        self.assertLess(stats["commits"], 800)
+        self.assertGreater(stats["mean_batch"], 1)
+        for key in ("records_per_sec", "commit_p50_ms", "commit_p99_ms",
+                    "latency_p50_ms", "latency_p99_ms"):
+            self.assertIn(key, stats)
+
+    def test_cancelled_confirmation_is_skipped(self):
+        """Test: Una confirmación cancelada no se escribe ni detiene al escritor"""
+        with MembershipStore(self.path, max_delay=0.2) as store:
+            cancelled = store.append(self.breakdown)
+            self.assertTrue(cancelled.cancel())
+            kept = store.append(self.breakdown)
+            self.assertEqual(kept.result(timeout=5), 1)
+            self.assertEqual(store.append(self.breakdown).result(timeout=5), 2)
+            self.assertEqual(store.count(), 2)
+
+    def test_replay_after_reopen(self):
+        """Test: Al reabrir se recuperan las confirmaciones en orden"""
+        with MembershipStore(self.path) as store:
+            for _ in range(3):
+                store.append(self.breakdown)
+        with MembershipStore(self.path) as store:
+            replayed = list(store.replay())
+            self.assertEqual([row_id for row_id, _, _ in replayed], [1, 2, 3])
+            _, _, breakdown = replayed[0]
+            self.assertEqual(breakdown.plan, "Premium")
+            self.assertEqual(breakdown.premium_features, ("Exclusive Gym Access",))
+            self.assertEqual(breakdown.total, self.breakdown.total)
+            self.assertEqual(len(list(store.replay(after_id=2))), 1)
+
+
+class TestServiceStore(unittest.IsolatedAsyncioTestCase):
+    """Clase de tests para el servicio con almacén durable"""
+
+    async def test_confirm_waits_for_store(self):
+        """Test: La confirmación responde después de guardarse, con el id del registro"""
+        with tempfile.TemporaryDirectory() as directory:
+            with MembershipStore(os.path.join(directory, "confirmed.db")) as store:
+                service = QuoteService(on_confirm=store.append)
+                try:
+                    record = parse_record({"plan": "Basic", "members": 2})
+                    await service.confirm(record)
+                    response = await service.confirm(record)
+                    self.assertEqual(store.count(), 2)
+                    self.assertEqual(response["confirmation"], 2)
+                    self.assertEqual([row_id for row_id, _, _ in store.replay()], [1, 2])
+                finally:
+                    await service.stop_batcher()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Unit Tests for streaming bulk quotes
+Tests unitarios para la cotización masiva en streaming
+"""
+
+import contextlib
+import io
+import json
+import unittest
+from unittest import mock
+
+from gym_stream import main, parse_record, quote_stream, read_raw_records, write_results
+
+JSONL_INPUT = "\n".join([
+    json.dumps({"plan": "Premium", "members": 3,
+                "additional_features": ["Personal Training", "Group Classes"],
+                "premium_features": ["Exclusive Gym Access"]}),
+    json.dumps({"plan": "Gold", "members": 1}),
+    "{no es json",
+    "",
+    json.dumps({"plan": "Basic"}),
+]) + "\n"
+
+CSV_INPUT = (
+    "plan,members,additional_features,premium_features\n"
+    "Basic,1,Personal Training,\n"
+    "Family,x,,\n"
+    "Premium,2,Locker Rental;Locker Rental,Exclusive Gym Access\n"
+)
+
+
+class TestGymStream(unittest.TestCase):
+    """Clase de tests para la cotización en streaming"""
+
+    def test_parse_record_splits_and_dedupes(self):
+        """Test: Las características en texto se separan y no se repiten"""
+        record = parse_record({"plan": "Basic", "members": "2",
+                               "additional_features": "Group Classes; Group Classes"})
+        self.assertEqual(record.num_members, 2)
+        self.assertEqual(record.additional_features, ("Group Classes",))
+        self.assertEqual(record.premium_features, ())
+
+    def test_parse_record_invalid_members(self):
+        """Test: Número de miembros no numérico"""
+        with self.assertRaises(ValueError):
+            parse_record({"plan": "Basic", "members": "dos"})
+
+    def test_parse_record_rejects_wrong_types(self):
+        """Test: Valores de otro tipo o miembros no enteros se rechazan"""
+        for raw in ({"plan": "Basic", "members": 2.9},
+                    {"plan": "Basic", "members": True},
+                    {"plan": "Basic", "members": float("inf")},
+                    {"plan": "Basic", "members": [2]},
+                    {"plan": ["Basic"]},
+                    {"plan": "Basic", "additional_features": [1]},
+                    {"plan": "Basic", "premium_features": {"Sauna": 1}}):
+            with self.assertRaises(ValueError, msg=raw):
+                parse_record(raw)
+        self.assertEqual(parse_record({"plan": "Basic", "members": 3.0}).num_members, 3)
+
+    def test_malformed_values_go_to_rejects(self):
+        """Test: Un registro con valores mal formados se rechaza sin detener el stream"""
+        lines = ['{"plan": "Basic", "additional_features": [1]}',
+                 '{"plan": "Basic", "members": 1e400}',
+                 '{"plan": "Basic", "members": 2.9}',
+                 '{"plan": {"name": "Basic"}}',
+                 '{"plan": "Basic", "members": 2}']
+        rejects = []
+        results = list(quote_stream(
+            read_raw_records(io.StringIO("\n".join(lines) + "\n"), "jsonl"),
+            lambda line, error, raw: rejects.append(line)))
+        self.assertEqual([line for line, _ in results], [5])
+        self.assertEqual(rejects, [1, 2, 3, 4])
+
+    def test_jsonl_stream_with_rejects(self):
+        """Test: Los registros inválidos van a rechazos sin detener el proceso"""
+        rejects = []
+        results = list(quote_stream(
+            read_raw_records(io.StringIO(JSONL_INPUT), "jsonl"),
+            lambda line, error, raw: rejects.append(line)))
+        self.assertEqual([line for line, _ in results], [1, 5])
+        self.assertAlmostEqual(results[0][1].total, 230.57, places=2)
+        self.assertEqual(results[1][1].total, 50)
+        self.assertEqual(rejects, [2, 3])
+
+    def test_stream_is_lazy(self):
+        """Test: La cotización avanza registro por registro"""
+        results = quote_stream(read_raw_records(io.StringIO(JSONL_INPUT), "jsonl"))
+        self.assertEqual(next(results)[0], 1)
+
+    def test_csv_stream_to_csv(self):
+        """Test: Entrada y salida en CSV"""
+        output = io.StringIO()
+        written = write_results(
+            quote_stream(read_raw_records(io.StringIO(CSV_INPUT), "csv")), output, "csv")
+        self.assertEqual(written, 2)
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("line,plan,members"))
+        self.assertTrue(lines[1].endswith(",90"))
+        self.assertIn("Locker Rental,Exclusive Gym Access", lines[2])
+
+    def test_main_reports_rejects(self):
+        """Test: La línea de comandos retorna 1 si hubo rechazos"""
+        stdin, stdout, stderr = io.StringIO(CSV_INPUT), io.StringIO(), io.StringIO()
+        with mock.patch("sys.stdin", stdin), contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(stderr):
+            status = main(["--format", "csv"])
+        self.assertEqual(status, 1)
+        self.assertEqual(len(stdout.getvalue().splitlines()), 2)
+        self.assertIn("rechazos: 1", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Unit Tests for the differential pricing verification
+Tests unitarios para la verificación diferencial de precios
+"""
+
+import contextlib
+import io
+import random
+import unittest
+import unittest.mock
+
+from gym_catalog import current_catalog, reload_catalog
+from gym_rules import compile_rules
+from gym_verify import (
+    ENGINES,
+    ERROR,
+    MATCH,
+    MISMATCH,
+    Case,
+    enumerate_cases,
+    fuzz_cases,
+    interpret_rules,
+    main,
+    member_boundaries,
+    random_rules,
+    verify,
+    verify_random_catalogs,
+)
+
+# Motores que no arrancan procesos ni un lazo de eventos
+IN_PROCESS = [name for name in ENGINES if name not in ("quote_stream_parallel", "QuoteService")]
+
+
+class TestVerify(unittest.TestCase):
+    """Clase de tests para la verificación diferencial"""
+
+    def setUp(self):
+        """Configuración antes de cada test"""
+        self.catalog = current_catalog()
+
+    def tearDown(self):
+        """Restaura el catálogo"""
+        reload_catalog(self.catalog.plans, self.catalog.additional_features,
+                       self.catalog.premium_features, self.catalog.rules)
+
+    def assertNoDivergence(self, report):
+        """Verifica que ningún motor diverja ni falle"""
+        for name, result in report["engines"].items():
+            self.assertEqual((result[MISMATCH], result[ERROR]), (0, 0),
+                             f"{name}: {result['examples']}")
+
+    def test_enumerates_whole_space(self):
+        """Test: Se recorren todos los planes, subconjuntos y límites de miembros"""
+        cases = list(enumerate_cases())
+        expected = (len(self.catalog.plans) * 2 ** len(self.catalog.additional_features)
+                    * 2 ** len(self.catalog.premium_features) * len(member_boundaries()))
+        self.assertEqual(len(cases), expected)
+        self.assertEqual(len(set(cases)), expected)
+        self.assertIn(Case("Family", (), (), 2), cases)
+
+    def test_all_engines_agree_on_catalog(self):
+        """Test: Todos los motores coinciden con la referencia en el catálogo vigente"""
+        report = verify(enumerate_cases(), IN_PROCESS)
+        self.assertNoDivergence(report)
+        # Todas las rutas usan las reglas compiladas del catálogo
+        for name in IN_PROCESS:
+            self.assertEqual(report["engines"][name][MATCH], report["cases"], name)
+
+    def test_fuzzed_cases_agree(self):
+        """Test: Los casos aleatorios coinciden en todos los motores, incluidos los concurrentes"""
+        cases = list(fuzz_cases(60, seed=4))
+        self.assertEqual(cases, list(fuzz_cases(60, seed=4)))
+        # Hay características repetidas y fuera del orden del catálogo
+        self.assertTrue(any(len(set(case.additional_features)) < len(case.additional_features)
+                            for case in cases))
+        self.assertNoDivergence(verify(cases))
+
+    def test_repeated_features_agree(self):
+        """Test: Una característica repetida se cobra una vez en todos los motores"""
+        case = Case("Basic", ("Locker Rental",) * 2, ("Exclusive Gym Access",) * 2, 1)
+        self.assertEqual(interpret_rules(case, self.catalog), 16100)
+        report = verify([case])
+        self.assertNoDivergence(report)
+        for name in ENGINES:
+            self.assertEqual(report["engines"][name][MATCH], 1, name)
+
+    def test_random_catalogs_agree_and_restore(self):
+        """Test: Con precios aleatorios no hay divergencias y el catálogo se restaura"""
+        report = verify_random_catalogs(2, seed=1, engines=IN_PROCESS)
+        self.assertNoDivergence(report)
+        self.assertEqual(report["cases"], 2 * len(list(enumerate_cases())))
+        self.assertEqual(current_catalog().to_dict()["plans"], self.catalog.to_dict()["plans"])
+
+    def test_random_rules_agree(self):
+        """Test: Con tablas de reglas aleatorias todos los motores coinciden al centavo"""
+        report = verify_random_catalogs(3, seed=2, engines=IN_PROCESS, rules=True, fuzz=40)
+        self.assertNoDivergence(report)
+        self.assertEqual(current_catalog().rules, self.catalog.rules)
+
+    def test_interpreter_matches_compiled_rules(self):
+        """Test: El intérprete de referencia coincide con la función compilada"""
+        rng = random.Random(5)
+        for _ in range(20):
+            rules = random_rules(rng)
+            catalog = reload_catalog(rules=rules)
+            price = compile_rules(rules, cents=True)
+            for case in fuzz_cases(20, rng.randint(0, 100), catalog):
+                subtotal = catalog.quote_cents(*case).subtotal
+                self.assertEqual(interpret_rules(case, catalog),
+                                 price(subtotal, case.num_members, bool(case.premium_features)))
+
+    def test_broken_engine_is_reported(self):
+        """Test: Un motor con otra regla de precios se reporta como divergente"""
+        def broken(cases, catalog):
+            return [catalog.quote_cents(*case).subtotal for case in cases]
+        with unittest.mock.patch.dict(ENGINES, {"broken": broken}):
+            report = verify(enumerate_cases(), ["broken"], max_examples=2)
+        result = report["engines"]["broken"]
+        self.assertGreater(result[MISMATCH], 0)
+        self.assertEqual(len(result["examples"]), 2)
+
+    def test_one_cent_difference_is_mismatch(self):
+        """Test: Una diferencia de un centavo cuenta como divergencia"""
+        def off_by_one(cases, catalog):
+            return [catalog.total_cents(*case) + 1 for case in cases]
+        with unittest.mock.patch.dict(ENGINES, {"off_by_one": off_by_one}):
+            report = verify([Case("Basic", (), (), 1)], ["off_by_one"])
+        self.assertEqual(report["engines"]["off_by_one"][MISMATCH], 1)
+
+    def test_unknown_engine(self):
+        """Test: Un motor inexistente se rechaza"""
+        with self.assertRaises(ValueError):
+            verify([Case("Basic", (), (), 1)], ["Platinum"])
+
+    def test_main(self):
+        """Test: La línea de comandos reporta rendimiento y termina sin divergencias"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main(["Catalog.total_cents", "quote_batch", "--fuzz", "100"]), 0)
+        self.assertIn("casos/s", output.getvalue())
+        self.assertIn("quote_batch", output.getvalue())
+        with unittest.mock.patch.dict(ENGINES, {"broken": lambda cases, catalog: [0] * len(cases)}):
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                self.assertEqual(main(["broken", "--fuzz", "0"]), 1)
+        self.assertIn("DIVERGENCIA broken", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Unit Tests for the synthetic workload generator
+Tests unitarios para el generador de carga sintética
+"""
+
+import io
+import os
+import tempfile
+import unittest
+import unittest.mock
+from collections import Counter
+
+from gym_catalog import current_catalog
+from gym_stream import parse_record, quote_stream, read_raw_records
+from gym_workload import (
+    INVALID_FEATURES,
+    INVALID_PLANS,
+    WorkloadProfile,
+    generate_records,
+    main,
+    write_workload,
+)
+
+
+class TestWorkload(unittest.TestCase):
+    """Clase de tests para el generador de carga"""
+
+    def test_same_seed_same_records(self):
+        """Test: La misma semilla produce la misma secuencia"""
+        profile = WorkloadProfile(invalid_rate=0.2)
+        first = list(generate_records(500, seed=7, profile=profile))
+        self.assertEqual(first, list(generate_records(500, seed=7, profile=profile)))
+        self.assertNotEqual(first, list(generate_records(500, seed=8, profile=profile)))
+
+    def test_records_use_catalog_names(self):
+        """Test: Sin nombres inválidos todos los registros se pueden cotizar"""
+        catalog = current_catalog()
+        for record in generate_records(1000, seed=1):
+            catalog.quote(record.plan, record.additional_features,
+                          record.premium_features, record.num_members)
+
+    def test_profile_shapes_distribution(self):
+        """Test: El perfil controla la mezcla de planes, adopción y miembros"""
+        profile = WorkloadProfile(
+            plan_mix={"Basic": 3, "Family": 1},
+            additional_rates={"Locker Rental": 0.5},
+            premium_rates=0.0,
+            member_weights={1: 1, 5: 1},
+        )
+        records = list(generate_records(20000, seed=3, profile=profile))
+        plans = Counter(record.plan for record in records)
+        self.assertEqual(set(plans), {"Basic", "Family"})
+        self.assertAlmostEqual(plans["Basic"] / len(records), 0.75, delta=0.02)
+        lockers = sum(record.additional_features == ("Locker Rental",) for record in records)
+        self.assertAlmostEqual(lockers / len(records), 0.5, delta=0.02)
+        self.assertTrue(all(not record.additional_features
+                            or record.additional_features == ("Locker Rental",)
+                            for record in records))
+        self.assertTrue(all(not record.premium_features for record in records))
+        self.assertEqual({record.num_members for record in records}, {1, 5})
+
+    def test_invalid_share(self):
+        """Test: La fracción de registros con nombres inexistentes es la pedida"""
+        records = list(generate_records(20000, seed=4, profile=WorkloadProfile(invalid_rate=0.1)))
+        invalid = [record for record in records
+                   if record.plan in INVALID_PLANS
+                   or set(record.additional_features + record.premium_features) & set(INVALID_FEATURES)]
+        self.assertAlmostEqual(len(invalid) / len(records), 0.1, delta=0.01)
+
+    def test_invalid_profile(self):
+        """Test: Un perfil con nombres o tasas inválidas se rechaza"""
+        for profile in (WorkloadProfile(plan_mix={"Platinum": 1}),
+                        WorkloadProfile(additional_rates={"Sauna": 0.5}),
+                        WorkloadProfile(premium_rates=1.5),
+                        WorkloadProfile(member_weights={0: 1}),
+                        WorkloadProfile(invalid_rate=-0.1)):
+            with self.assertRaises(ValueError):
+                next(generate_records(1, profile=profile))
+
+    def test_output_round_trips_through_stream(self):
+        """Test: La salida se lee con gym_stream y los inválidos se rechazan"""
+        records = list(generate_records(300, seed=5, profile=WorkloadProfile(invalid_rate=0.2)))
+        for fmt in ("jsonl", "csv"):
+            output = io.StringIO()
+            self.assertEqual(write_workload(iter(records), output, fmt), len(records))
+            output.seek(0)
+            raw = list(read_raw_records(output, fmt))
+            self.assertEqual([parse_record(item) for _, item in raw], records)
+            rejected = []
+            quoted = list(quote_stream(iter(raw), lambda *args: rejected.append(args)))
+            self.assertEqual(len(quoted) + len(rejected), len(records))
+            self.assertTrue(rejected)
+
+    def test_main_writes_file(self):
+        """Test: La línea de comandos escribe el número de registros pedido"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "load.csv")
+            with unittest.mock.patch("sys.stderr", io.StringIO()):
+                self.assertEqual(main(["250", "-o", path, "-f", "csv", "--seed", "2",
+                                       "--plan-mix", "Premium=1", "--members", "2=1",
+                                       "--invalid-rate", "0.05"]), 0)
+            with open(path, encoding="utf-8") as handle:
+                lines = handle.read().splitlines()
+        self.assertEqual(len(lines), 251)
+        self.assertTrue(all(line.split(",")[1] == "2" for line in lines[1:]))
+
+
+if __name__ == "__main__":
+    unittest.main()